@@ -17,6 +17,7 @@ from PyQt6.QtGui import QFont, QAction, QFontDatabase
 # 导入主要功能模块
 from main import SocialEngDictionaryTool
 from core.collect_input import CollectInput
+from core.result_store import sorted_words
 
 # 导入全局设置
 from gui_settings import STYLE_SHEET
@@ -512,17 +513,17 @@ class ResultDisplayWidget(QWidget):
 
         # 更新列表显示
         self.username_list.clear()
-        sorted_usernames = sorted(usernames)
+        sorted_usernames = sorted_words(usernames)
         self.username_list.setText('\n'.join(sorted_usernames))
 
         self.password_list.clear()
-        sorted_passwords = sorted(passwords)
+        sorted_passwords = sorted_words(passwords)
         self.password_list.setText('\n'.join(sorted_passwords))
 
     def clear_results(self):
         """清空结果"""
-        self.usernames.clear()
-        self.passwords.clear()
+        self.usernames = set()
+        self.passwords = set()
         self.username_list.clear()
         self.password_list.clear()
         self.username_count_label.setText("0")
@@ -544,14 +545,14 @@ class ResultDisplayWidget(QWidget):
                 if self.usernames:
                     username_file = output_path / "usernames.txt"
                     with open(username_file, 'w', encoding='utf-8') as f:
-                        for username in sorted(self.usernames):
+                        for username in sorted_words(self.usernames):
                             f.write(username + '\n')
 
                 # 导出密码
                 if self.passwords:
                     password_file = output_path / "passwords.txt"
                     with open(password_file, 'w', encoding='utf-8') as f:
-                        for password in sorted(self.passwords):
+                        for password in sorted_words(self.passwords):
                             f.write(password + '\n')
 
                 QMessageBox.information(
@@ -577,7 +578,7 @@ class ResultDisplayWidget(QWidget):
         if self.usernames:
             clipboard = QApplication.clipboard()
             if clipboard is not None:
-                clipboard.setText('\n'.join(sorted(self.usernames)))
+                clipboard.setText('\n'.join(sorted_words(self.usernames)))
                 QMessageBox.information(self, "复制成功", f"已复制 {len(self.usernames)} 个用户名到剪贴板")  # noqa
             else:
                 QMessageBox.warning(self, "错误", "无法访问剪贴板，请确保应用程序已正确初始化")
@@ -589,7 +590,7 @@ class ResultDisplayWidget(QWidget):
         if self.passwords:
             clipboard = QApplication.clipboard()
             if clipboard is not None:
-                clipboard.setText('\n'.join(sorted(self.passwords)))
+                clipboard.setText('\n'.join(sorted_words(self.passwords)))
                 QMessageBox.information(self, "复制成功", f"已复制 {len(self.passwords)} 个密码到剪贴板")  # noqa
             else:
                 QMessageBox.warning(self, "错误", "无法访问剪贴板，请确保应用程序已正确初始化")
@@ -1187,8 +1188,15 @@ class MainWindow(QMainWindow):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             task_name, description = dialog.get_task_info()
 
+            self.progress_bar.setVisible(True)
+            self.progress_bar.setValue(0)
+            # 保存在界面线程中进行并会处理界面事件, 期间禁用保存、删除和生成等
+            # 操作, 避免在未完成的事务中再次写入数据库或修改结果
+            self.set_busy(True)
             try:
-                task_id = self.tool.save_to_database(task_name, description)
+                task_id = self.tool.save_to_database(
+                    task_name, description,
+                    progress_callback=self.on_save_progress)
                 if task_id > 0:
                     QMessageBox.information(
                         self, "保存成功",
@@ -1201,6 +1209,32 @@ class MainWindow(QMainWindow):
 
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"保存失败: {str(e)}")
+            finally:
+                self.progress_bar.setVisible(False)
+                self.set_busy(False)
+
+    def set_busy(self, busy: bool):
+        """禁用或恢复选项卡、生成按钮和菜单"""
+        self.tab_widget.setEnabled(not busy)
+        generating = bool(self.generation_worker
+                          and self.generation_worker.isRunning())
+        self.generate_btn.setEnabled(not busy and not generating)
+        menubar = self.menuBar()
+        if menubar is not None:
+            menubar.setEnabled(not busy)
+
+    def on_save_progress(self, progress: Dict[str, Any]):
+        """数据库保存进度 (保存在界面线程中进行, 需要手动处理界面事件;
+        保存期间 set_busy 已禁用会再次写入数据库的操作)"""
+        phase = {'stage': '写入', 'index': '建索引', 'merge': '合并',
+                 'done': '完成'}.get(progress['phase'], progress['phase'])
+        if progress['total']:
+            self.progress_bar.setValue(
+                min(100, progress['rows'] * 100 // progress['total']))
+        self.status_label.setText(
+            f"保存到数据库 ({phase}): {progress['rows']} 个条目, "
+            f"{progress['rows_per_second']:.0f} 条/秒")
+        QApplication.processEvents()
 
     def load_task_from_database(self, task_id: int):
         """从数据库加载任务"""
@@ -0,0 +1,68 @@
+"""流式去重基准: set[str] 与 64 位指纹 (FingerprintSet)
+
+模拟 _iter_unique 的用法: 逐个判断候选是否见过, 新候选直接交给写出端
+(这里直接丢弃), 统计去重结构的常驻内存、耗时和指纹碰撞估算.
+
+    python benchmarks/bench_dedup.py --entries 5000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.fingerprint import FingerprintSet  # noqa: E402
+from bench_result_store import iter_candidates  # noqa: E402
+
+
+def dedup_exact(entries: int) -> int:
+    seen = set()
+    written = 0
+    for candidate in iter_candidates(entries):
+        if candidate not in seen:
+            seen.add(candidate)
+            written += 1
+    report(seen)
+    return written
+
+
+def dedup_fingerprint(entries: int) -> int:
+    seen = FingerprintSet()
+    written = sum(1 for candidate in iter_candidates(entries)
+                  if seen.add(candidate))
+    report(seen)
+    stats = seen.collision_report()
+    print(f"    指纹表容量 {stats['capacity']}, "
+          f"预计误判丢弃 {stats['expected_collisions']:.2e} 个, "
+          f"至少一次的概率 {stats['collision_probability']:.2e}")
+    return written
+
+
+def report(seen: object) -> None:
+    current, _ = tracemalloc.get_traced_memory()
+    print(f"    去重结构常驻 {current / 1024 / 1024:.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='流式去重基准')
+    parser.add_argument('--entries', type=int, default=2000000,
+                        help='候选数量 (含重复)')
+    args = parser.parse_args()
+
+    for name, func in (('set[str]', dedup_exact),
+                       ('fingerprint', dedup_fingerprint)):
+        print(f"  {name}:")
+        tracemalloc.start()
+        start = time.perf_counter()
+        written = func(args.entries)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"    写出 {written} 个, 峰值 {peak / 1024 / 1024:.1f} MB, "
+              f"耗时 {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
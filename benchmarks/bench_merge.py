@@ -0,0 +1,91 @@
+"""外部字典合并吞吐量基准
+
+比较旧实现 (文本模式逐行 strip 后放入集合) 与 core.dict_reader 的 mmap 读取器.
+不指定文件时生成一个含重复行的合成字典.
+
+    python benchmarks/bench_merge.py --lines 5000000 --dup-ratio 0.5
+    python benchmarks/bench_merge.py --file rockyou.txt
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from typing import Callable, Set
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dict_reader import DictionaryReader  # noqa: E402
+
+
+def old_merge(file_path: str) -> Set[str]:
+    """改动前 merge_external_dictionary 的读取方式"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return set(line.strip() for line in f if line.strip())
+
+
+def mmap_merge(file_path: str) -> Set[str]:
+    words: Set[str] = set()
+    DictionaryReader(file_path).merge_into(words)
+    return words
+
+
+def make_wordlist(file_path: str, lines: int, dup_ratio: float) -> None:
+    """生成合成字典, dup_ratio 为重复行所占比例"""
+    rng = random.Random(0)
+    alphabet = string.ascii_letters + string.digits + '!@#'
+    unique = max(1, int(lines * (1 - dup_ratio)))
+    pool = [''.join(rng.choice(alphabet) for _ in range(rng.randint(6, 12)))
+            for _ in range(unique)]
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for i in range(lines):
+            word = pool[i] if i < unique else rng.choice(pool)
+            f.write(word + '\n')
+
+
+def bench(name: str, func: Callable[[str], Set[str]], file_path: str,
+          repeat: int) -> Set[str]:
+    size_mb = os.path.getsize(file_path) / 1024 / 1024
+    best = float('inf')
+    result: Set[str] = set()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(file_path)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {name:<8} {best:8.3f}s  {size_mb / best:8.1f} MB/s  "
+          f"{len(result)} 个唯一条目")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='外部字典合并吞吐量基准')
+    parser.add_argument('--file', type=str, help='使用现有字典文件')
+    parser.add_argument('--lines', type=int, default=2000000,
+                        help='合成字典行数')
+    parser.add_argument('--dup-ratio', type=float, default=0.5,
+                        help='合成字典的重复行比例')
+    parser.add_argument('--repeat', type=int, default=3, help='每种实现的运行次数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = args.file
+        if not file_path:
+            file_path = os.path.join(tmp, 'wordlist.txt')
+            make_wordlist(file_path, args.lines, args.dup_ratio)
+
+        size_mb = os.path.getsize(file_path) / 1024 / 1024
+        print(f"文件: {file_path} ({size_mb:.1f} MB)")
+        old = bench('old', old_merge, file_path, args.repeat)
+        new = bench('mmap', mmap_merge, file_path, args.repeat)
+
+        if old != new:
+            print(f"⚠️ 结果不一致: 仅旧实现 {len(old - new)} 个, "
+                  f"仅新实现 {len(new - old)} 个")
+        else:
+            print("✅ 结果一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""数据库保存吞吐量基准: 逐行 executemany 与批量导入
+
+每种方式使用新的数据库连续保存两个任务: 第一个写入空库, 第二个与第一个
+有一半条目重复 (模拟同一目标的多次生成). 统计耗时、条目/秒和数据库大小.
+
+  - rows:   逐行 INSERT OR IGNORE (条目总数低于 BULK_SAVE_THRESHOLD 时的路径)
+  - bulk:   暂存表 + 导入后建索引 + 集合式合并
+  - stream: 同 bulk, 输入为生成器, 不在内存中保留结果集合
+
+    python benchmarks/bench_save.py --entries 1000000
+    python benchmarks/bench_save.py --entries 10000000 --methods bulk,stream
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Iterator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.collect_input import CollectInput  # noqa: E402
+from core.db_connection import close_all  # noqa: E402
+from core.result_store import CompactResultStore  # noqa: E402
+from core.save_result import SaveResult  # noqa: E402
+
+# 用户名数量占条目总数的比例
+USERNAME_RATIO = 0.1
+
+
+def iter_words(prefix: str, start: int, count: int) -> Iterator[str]:
+    """产出互不相同、顺序打乱的合成条目 (乘以奇数常量在 2^40 内是双射)"""
+    for i in range(start, start + count):
+        yield prefix + format((i * 2654435761) & 0xffffffffff, 'x')
+
+
+def task_words(entries: int, start: int):
+    usernames = int(entries * USERNAME_RATIO)
+    return (iter_words('u', start, usernames),
+            iter_words('p', start, entries - usernames))
+
+
+def run(method: str, entries: int, db_path: str) -> None:
+    saver = SaveResult(db_path)
+    info = CollectInput(name_zh="基准")
+
+    def report(progress):
+        if progress['phase'] == 'done':
+            return
+        print(f"\r    {progress['phase']:<6} {progress['kind']:<9} "
+              f"{progress['rows']:>10} 条  "
+              f"{progress['rows_per_second']:>9.0f} 条/秒", end='', flush=True)
+
+    for round_index, start in enumerate((0, entries // 2)):
+        usernames, passwords = task_words(entries, start)
+        if method != 'stream':
+            usernames = CompactResultStore.from_iterable(usernames)
+            passwords = CompactResultStore.from_iterable(passwords)
+
+        begin = time.perf_counter()
+        if method == 'stream':
+            task_id = saver.bulk_save_generation_result(
+                f"bench-{round_index}", "", info, usernames, passwords,
+                progress_callback=report)
+        else:
+            task_id = saver.save_generation_result(
+                f"bench-{round_index}", "", info, usernames, passwords,
+                progress_callback=report, bulk=method == 'bulk')
+        elapsed = time.perf_counter() - begin
+        print()
+        if task_id < 0:
+            raise SystemExit(f"{method}: 保存失败")
+
+        with saver.db.reader() as conn:
+            # 逻辑大小, 不受 WAL 是否已检查点写回影响
+            size = (conn.execute('PRAGMA page_count').fetchone()[0]
+                    * conn.execute('PRAGMA page_size').fetchone()[0])
+        label = '空库' if round_index == 0 else '半数重复'
+        print(f"  {method:<7} {label:<5} {elapsed:8.2f}s  "
+              f"{entries / elapsed:10.0f} 条/秒  数据库 {size / 1024 / 1024:8.1f} MB")  # noqa
+    close_all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='数据库保存吞吐量基准')
+    parser.add_argument('--entries', type=int, default=1000000,
+                        help='每个任务的条目数 (用户名 + 密码)')
+    parser.add_argument('--methods', default='rows,bulk,stream',
+                        help='逗号分隔: rows, bulk, stream')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_save_')
+    try:
+        for method in args.methods.split(','):
+            print(f"{method}:")
+            run(method, args.entries, os.path.join(work_dir, f"{method}.db"))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""CLI 启动耗时基准
+
+多次运行 main.py (默认 --list-tasks), 统计墙钟时间, 并用 python -X importtime
+列出累计耗时最多的模块, 检查数据库命令是否意外加载了生成模块.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --json out.json -- --db-stats
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'main.py')
+
+# 数据库命令不应加载的模块
+HEAVY_MODULES = ('core.combo', 'core.rule_engine', 'core.batch', 'pypinyin',
+                 'PyQt6', 'concurrent.futures.process')
+
+
+def time_runs(cli_args: List[str], runs: int) -> List[float]:
+    """运行 CLI 若干次, 返回每次的墙钟耗时 (秒)"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, MAIN] + cli_args, cwd=ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       check=False)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def import_times(cli_args: List[str]) -> List[Tuple[str, int, int]]:
+    """用 -X importtime 运行一次, 返回 (模块, 自身微秒, 累计微秒)"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', MAIN]
+                          + cli_args, cwd=ROOT, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, text=True, check=False)
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 表头
+        modules.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='CLI 启动耗时基准')
+    parser.add_argument('--runs', type=int, default=10, help='运行次数')
+    parser.add_argument('--top', type=int, default=15,
+                        help='列出累计耗时最多的模块数')
+    parser.add_argument('--json', type=str, help='把结果写入 JSON 文件, 便于跟踪')
+    parser.add_argument('cli_args', nargs='*',
+                        help='传给 main.py 的参数 (默认: --list-tasks)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cli_args = args.cli_args or ['--list-tasks']
+        if '--db-path' not in cli_args:
+            cli_args = cli_args + ['--db-path', os.path.join(tmp, 'bench.db')]
+
+        # 预热一次, 排除首次建库和 .pyc 编译
+        time_runs(cli_args, 1)
+        timings = time_runs(cli_args, args.runs)
+        modules = import_times(cli_args)
+
+    top_level = [m for m in modules if not m[0].startswith(' ')]
+    total_import_us = sum(cumulative for _, _, cumulative in top_level)
+    loaded = {name.strip() for name, _, _ in modules}
+    heavy = sorted(name for name in loaded
+                   if any(name == mod or name.startswith(mod + '.')
+                          for mod in HEAVY_MODULES))
+
+    report: Dict[str, object] = {
+        'cli_args': cli_args,
+        'runs': args.runs,
+        'median_seconds': round(statistics.median(timings), 4),
+        'min_seconds': round(min(timings), 4),
+        'import_seconds': round(total_import_us / 1e6, 4),
+        'modules_imported': len(loaded),
+        'heavy_modules': heavy,
+    }
+
+    print(f"命令: main.py {' '.join(cli_args)}")
+    print(f"墙钟耗时: 中位数 {report['median_seconds']}s, "
+          f"最小 {report['min_seconds']}s ({args.runs} 次)")
+    print(f"导入耗时: {report['import_seconds']}s, 共 {len(loaded)} 个模块")
+    print(f"\n累计耗时最多的 {args.top} 个模块 (微秒):")
+    for name, self_us, cumulative in sorted(modules, key=lambda m: -m[2])[:args.top]:  # noqa
+        print(f"  {cumulative:>9} {self_us:>9}  {name}")
+
+    if heavy:
+        print(f"\n⚠️ 加载了生成相关的重量级模块: {', '.join(heavy)}")
+    else:
+        print("\n✅ 未加载生成相关的重量级模块")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
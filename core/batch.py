@@ -0,0 +1,282 @@
+import csv
+import inspect
+import json
+import re
+import time
+from pathlib import Path
+from concurrent.futures import (ProcessPoolExecutor, FIRST_COMPLETED,
+                                wait)
+from typing import Dict, List, Iterator, Optional, Set, Tuple, Any
+from .collect_input import CollectInput  # type: ignore
+from .combo import Combo  # type: ignore
+from .compress_io import (compressed_path, open_writer,  # type: ignore
+                          write_lines)
+from .pinyin_cache import pinyin_cache  # type: ignore
+
+# 记录中用于标识目标的字段, 不传给 CollectInput
+TARGET_ID_FIELDS = ('id', 'target')
+
+# CollectInput 接受的字段, 记录中的其他字段 (如 CSV 的职位列) 被忽略
+INFO_FIELDS = tuple(name for name in
+                    inspect.signature(CollectInput.__init__).parameters
+                    if name != 'self')
+
+# 列表字段, 在 CSV 中或以字符串给出时按逗号分隔
+LIST_FIELDS = ('common_suffix', 'regular_years')
+
+# 每个进程同时排队的目标数, 控制在途结果占用的内存
+PENDING_PER_WORKER = 4
+
+
+def iter_targets(file_path: str) -> Iterator[Tuple[int, Any]]:
+    """流式读取批量目标文件 (JSONL 或 CSV, 按扩展名区分)
+    Args:
+        file_path (str): 目标文件路径
+    Returns:
+        Iterator[Tuple[int, Any]]: (行号, 记录字典), 解析失败时为 (行号, 异常)
+    """
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        if Path(file_path).suffix.lower() == '.csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                record: Dict[str, Any] = {}
+                for key, value in row.items():
+                    if key is None or not value or not value.strip():
+                        continue
+                    record[key.strip()] = value
+                yield reader.line_num, record
+            return
+
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("每行必须是一个 JSON 对象")
+                yield line_no, record
+            except ValueError as e:
+                yield line_no, e
+
+
+def _field_text(key: str, value: Any) -> str:
+    """把字段值转换为字符串 (JSONL 中的电话、年份等常为数字)"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"字段 {key} 应为字符串或数字, 实际为 {value!r}")
+
+
+def info_fields(record: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """从目标记录中取出 CollectInput 的字段
+    Args:
+        record (Dict[str, Any]): iter_targets() 读出的记录
+    Returns:
+        Tuple[Dict[str, Any], List[str]]: 可传给 CollectInput.from_dict 的字段,
+            以及被忽略的未知字段名
+    Raises:
+        ValueError: 字段值不是字符串或数字
+    """
+    data: Dict[str, Any] = {}
+    ignored: List[str] = []
+    for key, value in record.items():
+        if key in TARGET_ID_FIELDS or value is None:
+            continue
+        if key not in INFO_FIELDS:
+            ignored.append(key)
+        elif key in LIST_FIELDS:
+            items = value.split(',') if isinstance(value, str) else value
+            if not isinstance(items, list):
+                items = [items]
+            data[key] = [text for text in (_field_text(key, item).strip()
+                                           for item in items) if text]
+        else:
+            data[key] = _field_text(key, value)
+    return data, ignored
+
+
+def target_label(record: Dict[str, Any], index: int) -> str:
+    """生成目标的输出目录名 / 任务名"""
+    name = ''
+    for field in TARGET_ID_FIELDS + ('username', 'name_en', 'name_zh',
+                                     'email'):
+        if record.get(field):
+            name = str(record[field])
+            break
+    name = re.sub(r'[^\w.@-]+', '_', name).strip('._')[:64]
+    return f"{index:05d}_{name}" if name else f"{index:05d}"
+
+
+def _generate_target(combo: Combo, label: str, data: Dict[str, Any],
+                     output_dir: Optional[str], keep_results: bool,
+                     compression: Optional[str] = None) -> Dict[str, Any]:
+    """子进程入口: 为一个目标生成字典并写出, 返回统计 (失败时带 error)"""
+    result: Dict[str, Any] = {'label': label, 'usernames': 0, 'passwords': 0}
+    pinyin_before = dict(pinyin_cache.stats)
+    try:
+        personal_info = CollectInput.from_dict(data)
+        if personal_info.is_empty():
+            raise ValueError("记录中没有可用的个人信息")
+
+        results = combo.generate_all_combinations(personal_info)
+        result['usernames'] = len(results['usernames'])
+        result['passwords'] = len(results['passwords'])
+
+        if output_dir:
+            target_dir = Path(output_dir) / label
+            target_dir.mkdir(parents=True, exist_ok=True)
+            for kind in ('usernames', 'passwords'):
+                f = open_writer(compressed_path(target_dir / f"{kind}.txt",
+                                                compression), compression)
+                try:
+                    write_lines(f, sorted(results[kind]))
+                finally:
+                    f.close()
+            personal_info.save_to_json(str(target_dir / "personal_info_backup.json"))  # noqa
+
+        if keep_results:
+            result['personal_info'] = personal_info
+            result['results'] = results
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        # 进程池的子进程退出时不执行 atexit, 每个目标结束后提交持久缓存
+        pinyin_cache.flush()
+        result['pinyin'] = {name: value - pinyin_before[name]
+                            for name, value in pinyin_cache.stats.items()}
+    return result
+
+
+class BatchGenerator:
+    """批量目标生成: 流式读取目标文件, 用进程池逐个生成"""
+
+    def __init__(self, combo: Combo, workers: int = 1,
+                 output_dir: Optional[str] = "output",
+                 save_handler: Any = None,
+                 task_prefix: str = "batch",
+                 compression: Optional[str] = None) -> None:
+        """
+        Args:
+            combo (Combo): 生成器, 会被传给各子进程
+            workers (int): 进程数, 1 表示在当前进程中顺序生成
+            output_dir (Optional[str]): 输出根目录, 每个目标一个子目录; 为空时不写文件
+            save_handler (SaveResult): 提供时每个目标保存为一个数据库任务
+            task_prefix (str): 数据库任务名前缀
+            compression (Optional[str]): 每个目标的字典的压缩格式
+        """
+        self.combo = combo
+        self.workers = max(1, workers)
+        self.output_dir = output_dir
+        self.save_handler = save_handler
+        self.task_prefix = task_prefix
+        self.compression = compression
+
+        self.failures: List[Tuple[str, str]] = []
+        self.stats = {'targets': 0, 'failed': 0, 'usernames': 0,
+                      'passwords': 0, 'seconds': 0.0}
+        # 各进程拼音缓存的命中统计之和
+        self.pinyin_stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+        # 已提示过的未知字段, 每个字段只提示一次
+        self.ignored_fields: Set[str] = set()
+
+    def run(self, file_path: str) -> Dict[str, Any]:
+        """处理整个目标文件
+        Args:
+            file_path (str): JSONL 或 CSV 目标文件
+        Returns:
+            Dict[str, Any]: 汇总统计, 含 targets_per_second / entries_per_second
+        """
+        start = time.perf_counter()
+        try:
+            if self.workers == 1:
+                for label, data in self._iter_jobs(file_path):
+                    self._collect(_generate_target(
+                        self.combo, label, data, self.output_dir,
+                        self.save_handler is not None, self.compression))
+            else:
+                self._run_parallel(file_path)
+        finally:
+            self.stats['seconds'] = time.perf_counter() - start
+
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        """汇总吞吐量统计"""
+        stats = dict(self.stats)
+        seconds = max(stats['seconds'], 1e-9)
+        entries = stats['usernames'] + stats['passwords']
+        stats['entries'] = entries
+        stats['targets_per_second'] = round(stats['targets'] / seconds, 2)
+        stats['entries_per_second'] = round(entries / seconds)
+        stats['pinyin_cache'] = dict(self.pinyin_stats)
+        return stats
+
+    def _iter_jobs(self, file_path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:  # noqa
+        """读取目标记录并取出个人信息字段, 无法解析的记录直接记为失败"""
+        for index, (line_no, record) in enumerate(iter_targets(file_path), 1):
+            if isinstance(record, Exception):
+                self._record_failure(f"第 {line_no} 行", str(record))
+                continue
+            try:
+                data, ignored = info_fields(record)
+            except ValueError as e:
+                self._record_failure(f"第 {line_no} 行", str(e))
+                continue
+            new_fields = [key for key in ignored
+                          if key not in self.ignored_fields]
+            if new_fields:
+                self.ignored_fields.update(new_fields)
+                print(f"⚠️ 忽略未知字段: {', '.join(new_fields)}")
+            yield target_label(record, index), data
+
+    def _run_parallel(self, file_path: str) -> None:
+        """进程池生成, 在途任务数有上限, 目标文件不会被一次读入内存"""
+        max_pending = self.workers * PENDING_PER_WORKER
+        keep_results = self.save_handler is not None
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = set()
+            for label, data in self._iter_jobs(file_path):
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._collect(future.result())
+                pending.add(executor.submit(_generate_target, self.combo,
+                                            label, data, self.output_dir,
+                                            keep_results, self.compression))
+
+            for future in wait(pending).done:
+                self._collect(future.result())
+
+    def _collect(self, result: Dict[str, Any]) -> None:
+        """汇总单个目标的结果, 需要时在主进程中写入数据库"""
+        label = result['label']
+        for name, value in result.get('pinyin', {}).items():
+            self.pinyin_stats[name] = self.pinyin_stats.get(name, 0) + value
+        if 'error' in result:
+            self._record_failure(label, result['error'])
+            return
+
+        if self.save_handler is not None:
+            results = result['results']
+            task_id = self.save_handler.save_generation_result(
+                f"{self.task_prefix}-{label}", "批量生成",
+                result['personal_info'],
+                results['usernames'], results['passwords'])
+            if task_id < 0:
+                self._record_failure(label, "保存到数据库失败")
+                return
+
+        self.stats['targets'] += 1
+        self.stats['usernames'] += result['usernames']
+        self.stats['passwords'] += result['passwords']
+        print(f"✅ {label}: 用户名 {result['usernames']} 个, "
+              f"密码 {result['passwords']} 个")
+
+    def _record_failure(self, label: str, reason: str) -> None:
+        self.stats['failed'] += 1
+        self.failures.append((label, reason))
+        print(f"⚠️ 跳过 {label}: {reason}")
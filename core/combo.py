@@ -1,257 +1,506 @@
 import re
-from typing import Set, List, Dict
+import time
+from itertools import product, chain
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import (Set, List, Dict, FrozenSet, Iterable, Iterator,
+                    Optional, Callable, Tuple, Any)
 from .collect_input import CollectInput  # type: ignore
-from .create_name_pinyin import NamePinyinCreator  # type: ignore
-from .create_name_initial import NameInitialCreator  # type: ignore
+from .profile_features import ProfileFeatures  # type: ignore
+from .password_policy import PasswordPolicy  # type: ignore
+from .fingerprint import FingerprintSet  # type: ignore
+from .ranking import TopK  # type: ignore
+from .result_store import CompactResultStore  # type: ignore
+from .rule_engine import RulePlan, PlanStep, Partition  # type: ignore
 from .settings import (COMMON_PREFIX, COMMON_SEPARATORS,  # type: ignore
-                       TOP_100_COMMON_PASSWORDS)
+                       load_top_100_passwords, USERNAME_RULES,
+                       PASSWORD_RULES, SCORE_LENGTH_PENALTY)
 
+# 与目标个人信息无关的槽位, 只由这些槽位组成的规则结果可以跨目标复用
+STATIC_SLOTS = {
+    'usernames': ('prefix', 'suffix', 'year'),
+    'passwords': ('prefix', 'suffix', 'year', 'sep', 'common'),
+}
 
-class Combo:
-    """生成基于个人信息的用户名和密码组合"""
+# 流式生成的去重方式: exact 保存字符串, fingerprint 只保存 64 位指纹
+DEDUP_MODES = ('exact', 'fingerprint')
 
-    def __init__(self) -> None:
-        self.common_separators = COMMON_SEPARATORS
+# 估算内存时使用: 空字符串对象大小, 以及集合中每个条目的额外开销
+STR_BASE_SIZE = 49
+SET_ENTRY_OVERHEAD = 32
 
-    def generate_usernames(self, personal_info: CollectInput) -> Set[str]:
-        """生成用户名组合"""
-        usernames = set()
+# 进程级缓存: 键为(类型, 静态槽位取值), 值为过滤后的静态结果块
+STATIC_BLOCK_CACHE_SIZE = 32
+_static_block_cache: Dict[Tuple[Any, ...], FrozenSet[str]] = {}
+_static_block_stats = {'hits': 0, 'misses': 0}
 
-        # 使用个人信息中的自定义后缀
-        suffixes_to_use = personal_info.common_suffix
 
-        # 使用个人信息中的自定义年份
-        years_to_use = personal_info.regular_years
+def static_cache_info() -> Dict[str, int]:
+    """获取静态结果块缓存的命中统计"""
+    return dict(_static_block_stats, size=len(_static_block_cache))
 
-        # 基础名字组合
-        base_names = self._get_base_names(personal_info)
 
-        # 1. 直接使用名字
-        usernames.update(base_names)
+def clear_static_cache() -> None:
+    """清空静态结果块缓存"""
+    _static_block_cache.clear()
+    _static_block_stats.update(hits=0, misses=0)
 
-        # 2. 名字 + 后缀
-        for name in base_names:
-            for suffix in suffixes_to_use:
-                usernames.add(name + suffix)
 
-        # 3. 名字 + 年份
-        for name in base_names:
-            for year in years_to_use:
-                usernames.add(name + year)
-                usernames.add(year + name)
+def _generate_shard(combo: 'Combo', kind: str, slots: Dict[str, List[str]],
+                    steps: List[PlanStep]) -> Tuple[Set[str], Dict[str, int]]:
+    """子进程入口: 执行一个分片, 返回过滤后的结果和剪枝统计"""
+    stats: Dict[str, int] = {}
+    return set(combo._run(kind, slots, steps, stats)), stats
 
-        # 4. 前缀(常见用户名)
-        for prefix in COMMON_PREFIX:
-            usernames.add(prefix)
 
-        # 5. 前缀(常见用户名) + 名字 or 名字 + 前缀
-        for name in base_names:
-            for prefix in COMMON_PREFIX:
-                usernames.add(prefix + name)
-                usernames.add(name + prefix)
-
-        # 6. 前缀(常见用户名) + 后缀
-        for prefix in COMMON_PREFIX:
-            for suffix in suffixes_to_use:
-                usernames.add(prefix + suffix)
+class Combo:
+    """生成基于个人信息的用户名和密码组合"""
 
-        # 7. 前缀(常见用户名) + 年份
-        for prefix in COMMON_PREFIX:
-            for year in years_to_use:
-                usernames.add(prefix + year)
+    def __init__(self, workers: int = 1,
+                 policy: Optional[PasswordPolicy] = None,
+                 dedup: str = 'exact',
+                 partition: Optional[Partition] = None) -> None:
+        self.common_separators = COMMON_SEPARATORS
 
-        # 8. 基于生日的组合
-        if personal_info.birthday:
-            birth_parts = personal_info.get_birth_parts()
-            for name in base_names:
-                # 使用生日的各个部分
-                for _, part_value in birth_parts.items():
-                    if part_value:
-                        usernames.add(name + part_value)
-                        usernames.add(part_value + name)
-
-        # 9. 基于公司的组合
-        company_parts = self._get_company_parts(personal_info)
-        for name in base_names:
-            for company in company_parts:
-                for sep in self.common_separators:
-                    if sep:  # 不为空字符串时
-                        usernames.add(name + sep + company)
-                        usernames.add(company + sep + name)
-
-        # 10. 基于邮箱的组合
-        if personal_info.email:
-            # example: test@qq.com -> test
-            email_username = personal_info.email.split('@')[0]
-            usernames.add(email_username)
+        if dedup not in DEDUP_MODES:
+            raise ValueError(f"不支持的去重方式: {dedup}")
+        self.dedup = dedup
+        # fingerprint 模式下每类最近一次生成的指纹碰撞估算
+        self.dedup_reports: Dict[str, Dict[str, Any]] = {}
+
+        # 大于1时使用多进程按名字分片并行生成
+        self.workers = max(1, workers)
+
+        # 目标密码策略, 设置后只生成符合策略的密码
+        self.policy = policy
+
+        # (分区下标, 分区总数), 设置后只生成该分区的组合, 不生成其他分区.
+        # 同一份个人信息在 n 台机器上各跑一个分区, 结果的并集等于完整结果;
+        # 不同规则可能拼出相同的字符串, 因此不同分区之间仍可能有少量重复
+        if partition is not None:
+            index, count = partition
+            if count <= 0 or not 0 <= index < count:
+                raise ValueError(f"无效的分区: {partition}")
+        self.partition = partition
+
+        # 输出长度限制 (最小, 最大), 生成时据此提前跳过不可能满足的组合
+        self.length_limits: Dict[str, Tuple[int, Optional[int]]] = {
+            'usernames': (3, 20),
+            'passwords': (4, None),
+        }
+        if policy is not None:
+            self.length_limits['passwords'] = (max(4, policy.min_length),
+                                               policy.max_length)
+
+        # 被提前跳过的工作量统计
+        self.stats: Dict[str, int] = {'pruned_by_length': 0,
+                                      'pruned_by_policy': 0,
+                                      'case_folded': 0}
+
+        # 规则表只编译一次, 之后每次生成复用执行计划
+        self.username_plan = RulePlan(USERNAME_RULES)
+        self.password_plan = RulePlan(PASSWORD_RULES)
+        self.plans = {'usernames': self.username_plan,
+                      'passwords': self.password_plan}
+        self.normalizers: Dict[str, Callable[[str], Optional[str]]] = {
+            'usernames': self._normalize_username,
+            'passwords': self._normalize_password,
+        }
 
-            # email_username + common suffix
-            for suffix in suffixes_to_use:
-                usernames.add(email_username + suffix)
+        # 静态步骤 (可缓存) 与个性化步骤
+        self.plan_steps = {kind: plan.split_steps(STATIC_SLOTS[kind])
+                           for kind, plan in self.plans.items()}
 
-        # 11. 基于手机号的组合
-        if personal_info.phone:
-            phone_parts = self._extract_phone_parts(personal_info.phone)
-            for name in base_names:
-                for part in phone_parts:
-                    usernames.add(name + part)
-                    usernames.add(part + name)
+    def extract_features(self, personal_info: CollectInput) -> ProfileFeatures:  # noqa
+        """计算目标的派生特征, 可在多次生成之间复用"""
+        return ProfileFeatures(personal_info)
 
-        return self._filter_usernames(usernames)
+    def generate_usernames(self, personal_info: CollectInput,
+                           features: Optional[ProfileFeatures] = None) -> Set[str]:  # noqa
+        """生成用户名组合"""
+        return set(self.iter_usernames(personal_info, features))
 
-    def generate_passwords(self, personal_info: CollectInput) -> Set[str]:
+    def generate_passwords(self, personal_info: CollectInput,
+                           features: Optional[ProfileFeatures] = None) -> Set[str]:  # noqa
         """生成密码组合"""
-        passwords = set()
+        return set(self.iter_passwords(personal_info, features))
+
+    def iter_usernames(self, personal_info: CollectInput,
+                       features: Optional[ProfileFeatures] = None) -> Iterator[str]:  # noqa
+        """流式生成用户名组合 (已过滤、去重)"""
+        if features is None:
+            features = self.extract_features(personal_info)
+
+        slots = self._fold_case(self._username_slots(personal_info, features))  # noqa
+        return self._iter_unique('usernames', slots)
+
+    def iter_passwords(self, personal_info: CollectInput,
+                       features: Optional[ProfileFeatures] = None) -> Iterator[str]:  # noqa
+        """流式生成密码组合 (已过滤、去重)"""
+        if features is None:
+            features = self.extract_features(personal_info)
+
+        slots = self._password_slots(personal_info, features)
+        return self._iter_unique('passwords', slots)
+
+    def _iter_unique(self, kind: str,
+                     slots: Dict[str, List[str]]) -> Iterator[str]:
+        """先产出缓存的静态结果块, 再流式产出个性化部分 (去重)"""
+        if self.dedup == 'fingerprint':
+            yield from self._iter_fingerprint_unique(kind, slots)
+            return
+
+        static_block = self._get_static_block(kind, slots)
+        yield from static_block
+
+        seen: Set[str] = set(static_block)
+        if self.workers > 1:
+            # 归并各分片结果并去重
+            for shard in self._iter_parallel_shards(kind, slots):
+                new_items = shard - seen
+                seen.update(new_items)
+                yield from new_items
+            return
+
+        _, dynamic_steps = self.plan_steps[kind]
+        for clean in self._run(kind, slots, dynamic_steps, self.stats):
+            if clean not in seen:
+                seen.add(clean)
+                yield clean
+
+    def _iter_fingerprint_unique(self, kind: str,
+                                 slots: Dict[str, List[str]]) -> Iterator[str]:  # noqa
+        """按 64 位指纹去重, 不保留已产出的字符串"""
+        seen = FingerprintSet()
+        add = seen.add
+        try:
+            for candidate in self._iter_candidates(kind, slots):
+                if add(candidate):
+                    yield candidate
+        finally:
+            self.dedup_reports[kind] = seen.collision_report()
+
+    def _run(self, kind: str, slots: Dict[str, List[str]],
+             steps: List[PlanStep],
+             stats: Optional[Dict[str, int]] = None) -> Iterator[str]:
+        """执行计划中的步骤, 产出清理后的结果 (未去重)"""
+        return chain.from_iterable(
+            items for _, items in self._run_by_family(kind, slots, steps, stats))  # noqa
+
+    def _run_by_family(self, kind: str, slots: Dict[str, List[str]],
+                       steps: List[PlanStep],
+                       stats: Optional[Dict[str, int]] = None) -> Iterator[Tuple[str, Iterator[str]]]:  # noqa
+        """按步骤产出 (规则族, 清理后的结果迭代器)"""
+        min_length, max_length = self._pruning_limits(kind, slots)
+        required_classes = 0
+        if kind == 'passwords' and self.policy is not None:
+            required_classes = self.policy.required_classes
+
+        normalize = self.normalizers[kind]
+        for family, raw in self.plans[kind].run_by_family(
+                slots, steps, min_length, max_length, stats, required_classes,
+                self.partition):
+            yield family, (clean for clean in map(normalize, raw)
+                           if clean is not None)
+
+    def score(self, weight: float, candidate: str) -> float:
+        """候选得分: 规则族权重, 越短的候选越常见"""
+        return weight / (1 + SCORE_LENGTH_PENALTY * len(candidate))
+
+    def generate_top_k(self, personal_info: CollectInput, k: int,
+                       features: Optional[ProfileFeatures] = None) -> Dict[str, List[Tuple[float, str]]]:  # noqa
+        """只保留得分最高的 k 个用户名和密码
+        Args:
+            personal_info (CollectInput): 个人信息对象
+            k (int): 每种类型保留的数量
+            features (Optional[ProfileFeatures]): 预先计算的派生特征
+        Returns:
+            Dict[str, List[Tuple[float, str]]]: 按得分从高到低排列的 (得分, 候选)
+        """
+        if features is None:
+            features = self.extract_features(personal_info)
+
+        all_slots = self._all_slots(personal_info, features)
+        return {kind: self._top_k(kind, slots, k)
+                for kind, slots in all_slots.items()}
+
+    def generate_compact(self, personal_info: CollectInput,
+                         features: Optional[ProfileFeatures] = None) -> Dict[str, CompactResultStore]:  # noqa
+        """生成所有组合, 结果存为 CompactResultStore
+        Args:
+            personal_info (CollectInput): 个人信息对象
+            features (Optional[ProfileFeatures]): 预先计算的派生特征
+        Returns:
+            Dict[str, CompactResultStore]: 排序去重后的用户名和密码
+        """
+        if features is None:
+            features = self.extract_features(personal_info)
+
+        all_slots = self._all_slots(personal_info, features)
+        # 去重交给分块压缩, 不再维护完整的 seen 集合
+        return {kind: CompactResultStore.from_iterable(self._iter_candidates(kind, slots))  # noqa
+                for kind, slots in all_slots.items()}
+
+    def _all_slots(self, personal_info: CollectInput,
+                   features: ProfileFeatures,
+                   record: bool = True) -> Dict[str, Dict[str, List[str]]]:
+        """用户名和密码两类的槽位取值"""
+        return {
+            'usernames': self._fold_case(
+                self._username_slots(personal_info, features), record),
+            'passwords': self._password_slots(personal_info, features),
+        }
 
-        # 使用个人信息中的自定义设置
-        suffixes_to_use = personal_info.common_suffix
-        years_to_use = personal_info.regular_years
+    def _iter_candidates(self, kind: str,
+                         slots: Dict[str, List[str]]) -> Iterator[str]:
+        """产出静态结果块和个性化部分 (未去重)"""
+        yield from self._get_static_block(kind, slots)
+        if self.workers > 1:
+            for shard in self._iter_parallel_shards(kind, slots):
+                yield from shard
+            return
+
+        _, dynamic_steps = self.plan_steps[kind]
+        yield from self._run(kind, slots, dynamic_steps, self.stats)
+
+    def _top_k(self, kind: str, slots: Dict[str, List[str]],
+               k: int) -> List[Tuple[float, str]]:
+        """按权重从高到低执行规则族, 用有界堆保留前 k 名"""
+        plan = self.plans[kind]
+        top = TopK(k)
+
+        # 任意候选在该规则族能得到的最高分 (长度取下限)
+        min_length, _ = self.length_limits[kind]
+        best_factor = self.score(1.0, 'x' * min_length)
+
+        for family, items in self._run_by_family(kind, slots,
+                                                 plan.steps_by_weight(),
+                                                 self.stats):
+            weight = plan.weights[family]
+            floor = top.min_score()
+            if floor is not None and weight * best_factor < floor:
+                # 后续规则族权重更低, 不可能再进入前 k 名
+                break
+
+            for candidate in items:
+                top.push(self.score(weight, candidate), candidate)
+
+        return top.ranked()
+
+    def _pruning_limits(self, kind: str, slots: Dict[str, List[str]]) -> Tuple[int, Optional[int]]:  # noqa
+        """生成时可安全使用的长度限制
+
+        清理时会去掉首尾空白, 只要有取值带首尾空白, 拼接后的长度就可能
+        在清理后变短, 此时不能按最大长度提前剪枝.
+        """
+        min_length, max_length = self.length_limits[kind]
+        if max_length is not None:
+            for values in slots.values():
+                if any(value != value.strip() for value in values):
+                    return min_length, None
+        return min_length, max_length
+
+    def _fold_case(self, slots: Dict[str, List[str]],
+                   record: bool = True) -> Dict[str, List[str]]:
+        """用户名最终会转为小写, 提前合并只有大小写不同的取值"""
+        folded = self._dedupe_slots(
+            {slot: [value.lower() for value in values]
+             for slot, values in slots.items()})
+        if not record:
+            return folded
+
+        plan = self.plans['usernames']
+        before = sum(count for count, _ in plan.count(slots).values())
+        after = sum(count for count, _ in plan.count(folded).values())
+        self.stats['case_folded'] += before - after
+        return folded
+
+    def _iter_parallel_shards(self, kind: str,
+                              slots: Dict[str, List[str]]) -> Iterator[Set[str]]:  # noqa
+        """将个性化步骤按名字分片交给进程池, 按完成顺序返回各分片结果"""
+        _, dynamic_steps = self.plan_steps[kind]
+        name_steps = [step for step in dynamic_steps if 'name' in step[1]]
+        other_steps = [step for step in dynamic_steps if 'name' not in step[1]]
+
+        # 分片数多于进程数, 以平衡各分片的耗时
+        names = slots.get('name', [])
+        shard_count = min(len(names), self.workers * 4)
+        shards = [dict(slots, name=names[i::shard_count])
+                  for i in range(shard_count)]
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(_generate_shard, self, kind, shard,
+                                       name_steps)
+                       for shard in shards]
+            if other_steps:
+                futures.append(executor.submit(_generate_shard, self, kind,
+                                               slots, other_steps))
+
+            for future in as_completed(futures):
+                shard, stats = future.result()
+                for name, value in stats.items():
+                    self.stats[name] = self.stats.get(name, 0) + value
+                yield shard
+
+    def _get_static_block(self, kind: str,
+                          slots: Dict[str, List[str]]) -> FrozenSet[str]:
+        """获取与个人信息无关的结果块, 相同输入在进程内只计算一次"""
+        policy_spec = self.policy.to_spec() if self.policy else ''
+        key = (kind, self.length_limits[kind], policy_spec,
+               self.partition) + tuple(
+            tuple(slots.get(slot, ())) for slot in STATIC_SLOTS[kind])
+
+        block = _static_block_cache.get(key)
+        if block is not None:
+            _static_block_stats['hits'] += 1
+            return block
+
+        _static_block_stats['misses'] += 1
+        static_steps, _ = self.plan_steps[kind]
+        block = frozenset(self._run(kind, slots, static_steps, self.stats))
+
+        if len(_static_block_cache) >= STATIC_BLOCK_CACHE_SIZE:
+            # 淘汰最早加入的条目
+            del _static_block_cache[next(iter(_static_block_cache))]
+        _static_block_cache[key] = block
+        return block
+
+    def estimate(self, personal_info: CollectInput, sample: bool = False,
+                 sample_names: int = 3) -> Dict[str, Any]:
+        """估算生成规模, 不生成完整结果
+        Args:
+            personal_info (CollectInput): 个人信息对象
+            sample (bool): 是否抽样若干名字实际生成, 以估计去重后的数量
+            sample_names (int): 抽样使用的名字个数
+        Returns:
+            Dict[str, Any]: 各类型各规则族的组合数上界、预计去重数量、
+                预计耗时 (秒) 和预计内存占用 (字节)
+        """
+        features = self.extract_features(personal_info)
+        all_slots = self._all_slots(personal_info, features, record=False)
+
+        report: Dict[str, Any] = {}
+        total_upper = 0
+        total_expected = 0
+        memory_bytes = 0
+        for kind, slots in all_slots.items():
+            counts = self.plans[kind].count(slots)
+            upper = sum(count for count, _ in counts.values())
+            chars = sum(total for _, total in counts.values())
+            avg_length = chars / upper if upper else 0.0
+
+            entry: Dict[str, Any] = {
+                'families': {family: count
+                             for family, (count, _) in counts.items()},
+                'upper_bound': upper,
+                'avg_length': round(avg_length, 1),
+            }
+            expected = upper
+            if sample:
+                expected = self._sample_unique(kind, slots, sample_names)
+                entry['estimated_unique'] = expected
+
+            report[kind] = entry
+            total_upper += upper
+            total_expected += expected
+            memory_bytes += int(expected * (STR_BASE_SIZE + avg_length +
+                                            SET_ENTRY_OVERHEAD))
+
+        rate = self._measure_rate() * self.workers
+        report['upper_bound'] = total_upper
+        report['estimated_unique'] = total_expected
+        report['estimated_seconds'] = round(total_upper / rate, 2)
+        report['estimated_memory_bytes'] = memory_bytes
+        return report
+
+    def _sample_unique(self, kind: str, slots: Dict[str, List[str]],
+                       sample_names: int) -> int:
+        """抽样若干名字实际生成, 按去重比例推算个性化部分的唯一数量"""
+        static_block = self._get_static_block(kind, slots)
+        _, dynamic_steps = self.plan_steps[kind]
+        plan = self.plans[kind]
+
+        # 均匀抽取名字, 避免只取到同一类名字
+        names = slots.get('name', [])
+        step = max(1, len(names) // max(1, sample_names))
+        sample_slots = dict(slots, name=names[::step][:sample_names])
+        sample_upper = sum(count for count, _ in
+                           plan.count(sample_slots, dynamic_steps).values())
+        if not sample_upper:
+            return len(static_block)
+
+        sample_unique = set(self._run(kind, sample_slots, dynamic_steps)) - static_block  # noqa
+
+        full_upper = sum(count for count, _ in
+                         plan.count(slots, dynamic_steps).values())
+        ratio = len(sample_unique) / sample_upper
+        return len(static_block) + int(full_upper * ratio)
+
+    def _measure_rate(self, size: int = 200) -> float:
+        """粗略测量本机每秒可处理的组合数, 用于估算耗时"""
+        left = ['name%d' % i for i in range(size)]
+        right = ['%d' % i for i in range(size)]
+        seen: Set[str] = set()
+
+        start = time.perf_counter()
+        for candidate in map(''.join, product(left, right)):
+            clean = self._normalize_password(candidate)
+            if clean is not None and clean not in seen:
+                seen.add(clean)
+        elapsed = time.perf_counter() - start
+        return size * size / max(elapsed, 1e-6)
+
+    def _username_slots(self, personal_info: CollectInput,
+                        features: ProfileFeatures) -> Dict[str, List[str]]:
+        """构建用户名规则所需的槽位取值"""
+        slots = {
+            'name': features.base_names,
+            'prefix': COMMON_PREFIX,
+            # 使用个人信息中的自定义后缀和年份
+            'suffix': personal_info.common_suffix,
+            'year': personal_info.regular_years,
+            'company': features.company_parts,
+            'company_sep': [sep for sep in self.common_separators if sep],
+            'birth': [],
+            'email': [],
+            'phone': features.phone_fragments,
+        }
+
+        if personal_info.birthday:
+            slots['birth'] = [part for part in features.birth_parts.values() if part]  # noqa
+
+        if personal_info.email:
+            # example: test@qq.com -> test
+            slots['email'] = [personal_info.email.split('@')[0]]
+
+        return self._dedupe_slots(slots)
+
+    def _password_slots(self, personal_info: CollectInput,
+                        features: ProfileFeatures) -> Dict[str, List[str]]:
+        """构建密码规则所需的槽位取值"""
         if personal_info.special_chars:
             special_chars = personal_info.special_chars
             separators_to_use = COMMON_SEPARATORS + list(special_chars)
         else:
             separators_to_use = COMMON_SEPARATORS
 
-        # 基础名字
-        base_names = self._get_base_names(personal_info)
-
-        # 获取生日和手机号信息
-        birth_parts = personal_info.get_birth_parts()
-        phone_parts = personal_info.get_phone_parts()
-
-        # 公司名
-        company_names = self._get_company_parts(personal_info)
-
-        # 1. 基础名字 + 后缀
-        for name in base_names:
-            for suffix in suffixes_to_use:
-                passwords.add(name + suffix)
-
-        # 2. 基础名字 + 特殊字符 + 后缀
-        for name in base_names:
-            for suffix in suffixes_to_use:
-                for sep in separators_to_use:
-                    passwords.add(name + sep + suffix)
-
-        # 3. 基础名字 + 年份
-        for name in base_names:
-            for year in years_to_use:
-                passwords.add(name + year)
-                passwords.add(year + name)
-
-        # 4. 基础名字 + 特殊字符 + 年份
-        for name in base_names:
-            for year in years_to_use:
-                for sep in separators_to_use:
-                    passwords.add(name + sep + year)
-                    passwords.add(year + sep + name)
-
-        # 5. 前缀 + 后缀
-        for prefix in COMMON_PREFIX:
-            for suffix in suffixes_to_use:
-                passwords.add(prefix + suffix)
-
-        # 6. 前缀 + 特殊字符 + 后缀
-        for prefix in COMMON_PREFIX:
-            for suffix in suffixes_to_use:
-                for sep in separators_to_use:
-                    passwords.add(prefix + sep + suffix)
-
-        # 7. 前缀 + 年份
-        for prefix in COMMON_PREFIX:
-            for year in years_to_use:
-                passwords.add(prefix + year)
-
-        # 8. 前缀 + 特殊字符 + 年份
-        for prefix in COMMON_PREFIX:
-            for year in years_to_use:
-                for sep in separators_to_use:
-                    passwords.add(prefix + sep + year)
-
-        # 9. 基于生日的组合
-        for name in base_names:
-            for part in birth_parts.values():
-                if part:
-                    passwords.add(name + part)
-                    for sep in separators_to_use:
-                        passwords.add(name + sep + part)
-
-        # 10. 基于手机号的组合
-        for name in base_names:
-            for part in phone_parts.values():
-                if part:
-                    passwords.add(name + part)
-                    for sep in separators_to_use:
-                        passwords.add(name + sep + part)
-
-        # 11. 公司名相关组合
-        for name in base_names:
-            for company in company_names:
-                for sep in self.common_separators:
-                    if sep:
-                        passwords.add(name + sep + company)
-                        passwords.add(company + sep + name)
-
-        # 12. 常见密码
-        passwords.update(TOP_100_COMMON_PASSWORDS)
-
-        return self._filter_passwords(passwords)
-
-    def _get_base_names(self, personal_info: CollectInput) -> Set[str]:
-        """获取基础名字集合"""
-        names = set()
-
-        # 直接的名字
-        if personal_info.name_en:
-            # lower + capitalize
-            names.add(personal_info.name_en.lower())
-            names.add(personal_info.name_en.capitalize())
-            names.update(self._split_english_name(personal_info.name_en))
-
-        if personal_info.nickname_en:
-            # lower + capitalize
-            names.add(personal_info.nickname_en.lower())
-            names.add(personal_info.nickname_en.capitalize())
-
-        if personal_info.username:
-            # lower + capitalize
-            names.add(personal_info.username.lower())
-            names.add(personal_info.username.capitalize())
-
-        # 中文名的拼音
-        if personal_info.name_zh:
-            try:
-                pinyin_creator = NamePinyinCreator(personal_info.name_zh,
-                                                   personal_info.nickname_zh)
-                names.update(pinyin_creator.run())
-            except Exception as e:
-                print(f"⚠️ 拼音生成警告: {e}")
-
-        # 首字母组合
-        try:
-            initial_creator = NameInitialCreator(
-                personal_info.name_zh,
-                personal_info.name_en,
-                personal_info.nickname_zh,
-                personal_info.nickname_en
-            )
-            names.update(initial_creator.run())
-        except Exception as e:
-            print(f"⚠️ 首字母组合生成警告: {e}")
-
-        return names
-
-    def _split_english_name(self, name: str) -> Set[str]:
-        """分解英文名"""
-        names = set()
-        clean_name = re.sub(r'[^a-zA-Z\s]', '', name)
-        words = clean_name.lower().split()
-
-        for word in words:
-            if len(word) >= 2:
-                names.add(word)
-
-        return names
+        slots = {
+            'name': features.base_names,
+            'prefix': COMMON_PREFIX,
+            'suffix': personal_info.common_suffix,
+            'year': personal_info.regular_years,
+            'sep': separators_to_use,
+            'birth': [part for part in features.birth_parts.values() if part],  # noqa
+            'phone': [part for part in features.phone_parts.values() if part],  # noqa
+            'company': features.company_parts,
+            'company_sep': [sep for sep in self.common_separators if sep],
+            'common': load_top_100_passwords(),
+        }
+        return self._dedupe_slots(slots)
+
+    def _dedupe_slots(self, slots: Dict[str, Iterable[str]]) -> Dict[str, List[str]]:  # noqa
+        """槽位内去重 (保持顺序), 避免重复值放大笛卡尔积"""
+        return {slot: list(dict.fromkeys(values))
+                for slot, values in slots.items()}
 
     def _extract_birthday_parts(self, birthday: str) -> List[str]:
         """提取生日相关信息"""
@@ -278,61 +527,13 @@ class Combo:
 
         return parts
 
-    def _get_company_parts(self, personal_info: CollectInput) -> List[str]:
-        """获取公司相关信息"""
-        parts: List[str] = []
-
-        if personal_info.company_en:
-            clean_company = re.sub(r'[^a-zA-Z\s]', '',
-                                   personal_info.company_en)
-            words = clean_company.lower().split()
-            parts.extend(word for word in words if len(word) >= 2)
-
-        if personal_info.company_zh:
-            company_pinyin = NamePinyinCreator(name_zh=personal_info.company_zh).run()  # noqa
-            company_initial = NameInitialCreator(name_zh=personal_info.company_zh).run()  # noqa
-            parts.extend(list(company_pinyin))
-            parts.extend(list(company_initial))
-
-        if personal_info.department_en:
-            clean_dept = re.sub(r'[^a-zA-Z\s]', '',
-                                personal_info.department_en)
-            words = clean_dept.lower().split()
-            parts.extend(word for word in words if len(word) >= 2)
-
-        return parts
-
-    def _extract_phone_parts(self, phone: str) -> List[str]:
-        """提取手机号相关信息"""
-        parts = []
-        digits = re.findall(r'\d', phone)
-
-        if len(digits) >= 4:
-            # 后四位
-            parts.append(''.join(digits[-4:]))
-
-            # 后六位
-            if len(digits) >= 6:
-                parts.append(''.join(digits[-6:]))
-
-            # 中间四位 (如果是11位手机号)
-            if len(digits) == 11:
-                parts.append(''.join(digits[3:7]))
-
-        return parts
-
     def _filter_usernames(self, usernames: Set[str]) -> Set[str]:
         """过滤用户名"""
         filtered = set()
-        min_length = 3
-        max_length = 20
 
         for username in usernames:
-            # 清理字符串
-            clean = username.strip().lower()
-
-            # 长度检查
-            if min_length <= len(clean) <= max_length:
+            clean = self._normalize_username(username)
+            if clean is not None:
                 filtered.add(clean)
 
         return filtered
@@ -340,20 +541,51 @@ class Combo:
     def _filter_passwords(self, passwords: Set[str]) -> Set[str]:
         """过滤密码"""
         filtered = set()
-        min_length = 4
 
         for password in passwords:
-            # 长度检查
-            if len(password) >= min_length:
-                # 去掉明显无效的组合
-                if not password.isspace() and password.strip():
-                    filtered.add(password.strip())
+            clean = self._normalize_password(password)
+            if clean is not None:
+                filtered.add(clean)
 
         return filtered
 
+    def _normalize_username(self, username: str) -> Optional[str]:
+        """清理单个用户名, 不符合要求时返回None"""
+        min_length, max_length = self.length_limits['usernames']
+
+        # 清理字符串
+        clean = username.strip().lower()
+
+        # 长度检查
+        if min_length <= len(clean) and (max_length is None or len(clean) <= max_length):  # noqa
+            return clean
+        return None
+
+    def _normalize_password(self, password: str) -> Optional[str]:
+        """清理单个密码, 不符合要求时返回None"""
+        min_length, max_length = self.length_limits['passwords']
+
+        # 长度检查
+        if len(password) >= min_length and (max_length is None or len(password.strip()) <= max_length):  # noqa
+            # 去掉明显无效的组合
+            if not password.isspace() and password.strip():
+                clean = password.strip()
+                if self.policy is None or self.policy.allows(clean):
+                    return clean
+        return None
+
     def generate_all_combinations(self, personal_info: CollectInput) -> Dict[str, Set[str]]:  # noqa
         """生成所有组合"""
+        features = self.extract_features(personal_info)
+        return {
+            'usernames': self.generate_usernames(personal_info, features),
+            'passwords': self.generate_passwords(personal_info, features)
+        }
+
+    def iter_all_combinations(self, personal_info: CollectInput) -> Dict[str, Iterator[str]]:  # noqa
+        """以迭代器形式返回所有组合, 可直接交给 save_dictionaries 流式写出"""
+        features = self.extract_features(personal_info)
         return {
-            'usernames': self.generate_usernames(personal_info),
-            'passwords': self.generate_passwords(personal_info)
+            'usernames': self.iter_usernames(personal_info, features),
+            'passwords': self.iter_passwords(personal_info, features)
         }
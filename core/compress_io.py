@@ -0,0 +1,250 @@
+import bz2
+import gzip
+import hashlib
+import lzma
+import queue
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Optional, Union
+
+# 支持的压缩格式及对应的文件扩展名
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz'}
+
+# 各格式的默认压缩级别 (gzip 与命令行 gzip 的默认值一致, 9 级慢很多而收益很小)
+COMPRESSION_LEVELS = {'gzip': 6, 'bz2': 9, 'xz': 6}
+
+# 文件头魔数, 读取时据此识别压缩格式 (不依赖扩展名)
+COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+)
+
+# 每次拼接编码后整体写出的条目数
+WRITE_BATCH = 1 << 14
+
+# 未压缩输出的写缓冲区大小, 以及后台压缩线程每次接收的数据量
+WRITE_BUFFER_SIZE = 1 << 20
+
+# 后台压缩线程最多积压的数据块数, 超过时写入方等待
+THREAD_QUEUE_SIZE = 8
+
+PathLike = Union[str, Path]
+
+
+def compression_from_suffix(path: PathLike) -> Optional[str]:
+    """按扩展名判断压缩格式, 不是压缩文件时返回 None"""
+    suffix = Path(path).suffix.lower()
+    for compression, known in COMPRESSION_SUFFIXES.items():
+        if suffix == known:
+            return compression
+    return None
+
+
+def detect_compression(path: PathLike) -> Optional[str]:
+    """按文件头判断压缩格式, 不是压缩文件时返回 None"""
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for magic, compression in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def compressed_path(path: PathLike, compression: Optional[str]) -> Path:
+    """为输出文件加上压缩格式的扩展名 (已有时不重复添加)"""
+    path = Path(path)
+    if compression is None:
+        return path
+    suffix = COMPRESSION_SUFFIXES[compression]
+    if path.suffix.lower() == suffix:
+        return path
+    return path.with_name(path.name + suffix)
+
+
+def open_writer(path: PathLike, compression: Optional[str] = None,
+                threaded: bool = False,
+                fileobj: Optional[Any] = None) -> BinaryIO:
+    """打开二进制输出, 按需压缩
+    Args:
+        path (PathLike): 输出文件路径
+        compression (Optional[str]): gzip / bz2 / xz, 为 None 时按扩展名判断
+        threaded (bool): 是否在后台线程中压缩写出, 与调用方的生成过程重叠
+        fileobj (Optional[Any]): 提供时数据写入该对象而不是打开 path, 由调用方
+            关闭; 不压缩且不使用线程时直接返回它本身
+    Returns:
+        BinaryIO: 可 write / close 的二进制文件对象
+    """
+    if compression is None:
+        compression = compression_from_suffix(path)
+    if compression is not None and compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"不支持的压缩格式: {compression}")
+
+    if compression is None:
+        f = fileobj if fileobj is not None else open(path, 'wb', buffering=WRITE_BUFFER_SIZE)  # noqa
+        if not threaded:
+            return f
+        # 未压缩时后台线程只负责写盘; 调用方的 fileobj 由调用方关闭
+        return ThreadedWriter(f, close_file=fileobj is None)  # type: ignore
+
+    level = COMPRESSION_LEVELS[compression]
+    target = fileobj if fileobj is not None else path
+    if compression == 'gzip':
+        f = gzip.GzipFile(filename=None if fileobj is not None else str(path),
+                          mode='wb', compresslevel=level,
+                          fileobj=fileobj)
+    elif compression == 'bz2':
+        f = bz2.BZ2File(target, 'wb', compresslevel=level)
+    else:
+        f = lzma.LZMAFile(target, 'wb', preset=level)
+    return ThreadedWriter(f) if threaded else f  # type: ignore
+
+
+def open_reader(path: PathLike) -> BinaryIO:
+    """打开二进制输入, 压缩文件按文件头自动解压"""
+    compression = detect_compression(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')  # type: ignore
+    if compression == 'bz2':
+        return bz2.open(path, 'rb')  # type: ignore
+    if compression == 'xz':
+        return lzma.open(path, 'rb')  # type: ignore
+    return open(path, 'rb')
+
+
+def write_lines(f: Any, words: Iterable[str]) -> int:
+    """把条目按行分批编码写入二进制文件对象, 返回条目数"""
+    count = 0
+    batch = []
+    for word in words:
+        batch.append(word)
+        if len(batch) >= WRITE_BATCH:
+            f.write(('\n'.join(batch) + '\n').encode('utf-8'))
+            count += len(batch)
+            batch = []
+    if batch:
+        f.write(('\n'.join(batch) + '\n').encode('utf-8'))
+        count += len(batch)
+    return count
+
+
+def write_pairs(f: Any, usernames: Iterable[str],
+                passwords: Iterable[str]) -> int:
+    """按 "用户名:密码" 逐行写出全部组合, 返回写出的行数
+
+    外层是密码、内层是用户名: 每个密码先对所有用户名尝试一遍, 适合密码喷洒
+    (避免同一账号连续失败触发锁定). 用户名会全部读入内存, 密码流式读取.
+    """
+    prefixes = [username + ':' for username in usernames]
+    if not prefixes:
+        return 0
+
+    count = 0
+    pending = []
+    pending_lines = 0
+    for password in passwords:
+        line_end = password + '\n'
+        pending.append(line_end.join(prefixes) + line_end)
+        pending_lines += len(prefixes)
+        if pending_lines >= WRITE_BATCH:
+            f.write(''.join(pending).encode('utf-8'))
+            count += pending_lines
+            pending = []
+            pending_lines = 0
+    if pending:
+        f.write(''.join(pending).encode('utf-8'))
+        count += pending_lines
+    return count
+
+
+class HashingWriter:
+    """透传写入并记录字节数和 SHA-256 的文件包装"""
+
+    def __init__(self, f: Any) -> None:
+        self._file = f
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        self.bytes += len(data)
+        return self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ThreadedWriter:
+    """在后台线程中写出 (和压缩) 数据
+
+    写入方只把数据攒成大块放入有界队列, 压缩和写盘在后台线程完成.
+    zlib / bz2 / lzma 压缩时会释放 GIL, 因此可以与生成过程并行.
+    后台线程出错时, 错误在下一次 write 或 close 时抛出.
+    """
+
+    def __init__(self, f: Any, close_file: bool = True) -> None:
+        self._file = f
+        self._close_file = close_file
+        self._buffer = bytearray()
+        self._queue: 'queue.Queue[Optional[bytes]]' = queue.Queue(THREAD_QUEUE_SIZE)  # noqa
+        self._error: Optional[BaseException] = None
+        self.closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> 'ThreadedWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, data: bytes) -> int:
+        if self._error is not None:
+            raise self._error
+        if len(data) >= WRITE_BUFFER_SIZE:
+            # 大块数据 (如 CompactResultStore 的字节块) 不再复制进缓冲区
+            self.flush()
+            self._queue.put(bytes(data))
+            return len(data)
+        self._buffer += data
+        if len(self._buffer) >= WRITE_BUFFER_SIZE:
+            self._queue.put(bytes(self._buffer))
+            self._buffer.clear()
+        return len(data)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._queue.put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            if self._close_file:
+                self._file.close()
+            else:
+                self._file.flush()
+        finally:
+            if self._error is not None:
+                raise self._error
+
+    def _run(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            if self._error is not None:
+                # 出错后继续取走数据, 避免写入方阻塞在队列上
+                continue
+            try:
+                self._file.write(data)
+            except BaseException as e:
+                self._error = e
@@ -1,6 +1,7 @@
 import re
 from typing import Set
 from itertools import combinations as iter_combinations, permutations as iter_permutations  # noqa
+from .pinyin_cache import lazy_pinyin  # type: ignore
 
 
 class NameInitialCreator:
@@ -68,8 +69,6 @@ class NameInitialCreator:
             return set()
 
         try:
-            from pypinyin import lazy_pinyin
-
             # 获取拼音首字母
             pinyin_list = lazy_pinyin(name)
             initials = ''.join(py[0].lower() for py in pinyin_list)
@@ -123,8 +122,6 @@ class NameInitialCreator:
 
         # 中文名首字母 (拼音)
         try:
-            from pypinyin import lazy_pinyin
-
             if self.name_zh:
                 zh_pinyin = lazy_pinyin(self.name_zh)
                 for py in zh_pinyin:
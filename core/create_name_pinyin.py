@@ -1,6 +1,6 @@
 import re
 from typing import Set
-from pypinyin import lazy_pinyin
+from .pinyin_cache import lazy_pinyin  # type: ignore
 
 
 class NamePinyinCreator:
@@ -0,0 +1,187 @@
+import atexit
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+# 每个连接的页缓存大小 (字节) 和内存映射大小 (字节)
+DEFAULT_CACHE_SIZE = 64 << 20
+DEFAULT_MMAP_SIZE = 256 << 20
+
+# 读连接池的最大连接数
+DEFAULT_READERS = 4
+
+# 等待数据库锁的超时时间 (秒)
+BUSY_TIMEOUT = 30.0
+
+# 每个连接缓存的预编译语句数量
+CACHED_STATEMENTS = 256
+
+_managers: Dict[Tuple[int, str], 'ConnectionManager'] = {}
+_managers_lock = threading.Lock()
+
+
+def get_manager(db_path: Union[str, Path],
+                cache_size: Optional[int] = None,
+                mmap_size: Optional[int] = None) -> 'ConnectionManager':
+    """获取数据库文件共享的连接管理器, 同一进程内相同路径只创建一个
+    Args:
+        db_path (Union[str, Path]): 数据库文件路径
+        cache_size (Optional[int]): 提供时修改每个连接的页缓存大小 (字节)
+        mmap_size (Optional[int]): 提供时修改每个连接的内存映射大小 (字节)
+    Returns:
+        ConnectionManager: 连接管理器
+    """
+    # 按进程区分, 子进程不会复用父进程 fork 过来的连接
+    key = (os.getpid(), os.path.abspath(db_path))
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = ConnectionManager(db_path)
+    if cache_size is not None or mmap_size is not None:
+        manager.configure(cache_size, mmap_size)
+    return manager
+
+
+def close_all() -> None:
+    """关闭当前进程中所有连接管理器的连接"""
+    with _managers_lock:
+        managers = [manager for (pid, _), manager in _managers.items()
+                    if pid == os.getpid()]
+        _managers.clear()
+    for manager in managers:
+        manager.close()
+
+
+atexit.register(close_all)
+
+
+class ConnectionManager:
+    """同一数据库文件共享的 SQLite 连接
+
+    一个写连接 (加锁串行使用) 加一个按需创建的读连接池. 数据库使用 WAL
+    日志模式, 大批量保存进行中时读连接仍可以读取已提交的数据. 连接长期保持,
+    页缓存和预编译语句缓存在多次调用之间复用.
+    """
+
+    def __init__(self, db_path: Union[str, Path],
+                 readers: int = DEFAULT_READERS,
+                 cache_size: int = DEFAULT_CACHE_SIZE,
+                 mmap_size: int = DEFAULT_MMAP_SIZE) -> None:
+        self.db_path = str(db_path)
+        self.max_readers = max(1, readers)
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+
+        self._write_lock = threading.RLock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_depth = 0
+
+        self._pool = threading.Condition()
+        self._idle: List[sqlite3.Connection] = []
+        self._reader_count = 0
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """独占写连接, 正常退出时提交, 出错时回滚 (嵌套使用时由最外层提交)"""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._connect(readonly=False)
+            conn = self._writer
+            self._write_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                if self._write_depth == 1:
+                    conn.rollback()
+                raise
+            else:
+                if self._write_depth == 1:
+                    conn.commit()
+            finally:
+                self._write_depth -= 1
+
+    @property
+    def write_depth(self) -> int:
+        """写连接的嵌套层数, 只在持有写连接的线程中有意义"""
+        return self._write_depth
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """从连接池借用一个只读连接, 连接池用满时等待归还"""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            self._release_reader(conn)
+
+    def configure(self, cache_size: Optional[int] = None,
+                  mmap_size: Optional[int] = None) -> None:
+        """修改页缓存和内存映射大小, 对已有的空闲连接立即生效"""
+        if cache_size is not None:
+            self.cache_size = cache_size
+        if mmap_size is not None:
+            self.mmap_size = mmap_size
+
+        with self._write_lock:
+            if self._writer is not None:
+                self._apply_pragmas(self._writer)
+        with self._pool:
+            for conn in self._idle:
+                self._apply_pragmas(conn)
+
+    def close(self) -> None:
+        """关闭写连接和空闲的读连接"""
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._pool:
+            for conn in self._idle:
+                conn.close()
+            self._reader_count -= len(self._idle)
+            self._idle.clear()
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        with self._pool:
+            while not self._idle and self._reader_count >= self.max_readers:
+                self._pool.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._reader_count += 1
+
+        try:
+            return self._connect(readonly=True)
+        except Exception:
+            with self._pool:
+                self._reader_count -= 1
+                self._pool.notify()
+            raise
+
+    def _release_reader(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        with self._pool:
+            self._idle.append(conn)
+            self._pool.notify()
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT,
+                               check_same_thread=False,
+                               cached_statements=CACHED_STATEMENTS)
+        if readonly:
+            conn.execute('PRAGMA query_only = ON')
+        else:
+            # WAL 模式写入数据库文件, 之后所有连接都生效
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        self._apply_pragmas(conn)
+        return conn
+
+    def _apply_pragmas(self, conn: sqlite3.Connection) -> None:
+        # cache_size 为负数时单位是 KiB
+        conn.execute(f'PRAGMA cache_size = -{max(1, self.cache_size // 1024)}')  # noqa
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
@@ -0,0 +1,117 @@
+import mmap
+import os
+from typing import Iterator, List, Optional, Set
+from .compress_io import detect_compression, open_reader  # type: ignore
+
+# 每次从映射中取出并按换行切分的字节数 (块越大, 切分出的行对象占用的临时内存越多)
+MMAP_CHUNK_SIZE = 1 << 20
+
+# 逐行解码时依次尝试的编码
+FALLBACK_ENCODINGS = ('utf-8', 'gbk')
+
+UTF8_BOM = b'\xef\xbb\xbf'
+
+
+class DictionaryReader:
+    """基于 mmap 的外部字典读取器
+
+    按块读取, 每块只含完整的行, 整块能按 UTF-8 解码时一次解码再切分,
+    否则逐行在 UTF-8 / GBK 之间回退, 都失败的行跳过. 不另外保存整个文件的
+    去重集合, 重复行在并入调用方的结果集合时去掉.
+    gzip / bz2 / xz 压缩的字典按文件头识别, 边解压边按块读取.
+    产出的条目与按文本模式逐行 strip() 的结果一致.
+    """
+
+    def __init__(self, file_path: str,
+                 chunk_size: int = MMAP_CHUNK_SIZE) -> None:
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.stats = {'lines': 0, 'fallback_decoded': 0, 'undecodable': 0}
+
+    def merge_into(self, words: Set[str]) -> None:
+        """把全部条目直接并入集合, 每行只做一次哈希插入"""
+        had_empty = '' in words
+        for block in self._iter_line_blocks():
+            words.update(map(str.strip, self._decode_lines(block)))
+        if not had_empty:
+            words.discard('')
+
+    def iter_chunks(self) -> Iterator[Set[str]]:
+        """按块产出条目集合, 只在块内去重, 内存占用与块大小相当"""
+        for block in self._iter_line_blocks():
+            # 与文本模式逐行 strip() 一致, 去掉 Unicode 空白并跳过空行
+            words = set(map(str.strip, self._decode_lines(block)))
+            words.discard('')
+            yield words
+
+    def iter_words(self) -> Iterator[str]:
+        """逐个产出条目 (块内去重)"""
+        for words in self.iter_chunks():
+            yield from words
+
+    def _iter_line_blocks(self) -> Iterator[bytes]:
+        """按块产出只含完整行的原始字节 (末尾的换行符已去掉)"""
+        tail = b''
+        first = True
+        for chunk in self._iter_blocks():
+            # 文本模式下 \r 和 \r\n 也是换行符; 跨块的 \r\n 只会多出空行
+            if b'\r' in chunk:
+                chunk = chunk.replace(b'\r\n', b'\n').replace(b'\r', b'\n')  # noqa
+
+            end = chunk.rfind(b'\n')
+            if end < 0:
+                tail += chunk
+                continue
+            block = tail + chunk[:end]
+            tail = chunk[end + 1:]
+            if first and block.startswith(UTF8_BOM):
+                block = block[len(UTF8_BOM):]
+            first = False
+            self.stats['lines'] += block.count(b'\n') + 1
+            yield block
+
+        if first and tail.startswith(UTF8_BOM):
+            tail = tail[len(UTF8_BOM):]
+        if tail:
+            # 最后一行没有换行符
+            self.stats['lines'] += 1
+            yield tail
+
+    def _iter_blocks(self) -> Iterator[bytes]:
+        """按 chunk_size 产出文件内容; 压缩文件边解压边读取, 否则通过 mmap"""
+        if detect_compression(self.file_path):
+            with open_reader(self.file_path) as f:
+                while True:
+                    block = f.read(self.chunk_size)
+                    if not block:
+                        return
+                    yield block
+
+        with open(self.file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for pos in range(0, size, self.chunk_size):
+                    yield mm[pos:pos + self.chunk_size]
+
+    def _decode_lines(self, block: bytes) -> List[str]:
+        """解码一块中的全部行 (未 strip, 含空行)"""
+        try:
+            return block.decode('utf-8').split('\n')
+        except UnicodeDecodeError:
+            return [word for word in map(self._decode_line, block.split(b'\n'))  # noqa
+                    if word is not None]
+
+    def _decode_line(self, raw: bytes) -> Optional[str]:
+        for encoding in FALLBACK_ENCODINGS:
+            try:
+                word = raw.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+            if encoding != FALLBACK_ENCODINGS[0]:
+                self.stats['fallback_decoded'] += 1
+            return word
+        self.stats['undecodable'] += 1
+        return None
@@ -0,0 +1,182 @@
+import heapq
+import os
+import re
+import shutil
+import tempfile
+from typing import Iterable, Iterator, List, Optional, Set
+from .compress_io import detect_compression  # type: ignore
+
+# 估算内存时每个条目的额外开销: 字符串对象头 + 集合槽位
+ENTRY_OVERHEAD = 90
+
+# 估算外部字典条目数时假设的平均行长 (字节, 含换行)
+AVG_LINE_BYTES = 10
+
+# 压缩字典无法廉价得知解压后的大小, 按字典文件常见的压缩比估算
+COMPRESSION_RATIO = 8
+
+# 一次归并同时打开的顺串文件数上限, 超过时先分批归并
+MAX_MERGE_FANIN = 64
+
+# 顺串文件读写缓冲区大小
+RUN_BUFFER_SIZE = 1 << 20
+
+SIZE_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def parse_size(text: str) -> int:
+    """解析 512M / 2G / 1048576 形式的大小, 返回字节数"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*', text,
+                         re.IGNORECASE)
+    if not match:
+        raise ValueError(f"无效的大小: {text}")
+    number, unit = match.groups()
+    return int(float(number) * SIZE_UNITS[unit.upper()])
+
+
+def estimate_words_bytes(words: Iterable[str]) -> int:
+    """估算一组字符串放在集合中占用的内存"""
+    return sum(len(word) + ENTRY_OVERHEAD for word in words)
+
+
+def estimate_file_bytes(file_path: str) -> int:
+    """估算把字典文件读入集合后占用的内存"""
+    size = os.path.getsize(file_path)
+    if size and detect_compression(file_path):
+        size *= COMPRESSION_RATIO
+    return size + size // AVG_LINE_BYTES * ENTRY_OVERHEAD
+
+
+class ExternalSorter:
+    """外部排序去重: 内存中的条目超过预算时排序写成临时顺串文件,
+    最后用 heapq.merge 多路归并并过滤重复, 按字典序产出唯一条目.
+
+    用法:
+        with ExternalSorter(512 << 20) as sorter:
+            sorter.add_many(words)
+            for word in sorter:
+                ...
+    """
+
+    def __init__(self, memory_budget: int,
+                 tmp_dir: Optional[str] = None) -> None:
+        self.memory_budget = max(1, memory_budget)
+        self.tmp_dir = tmp_dir
+
+        self._buffer: Set[str] = set()
+        self._buffer_bytes = 0
+        self._runs: List[str] = []
+        self._run_dir: Optional[str] = None
+        self._run_seq = 0
+
+    def __enter__(self) -> 'ExternalSorter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def run_count(self) -> int:
+        """已写出的顺串文件数"""
+        return len(self._runs)
+
+    def add(self, word: str) -> None:
+        """加入一个条目"""
+        if word in self._buffer:
+            return
+        self._buffer.add(word)
+        self._buffer_bytes += len(word) + ENTRY_OVERHEAD
+        if self._buffer_bytes >= self.memory_budget:
+            self._spill()
+
+    def add_many(self, words: Iterable[str]) -> None:
+        """加入多个条目"""
+        for word in words:
+            self.add(word)
+
+    def __iter__(self) -> Iterator[str]:
+        """按字典序产出去重后的全部条目"""
+        if not self._runs:
+            yield from sorted(self._buffer)
+            return
+
+        # 剩余的内存条目也写成顺串, 归并时内存只保留每个顺串的读缓冲
+        self._spill()
+        while len(self._runs) > MAX_MERGE_FANIN:
+            self._merge_runs(self._runs[:MAX_MERGE_FANIN])
+
+        files = [open(path, 'r', encoding='utf-8', newline='\n',
+                      buffering=RUN_BUFFER_SIZE) for path in self._runs]
+        try:
+            previous = None
+            for word in heapq.merge(*(self._read_run(f) for f in files)):
+                if word != previous:
+                    yield word
+                    previous = word
+        finally:
+            for f in files:
+                f.close()
+
+    def close(self) -> None:
+        """删除临时顺串文件"""
+        self._buffer = set()
+        self._buffer_bytes = 0
+        self._runs = []
+        if self._run_dir is not None:
+            shutil.rmtree(self._run_dir, ignore_errors=True)
+            self._run_dir = None
+
+    def _read_run(self, f) -> Iterator[str]:
+        for line in f:
+            yield line[:-1]
+
+    def _new_run_path(self) -> str:
+        if self._run_dir is None:
+            self._run_dir = tempfile.mkdtemp(prefix='social_eng_sort_',
+                                             dir=self.tmp_dir)
+        self._run_seq += 1
+        return os.path.join(self._run_dir, f"run_{self._run_seq:06d}.txt")
+
+    def _write_run(self, words: Iterable[str]) -> None:
+        path = self._new_run_path()
+        with open(path, 'w', encoding='utf-8', newline='\n',
+                  buffering=RUN_BUFFER_SIZE) as f:
+            f.writelines(word + '\n' for word in words)
+        self._runs.append(path)
+
+    def _spill(self) -> None:
+        """把内存中的条目排序后写成一个顺串"""
+        if not self._buffer:
+            return
+        words = sorted(self._buffer)
+        self._buffer = set()
+        self._buffer_bytes = 0
+        self._write_run(words)
+
+    def _merge_runs(self, paths: List[str]) -> None:
+        """把若干顺串归并成一个, 减少最终归并时打开的文件数"""
+        files = [open(path, 'r', encoding='utf-8', newline='\n',
+                      buffering=RUN_BUFFER_SIZE) for path in paths]
+        try:
+            merged = heapq.merge(*(self._read_run(f) for f in files))
+            previous = None
+            unique = []
+            out_path = self._new_run_path()
+            with open(out_path, 'w', encoding='utf-8', newline='\n',
+                      buffering=RUN_BUFFER_SIZE) as out:
+                for word in merged:
+                    if word != previous:
+                        unique.append(word + '\n')
+                        previous = word
+                        if len(unique) >= 8192:
+                            out.writelines(unique)
+                            unique.clear()
+                out.writelines(unique)
+        finally:
+            for f in files:
+                f.close()
+
+        for path in paths:
+            os.remove(path)
+        self._runs = [path for path in self._runs if path not in paths]
+        self._runs.append(out_path)
@@ -0,0 +1,119 @@
+import math
+from array import array
+from typing import Any, Dict
+
+MASK64 = (1 << 64) - 1
+
+# 默认最大装载因子, 超过时容量翻倍
+FINGERPRINT_MAX_LOAD = 0.7
+
+
+class FingerprintSet:
+    """只保存 64 位指纹的去重集合
+
+    用线性探测的开放寻址表 (array('Q')) 记录见过的条目的 64 位哈希,
+    不保留字符串本身, 每个条目只占 8 / 装载因子 字节. 两个不同条目指纹
+    相同时后者会被误判为重复而丢弃, n 个条目的期望误判数约为 n²/2⁶⁵,
+    千万级条目时仍远小于 1, 见 collision_report().
+
+    指纹基于 Python 内置 hash(), 只在同一进程内有效.
+    """
+
+    def __init__(self, capacity: int = 1 << 16,
+                 max_load: float = FINGERPRINT_MAX_LOAD) -> None:
+        if not 0 < max_load < 1:
+            raise ValueError("max_load 必须在 0 和 1 之间")
+        size = 8
+        while size < capacity:
+            size <<= 1
+        self.max_load = max_load
+        self._table = array('Q', bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+        self._limit = int(size * max_load)
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, item: object) -> bool:
+        fingerprint = self.fingerprint(item)
+        table = self._table
+        mask = self._mask
+        index = fingerprint & mask
+        while True:
+            slot = table[index]
+            if slot == fingerprint:
+                return True
+            if slot == 0:
+                return False
+            index = (index + 1) & mask
+
+    @staticmethod
+    def fingerprint(item: object) -> int:
+        """条目的 64 位指纹, 0 保留为空槽"""
+        return (hash(item) & MASK64) or 1
+
+    def add(self, item: object) -> bool:
+        """加入条目
+        Args:
+            item (object): 可哈希的条目, 通常是字符串
+        Returns:
+            bool: 是新条目时为 True, 指纹已存在 (视为重复) 时为 False
+        """
+        fingerprint = (hash(item) & MASK64) or 1
+        table = self._table
+        mask = self._mask
+        index = fingerprint & mask
+        while True:
+            slot = table[index]
+            if slot == 0:
+                break
+            if slot == fingerprint:
+                self.duplicates += 1
+                return False
+            index = (index + 1) & mask
+
+        table[index] = fingerprint
+        self._count += 1
+        if self._count > self._limit:
+            self._grow()
+        return True
+
+    @property
+    def capacity(self) -> int:
+        return self._mask + 1
+
+    @property
+    def nbytes(self) -> int:
+        """指纹表占用的字节数"""
+        return self._table.itemsize * len(self._table)
+
+    def collision_report(self) -> Dict[str, Any]:
+        """按生日界估算的指纹碰撞 (误判丢弃) 情况"""
+        n = self._count
+        expected = n * (n - 1) / 2 / 2 ** 64
+        return {
+            'entries': self._count,
+            'duplicates': self.duplicates,
+            'capacity': self.capacity,
+            'nbytes': self.nbytes,
+            'expected_collisions': expected,
+            'collision_probability': -math.expm1(-expected),
+        }
+
+    def _grow(self) -> None:
+        """容量翻倍并重新放置所有指纹"""
+        old = self._table
+        size = len(old) * 2
+        table = array('Q', bytes(8 * size))
+        mask = size - 1
+        for fingerprint in old:
+            if fingerprint:
+                index = fingerprint & mask
+                while table[index]:
+                    index = (index + 1) & mask
+                table[index] = fingerprint
+        self._table = table
+        self._mask = mask
+        self._limit = int(size * self.max_load)
@@ -22,6 +22,47 @@ def get_parser() -> argparse.ArgumentParser:
                         help='输出目录 (默认: output)')
     parser.add_argument('--db-path', type=str, default='social_eng_results.db',
                         help='数据库文件路径 (默认: social_eng_results.db)')
+    parser.add_argument('--db-cache-size', type=str,
+                        help='每个数据库连接的页缓存大小 (如 64M, 默认: 64M)')
+    parser.add_argument('--db-mmap-size', type=str,
+                        help='数据库内存映射读取的大小 (如 1G, 0 表示关闭, 默认: 256M)')
+    parser.add_argument('--batch', type=str,
+                        help='批量目标文件 (JSONL 或 CSV), 每条记录生成到输出目录下的一个子目录')
+    parser.add_argument('--stream', action='store_true',
+                        help='流式生成并直接写出字典 (不排序, 不在内存中保留结果)')
+    parser.add_argument('--stdout',
+                        choices=['usernames', 'passwords', 'pairs'],
+                        help='边生成边把用户名 / 密码 / "用户名:密码" 组合写到标准输出, '
+                             '供其他工具通过管道读取 (提示信息改写到标准错误)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='并行生成使用的进程数 (默认: 1, 即单进程)')
+    parser.add_argument('--compress', choices=['gzip', 'bz2', 'xz'],
+                        help='压缩输出的字典和导出文件 (扩展名 .gz / .bz2 / .xz)')
+    parser.add_argument('--compress-thread', action='store_true',
+                        help='在后台线程中压缩写出, 与生成过程重叠')
+    parser.add_argument('--partition', type=str,
+                        help='只生成 n 个互不重叠的分区中的第 i 个 (格式 i/n, 例: 2/8), '
+                             '各机器分别运行不同分区, 结果合起来等于完整字典')
+    parser.add_argument('--shard-size', type=int,
+                        help='按顺序每 N 个条目写一个编号分片文件, 并生成 manifest.json')
+    parser.add_argument('--shards', type=int,
+                        help='把条目轮流写入 K 个编号分片文件, 并生成 manifest.json')
+    parser.add_argument('--top-k', type=int,
+                        help='只保留得分最高的 N 个用户名和密码, 按得分从高到低写出')
+    parser.add_argument('--dedup', choices=['exact', 'fingerprint'],
+                        default='exact',
+                        help='去重方式: exact 保存完整字符串; fingerprint 只保存 64 位指纹, '
+                             '适合超大规模 --stream (极小概率误丢条目)')
+    parser.add_argument('--compact', action='store_true',
+                        help='结果以紧凑的有序字节块保存, 大幅降低超大字典的内存占用')
+    parser.add_argument('--memory-budget', type=str,
+                        help='内存预算 (如 512M, 2G), 合并外部字典超出时改用磁盘外部排序 (默认: 1G)')
+    parser.add_argument('--pinyin-cache', type=str,
+                        help='拼音持久缓存文件 (SQLite), 跨运行复用拼音转换结果')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='只估算各规则族的组合数、耗时和内存, 不生成字典')
+    parser.add_argument('--dry-run-sample', action='store_true',
+                        help='同 --dry-run, 并抽样生成以估计去重后的数量')
 
     # 个人信息参数
     parser.add_argument('--name-zh', type=str, help='中文姓名')
@@ -42,6 +83,9 @@ def get_parser() -> argparse.ArgumentParser:
                         help='自定义后缀/前缀，用逗号分隔 (例: 666,888,love)')
     parser.add_argument('--custom-years', type=str,
                         help='自定义年份，用逗号分隔 (例: 1995,2020)')
+    parser.add_argument('--password-policy', type=str,
+                        help='目标密码策略, 只生成符合策略的密码 '
+                             '(例: min=8,max=16,digit,upper,lower,special)')
 
     # 数据库相关参数
     parser.add_argument('--load-task', type=int,
@@ -56,6 +100,14 @@ def get_parser() -> argparse.ArgumentParser:
                         help='删除指定任务')
     parser.add_argument('--db-stats', action='store_true',
                         help='显示数据库统计信息')
+    parser.add_argument('--search-words', type=str,
+                        help='在所有任务保存的用户名和密码中搜索子串')
+    parser.add_argument('--search-prefix', action='store_true',
+                        help='--search-words 只匹配前缀')
+    parser.add_argument('--rebuild-search-index', action='store_true',
+                        help='建立或重建用户名/密码的子串搜索索引 (FTS5 trigram, 不支持时用三元组表)')  # noqa
+    parser.add_argument('--drop-search-index', action='store_true',
+                        help='删除子串搜索索引')
     parser.add_argument('--save-task-name', type=str,
                         help='保存到数据库时的任务名称')
     parser.add_argument('--save-task-desc', type=str,
@@ -0,0 +1,101 @@
+from typing import Optional
+
+# 字符类别位掩码
+CLASS_DIGIT = 1
+CLASS_UPPER = 2
+CLASS_LOWER = 4
+CLASS_SPECIAL = 8
+
+# 策略描述中的关键字 -> 字符类别
+POLICY_CLASS_NAMES = {
+    'digit': CLASS_DIGIT,
+    'upper': CLASS_UPPER,
+    'lower': CLASS_LOWER,
+    'special': CLASS_SPECIAL,
+}
+
+
+def char_classes(text: str) -> int:
+    """计算字符串包含的字符类别掩码 (空白字符不属于任何类别)"""
+    mask = 0
+    for char in text:
+        if char.isdigit():
+            mask |= CLASS_DIGIT
+        elif char.isupper():
+            mask |= CLASS_UPPER
+        elif char.islower():
+            mask |= CLASS_LOWER
+        elif not char.isspace() and not char.isalnum():
+            mask |= CLASS_SPECIAL
+        if mask == 15:
+            break
+    return mask
+
+
+class PasswordPolicy:
+    """目标系统的密码策略, 生成时只产出符合策略的密码"""
+
+    def __init__(self, min_length: int = 0, max_length: Optional[int] = None,
+                 require_digit: bool = False, require_upper: bool = False,
+                 require_lower: bool = False,
+                 require_special: bool = False) -> None:
+        if max_length is not None and max_length < min_length:
+            raise ValueError("最大长度不能小于最小长度")
+
+        self.min_length = min_length
+        self.max_length = max_length
+        self.required_classes = (
+            (CLASS_DIGIT if require_digit else 0) |
+            (CLASS_UPPER if require_upper else 0) |
+            (CLASS_LOWER if require_lower else 0) |
+            (CLASS_SPECIAL if require_special else 0)
+        )
+
+    @classmethod
+    def from_spec(cls, spec: str) -> 'PasswordPolicy':
+        """从策略描述创建实例
+
+        Args:
+            spec (str): 逗号分隔的策略, 如 "min=8,max=16,digit,upper,special"
+        Returns:
+            PasswordPolicy: 策略对象
+        """
+        kwargs = {}
+        for token in spec.split(','):
+            token = token.strip().lower()
+            if not token:
+                continue
+
+            if '=' in token:
+                key, value = (part.strip() for part in token.split('=', 1))
+                if key not in ('min', 'max') or not value.isdigit():
+                    raise ValueError(f"无效的密码策略项: {token}")
+                kwargs[f'{key}_length'] = int(value)
+            elif token in POLICY_CLASS_NAMES:
+                kwargs[f'require_{token}'] = True
+            else:
+                raise ValueError(f"无效的密码策略项: {token}")
+
+        return cls(**kwargs)
+
+    def to_spec(self) -> str:
+        """转换为策略描述字符串"""
+        parts = [f"min={self.min_length}"]
+        if self.max_length is not None:
+            parts.append(f"max={self.max_length}")
+        for name, flag in POLICY_CLASS_NAMES.items():
+            if self.required_classes & flag:
+                parts.append(name)
+        return ','.join(parts)
+
+    def allows(self, password: str) -> bool:
+        """检查密码是否符合策略"""
+        if len(password) < self.min_length:
+            return False
+        if self.max_length is not None and len(password) > self.max_length:
+            return False
+        required = self.required_classes
+        return char_classes(password) & required == required
+
+    def __repr__(self) -> str:
+        return f"PasswordPolicy({self.to_spec()!r})"
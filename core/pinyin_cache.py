@@ -0,0 +1,166 @@
+import atexit
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# 进程内 LRU 缓存的条目数
+PINYIN_CACHE_SIZE = 4096
+
+# 持久缓存累计多少条新结果后提交一次
+PINYIN_COMMIT_INTERVAL = 256
+
+
+class PinyinCache:
+    """拼音查询层: 进程内 LRU + 可选的 SQLite 持久缓存
+
+    以 (文本, 拼音风格) 为键. 批量生成时同样的姓氏、公司名反复出现,
+    每个字符串只需调用一次 pypinyin. pypinyin 在第一次未命中时才导入.
+    """
+
+    def __init__(self, maxsize: int = PINYIN_CACHE_SIZE,
+                 db_path: Optional[str] = None) -> None:
+        self.maxsize = maxsize
+        self.db_path = db_path
+        self._memory: 'OrderedDict[Tuple[str, str], Tuple[str, ...]]' = OrderedDict()  # noqa
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid = 0
+        self._pending_writes = 0
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def lookup(self, text: str, style: str = 'normal') -> List[str]:
+        """获取文本的拼音列表, 等价于 pypinyin.lazy_pinyin(text, style)
+        Args:
+            text (str): 待转换的文本
+            style (str): pypinyin.Style 的名称, 如 normal / first_letter / tone
+        Returns:
+            List[str]: 拼音列表
+        """
+        key = (text, style)
+        cached = self._memory.get(key)
+        if cached is not None:
+            self._memory.move_to_end(key)
+            self.stats['hits'] += 1
+            return list(cached)
+
+        cached = self._disk_get(key)
+        if cached is not None:
+            self.stats['disk_hits'] += 1
+        else:
+            self.stats['misses'] += 1
+            cached = tuple(self._convert(text, style))
+            self._disk_put(key, cached)
+
+        self._memory[key] = cached
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+        return list(cached)
+
+    def info(self) -> Dict[str, int]:
+        """命中统计"""
+        return dict(self.stats, size=len(self._memory))
+
+    def clear(self) -> None:
+        """清空进程内缓存和统计 (不影响持久缓存)"""
+        self._memory.clear()
+        self.stats.update(hits=0, disk_hits=0, misses=0)
+
+    def set_db_path(self, db_path: Optional[str]) -> None:
+        """设置持久缓存文件, 为空时关闭持久缓存"""
+        self.close()
+        self.db_path = db_path
+
+    def flush(self) -> None:
+        """提交尚未写入的持久缓存"""
+        if self._conn is not None and self._pending_writes:
+            try:
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ 拼音缓存写入失败: {e}")
+            self._pending_writes = 0
+
+    def close(self) -> None:
+        """提交并关闭持久缓存连接"""
+        if self._conn is not None and self._conn_pid == os.getpid():
+            self.flush()
+            self._conn.close()
+        self._conn = None
+        self._pending_writes = 0
+
+    def _convert(self, text: str, style: str) -> List[str]:
+        from pypinyin import lazy_pinyin, Style
+        return lazy_pinyin(text, style=Style[style.upper()])
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """按进程打开持久缓存连接, 子进程不复用父进程的连接"""
+        if not self.db_path:
+            return None
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS pinyin_cache (
+                    text TEXT NOT NULL,
+                    style TEXT NOT NULL,
+                    pinyin TEXT NOT NULL,
+                    PRIMARY KEY (text, style)
+                ) WITHOUT ROWID
+            ''')
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ 无法打开拼音缓存 {self.db_path}, 已禁用持久缓存: {e}")
+            self.db_path = None
+            return None
+
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        self._pending_writes = 0
+        return conn
+
+    def _disk_get(self, key: Tuple[str, str]) -> Optional[Tuple[str, ...]]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                'SELECT pinyin FROM pinyin_cache WHERE text = ? AND style = ?',
+                key).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ 拼音缓存读取失败: {e}")
+            return None
+        return tuple(json.loads(row[0])) if row else None
+
+    def _disk_put(self, key: Tuple[str, str], value: Tuple[str, ...]) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO pinyin_cache (text, style, pinyin) '
+                'VALUES (?, ?, ?)',
+                key + (json.dumps(value, ensure_ascii=False),))
+        except sqlite3.Error as e:
+            print(f"⚠️ 拼音缓存写入失败: {e}")
+            return
+
+        self._pending_writes += 1
+        if self._pending_writes >= PINYIN_COMMIT_INTERVAL:
+            self.flush()
+
+
+# 进程级共享实例, core 中所有拼音转换都经过它
+pinyin_cache = PinyinCache()
+atexit.register(pinyin_cache.close)
+
+
+def lazy_pinyin(text: str, style: str = 'normal') -> List[str]:
+    """带缓存的 pypinyin.lazy_pinyin"""
+    return pinyin_cache.lookup(text, style)
+
+
+def pinyin_cache_info() -> Dict[str, int]:
+    """获取共享拼音缓存的命中统计"""
+    return pinyin_cache.info()
@@ -0,0 +1,121 @@
+import re
+from typing import Set, List, Dict
+from .collect_input import CollectInput  # type: ignore
+from .create_name_pinyin import NamePinyinCreator  # type: ignore
+from .create_name_initial import NameInitialCreator  # type: ignore
+
+
+class ProfileFeatures:
+    """单个目标的派生特征
+
+    基础名字、公司片段、生日和手机号片段在创建时计算一次,
+    用户名和密码生成共用同一份结果, 避免重复的拼音转换.
+    """
+
+    def __init__(self, personal_info: CollectInput) -> None:
+        self.personal_info = personal_info
+
+        self.base_names: Set[str] = self._get_base_names(personal_info)
+        self.company_parts: List[str] = self._get_company_parts(personal_info)
+        self.birth_parts: Dict[str, str] = personal_info.get_birth_parts()
+        self.phone_parts: Dict[str, str] = personal_info.get_phone_parts()
+        self.phone_fragments: List[str] = self._extract_phone_parts(personal_info.phone)  # noqa
+
+    def _get_base_names(self, personal_info: CollectInput) -> Set[str]:
+        """获取基础名字集合"""
+        names = set()
+
+        # 直接的名字
+        if personal_info.name_en:
+            # lower + capitalize
+            names.add(personal_info.name_en.lower())
+            names.add(personal_info.name_en.capitalize())
+            names.update(self._split_english_name(personal_info.name_en))
+
+        if personal_info.nickname_en:
+            # lower + capitalize
+            names.add(personal_info.nickname_en.lower())
+            names.add(personal_info.nickname_en.capitalize())
+
+        if personal_info.username:
+            # lower + capitalize
+            names.add(personal_info.username.lower())
+            names.add(personal_info.username.capitalize())
+
+        # 中文名的拼音
+        if personal_info.name_zh:
+            try:
+                pinyin_creator = NamePinyinCreator(personal_info.name_zh,
+                                                   personal_info.nickname_zh)
+                names.update(pinyin_creator.run())
+            except Exception as e:
+                print(f"⚠️ 拼音生成警告: {e}")
+
+        # 首字母组合
+        try:
+            initial_creator = NameInitialCreator(
+                personal_info.name_zh,
+                personal_info.name_en,
+                personal_info.nickname_zh,
+                personal_info.nickname_en
+            )
+            names.update(initial_creator.run())
+        except Exception as e:
+            print(f"⚠️ 首字母组合生成警告: {e}")
+
+        return names
+
+    def _split_english_name(self, name: str) -> Set[str]:
+        """分解英文名"""
+        names = set()
+        clean_name = re.sub(r'[^a-zA-Z\s]', '', name)
+        words = clean_name.lower().split()
+
+        for word in words:
+            if len(word) >= 2:
+                names.add(word)
+
+        return names
+
+    def _get_company_parts(self, personal_info: CollectInput) -> List[str]:
+        """获取公司相关信息"""
+        parts: List[str] = []
+
+        if personal_info.company_en:
+            clean_company = re.sub(r'[^a-zA-Z\s]', '',
+                                   personal_info.company_en)
+            words = clean_company.lower().split()
+            parts.extend(word for word in words if len(word) >= 2)
+
+        if personal_info.company_zh:
+            company_pinyin = NamePinyinCreator(name_zh=personal_info.company_zh).run()  # noqa
+            company_initial = NameInitialCreator(name_zh=personal_info.company_zh).run()  # noqa
+            parts.extend(list(company_pinyin))
+            parts.extend(list(company_initial))
+
+        if personal_info.department_en:
+            clean_dept = re.sub(r'[^a-zA-Z\s]', '',
+                                personal_info.department_en)
+            words = clean_dept.lower().split()
+            parts.extend(word for word in words if len(word) >= 2)
+
+        return parts
+
+    def _extract_phone_parts(self, phone: str) -> List[str]:
+        """提取手机号相关信息"""
+        parts: List[str] = []
+        digits = re.findall(r'\d', phone)
+
+        if len(digits) >= 4:
+            # 后四位
+            parts.append(''.join(digits[-4:]))
+
+            # 后六位
+            if len(digits) >= 6:
+                parts.append(''.join(digits[-6:]))
+
+            # 中间四位 (如果是11位手机号)
+            if len(digits) == 11:
+                parts.append(''.join(digits[3:7]))
+
+        return parts
@@ -0,0 +1,82 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+
+class TopK:
+    """有界小顶堆, 只保留得分最高的 k 个不重复候选
+
+    同一候选多次出现时按最高得分计, 同分时按 (得分, 候选) 元组比较, 结果
+    确定. 得分提高时不在堆内原地修改, 而是压入新条目并把旧条目视为过期,
+    弹出时跳过, 因此内存占用为 O(k).
+    """
+
+    def __init__(self, k: int) -> None:
+        if k <= 0:
+            raise ValueError("k 必须为正整数")
+        self.k = k
+        self._heap: List[Tuple[float, str]] = []
+        self._best: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._best)
+
+    @property
+    def full(self) -> bool:
+        """是否已保留 k 个候选"""
+        return len(self._best) >= self.k
+
+    def min_score(self) -> Optional[float]:
+        """当前保留候选中的最低得分, 未满时返回 None"""
+        if not self.full:
+            return None
+        self._drop_stale()
+        return self._heap[0][0]
+
+    def push(self, score: float, candidate: str) -> bool:
+        """加入一个候选
+        Args:
+            score (float): 候选得分
+            candidate (str): 候选字符串
+        Returns:
+            bool: 候选是否进入 (或更新了) 前 k 名
+        """
+        current = self._best.get(candidate)
+        if current is not None:
+            if score <= current:
+                return False
+            self._best[candidate] = score
+            self._push_entry(score, candidate)
+            return True
+
+        if not self.full:
+            self._best[candidate] = score
+            self._push_entry(score, candidate)
+            return True
+
+        self._drop_stale()
+        if (score, candidate) <= self._heap[0]:
+            return False
+
+        _, evicted = heapq.heapreplace(self._heap, (score, candidate))
+        del self._best[evicted]
+        self._best[candidate] = score
+        return True
+
+    def ranked(self) -> List[Tuple[float, str]]:
+        """按得分从高到低返回保留的候选"""
+        return sorted(((score, candidate)
+                       for candidate, score in self._best.items()),
+                      reverse=True)
+
+    def _push_entry(self, score: float, candidate: str) -> None:
+        heapq.heappush(self._heap, (score, candidate))
+        # 过期条目过多时重建堆, 保持内存有界
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(s, c) for c, s in self._best.items()]
+            heapq.heapify(self._heap)
+
+    def _drop_stale(self) -> None:
+        """弹出堆顶的过期条目"""
+        heap = self._heap
+        while heap and self._best.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
@@ -1,7 +1,12 @@
 import sqlite3
 import json
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple, AbstractSet
+from .compress_io import (compressed_path, open_writer,  # type: ignore
+                          write_lines)
+from .db_connection import get_manager  # type: ignore
+from .result_store import CompactResultStore  # type: ignore
+from .search_index import search_backend, word_source  # type: ignore
 
 
 class ReadResult:
@@ -11,6 +16,7 @@ class ReadResult:
         self.db_path = Path(db_path)
         if not self.db_path.exists():
             print(f"⚠️ 数据库文件不存在: {db_path}")
+        self.db = get_manager(db_path)
 
     def get_all_tasks(self, limit: int = 100,
                       offset: int = 0) -> List[Dict[str, Any]]:
@@ -22,9 +28,9 @@ class ReadResult:
             List[Dict[str, Any]]: 任务列表, 每个任务包含ID、名称、描述、创建时间等信息
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self.db.reader() as conn:
                 cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
 
                 cursor.execute('''
                     SELECT id, name, description, created_at,
@@ -60,9 +66,9 @@ class ReadResult:
             Optional[Dict[str, Any]]: 任务详细信息, 包含ID、名称、描述、个人信息、创建时间等
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self.db.reader() as conn:
                 cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
 
                 cursor.execute('''
                     SELECT * FROM generation_tasks WHERE id = ?
@@ -90,27 +96,40 @@ class ReadResult:
             return None
 
     def get_usernames_by_task(self, task_id: int,
-                              limit: Optional[int] = None) -> Set[str]:
+                              limit: Optional[int] = None,
+                              compact: bool = False) -> AbstractSet[str]:
         """获取指定任务的用户名
         Args:
             task_id (int): 任务ID
             limit (Optional[int]): 限制返回的用户名数量, 默认不限制
+            compact (bool): 是否返回 CompactResultStore
         Returns:
-            Set[str]: 用户名集合
+            AbstractSet[str]: 用户名集合
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.reader() as conn:
                 cursor = conn.cursor()
 
-                query = 'SELECT username FROM usernames WHERE task_id = ? ORDER BY username'  # noqa
+                query = '''
+                    SELECT w.word FROM username_links l
+                    JOIN words w ON w.id = l.word_id
+                    WHERE l.task_id = ?
+                '''
                 params = [task_id]
 
+                # 返回集合时不需要排序; 紧凑结果和 LIMIT 需要按字典序
+                if compact or limit:
+                    query += ' ORDER BY w.word'
+
                 if limit:
                     query += ' LIMIT ?'
                     params.append(limit)
 
                 cursor.execute(query, params)
 
+                # 查询已按字典序排列 (BINARY 排序与 UTF-8 字节序一致), 可直接逐行压缩
+                if compact:
+                    return CompactResultStore.from_sorted(row[0] for row in cursor)  # noqa
                 return {row[0] for row in cursor.fetchall()}
 
         except Exception as e:
@@ -118,27 +137,40 @@ class ReadResult:
             return set()
 
     def get_passwords_by_task(self, task_id: int,
-                              limit: Optional[int] = None) -> Set[str]:
+                              limit: Optional[int] = None,
+                              compact: bool = False) -> AbstractSet[str]:
         """获取指定任务的密码
         Args:
             task_id (int): 任务ID
             limit (Optional[int]): 限制返回的密码数量, 默认不限制
+            compact (bool): 是否返回 CompactResultStore
         Returns:
-            Set[str]: 密码集合
+            AbstractSet[str]: 密码集合
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.reader() as conn:
                 cursor = conn.cursor()
 
-                query = 'SELECT password FROM passwords WHERE task_id = ? ORDER BY password'  # noqa
+                query = '''
+                    SELECT w.word FROM password_links l
+                    JOIN words w ON w.id = l.word_id
+                    WHERE l.task_id = ?
+                '''
                 params = [task_id]
 
+                # 返回集合时不需要排序; 紧凑结果和 LIMIT 需要按字典序
+                if compact or limit:
+                    query += ' ORDER BY w.word'
+
                 if limit:
                     query += ' LIMIT ?'
                     params.append(limit)
 
                 cursor.execute(query, params)
 
+                # 查询已按字典序排列 (BINARY 排序与 UTF-8 字节序一致), 可直接逐行压缩
+                if compact:
+                    return CompactResultStore.from_sorted(row[0] for row in cursor)  # noqa
                 return {row[0] for row in cursor.fetchall()}
 
         except Exception as e:
@@ -153,9 +185,9 @@ class ReadResult:
             List[Dict[str, Any]]: 匹配的任务列表, 每个任务包含ID、名称、描述、创建时间等信息
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self.db.reader() as conn:
                 cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
 
                 cursor.execute('''
                     SELECT id, name, description, created_at,
@@ -184,68 +216,102 @@ class ReadResult:
             return []
 
     def search_usernames(self, pattern: str,
-                         task_id: Optional[int] = None) -> List[Tuple[str, int]]:  # noqa
+                         task_id: Optional[int] = None,
+                         prefix: bool = False,
+                         limit: Optional[int] = None,
+                         offset: int = 0) -> List[Tuple[str, int]]:
         """搜索用户名
         Args:
             pattern (str): 用户名模式
             task_id (Optional[int]): 任务ID, 如果提供则只搜索该任务下的用户名
+            prefix (bool): 为 True 时只匹配以 pattern 开头的用户名
+            limit (Optional[int]): 最多返回的条数, 为 None 时返回全部
+            offset (int): 按用户名排序后跳过的条数
         Returns:
             List[Tuple[str, int]]: 匹配的用户名和任务ID列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-
-                if task_id:
-                    cursor.execute('''
-                        SELECT username, task_id FROM usernames
-                        WHERE username LIKE ? AND task_id = ?
-                        ORDER BY username
-                    ''', (f'%{pattern}%', task_id))
-                else:
-                    cursor.execute('''
-                        SELECT username, task_id FROM usernames
-                        WHERE username LIKE ?
-                        ORDER BY username
-                    ''', (f'%{pattern}%',))
-
-                return cursor.fetchall()
-
+            return self._search_words('username_links', 'username_refs',
+                                      pattern, task_id, prefix, limit,
+                                      offset)
         except Exception as e:
             print(f"❌ 搜索用户名失败: {e}")
             return []
 
     def search_passwords(self, pattern: str,
-                         task_id: Optional[int] = None) -> List[Tuple[str, int]]:  # noqa
+                         task_id: Optional[int] = None,
+                         prefix: bool = False,
+                         limit: Optional[int] = None,
+                         offset: int = 0) -> List[Tuple[str, int]]:
         """搜索密码
         Args:
             pattern (str): 密码模式
             task_id (Optional[int]): 任务ID, 如果提供则只搜索该任务下的密码
+            prefix (bool): 为 True 时只匹配以 pattern 开头的密码
+            limit (Optional[int]): 最多返回的条数, 为 None 时返回全部
+            offset (int): 按密码排序后跳过的条数
         Returns:
             List[Tuple[str, int]]: 匹配的密码和任务ID列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            return self._search_words('password_links', 'password_refs',
+                                      pattern, task_id, prefix, limit,
+                                      offset)
+        except Exception as e:
+            print(f"❌ 搜索密码失败: {e}")
+            return []
 
+    def _search_words(self, links: str, refs: str, pattern: str,
+                      task_id: Optional[int], prefix: bool,
+                      limit: Optional[int] = None,
+                      offset: int = 0) -> List[Tuple[str, int]]:
+        """按 LIKE 模式搜索字符串, 能用索引时先用索引找出候选字符串"""
+        like = f'{pattern}%' if prefix else f'%{pattern}%'
+        # LIMIT -1 表示不限制条数; 分页在 SQL 中完成, 不取出全部匹配结果
+        page = [-1 if limit is None else limit, offset]
+        with self.db.reader() as conn:
+            cursor = conn.cursor()
+            match = word_source(search_backend(cursor), pattern, prefix)
+            if match is None and (task_id or limit is None):
+                # 没有可用的索引: 扫描关联表
                 if task_id:
-                    cursor.execute('''
-                        SELECT password, task_id FROM passwords
-                        WHERE password LIKE ? AND task_id = ?
-                        ORDER BY password
-                    ''', (f'%{pattern}%', task_id))
+                    cursor.execute(f'''
+                        SELECT w.word, l.task_id FROM {links} l
+                        JOIN words w ON w.id = l.word_id
+                        WHERE w.word LIKE ? AND l.task_id = ?
+                        ORDER BY w.word LIMIT ? OFFSET ?
+                    ''', [like, task_id] + page)
                 else:
-                    cursor.execute('''
-                        SELECT password, task_id FROM passwords
-                        WHERE password LIKE ?
-                        ORDER BY password
-                    ''', (f'%{pattern}%',))
-
+                    cursor.execute(f'''
+                        SELECT w.word, l.task_id FROM {links} l
+                        JOIN words w ON w.id = l.word_id
+                        WHERE w.word LIKE ?
+                        ORDER BY w.word LIMIT ? OFFSET ?
+                    ''', [like] + page)
                 return cursor.fetchall()
 
-        except Exception as e:
-            print(f"❌ 搜索密码失败: {e}")
-            return []
+            if match is None:
+                # 没有可用的索引但只要前几条: 按字典序遍历字符串表的唯一索引,
+                # 找够条数即停止, 常见的短模式不必扫描整张关联表
+                source, params = 'words w', []
+            else:
+                source, params = match
+
+            # 关联表主键是 (task_id, word_id): 对每个候选字符串按任务逐个
+            # 查主键, 避免按 word_id 扫描整张关联表; 引用计数为 0 的字符串
+            # 不属于这类关联, 不必逐个任务去查
+            if task_id:
+                tasks = f'CROSS JOIN {links} l ON l.task_id = ? AND l.word_id = w.id'  # noqa
+                params.append(task_id)
+            else:
+                tasks = (f'CROSS JOIN generation_tasks t '
+                         f'CROSS JOIN {links} l ON l.task_id = t.id AND l.word_id = w.id')  # noqa
+            cursor.execute(f'''
+                SELECT w.word, l.task_id FROM {source} {tasks}
+                WHERE w.word LIKE ? AND w.{refs} > 0
+                ORDER BY w.word LIMIT ? OFFSET ?
+            ''', params + [like] + page)
+            return cursor.fetchall()
 
     def get_tasks_by_date_range(self, start_date: str,
                                 end_date: str) -> List[Dict[str, Any]]:
@@ -257,9 +323,9 @@ class ReadResult:
             List[Dict[str, Any]]: 在指定日期范围内的任务列表, 每个任务包含ID、名称、描述、创建时间等信息
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self.db.reader() as conn:
                 cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
 
                 cursor.execute('''
                     SELECT id, name, description, created_at,
@@ -357,18 +423,31 @@ class ReadResult:
             return {}
 
     def export_all_unique_entries(self,
-                                  output_dir: str = "export_all") -> bool:
-        """导出所有唯一的用户名和密码"""
+                                  output_dir: str = "export_all",
+                                  compression: Optional[str] = None) -> bool:
+        """导出所有唯一的用户名和密码
+        Args:
+            output_dir (str): 输出目录
+            compression (Optional[str]): gzip / bz2 / xz, 为 None 时不压缩
+        Returns:
+            bool: 是否导出成功
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.reader() as conn:
                 cursor = conn.cursor()
 
                 # 获取所有唯一用户名
-                cursor.execute('SELECT DISTINCT username FROM usernames ORDER BY username')  # noqa
+                cursor.execute('''
+                    SELECT word FROM words WHERE id IN (
+                        SELECT word_id FROM username_links)
+                ''')
                 unique_usernames = {row[0] for row in cursor.fetchall()}
 
                 # 获取所有唯一密码
-                cursor.execute('SELECT DISTINCT password FROM passwords ORDER BY password')  # noqa
+                cursor.execute('''
+                    SELECT word FROM words WHERE id IN (
+                        SELECT word_id FROM password_links)
+                ''')
                 unique_passwords = {row[0] for row in cursor.fetchall()}
 
                 # 创建输出目录
@@ -376,16 +455,16 @@ class ReadResult:
                 output_path.mkdir(exist_ok=True)
 
                 # 导出用户名
-                username_file = output_path / "all_unique_usernames.txt"
-                with open(username_file, 'w', encoding='utf-8') as f:
-                    for username in sorted(unique_usernames):
-                        f.write(username + '\n')
+                username_file = compressed_path(
+                    output_path / "all_unique_usernames.txt", compression)
+                with open_writer(username_file) as f:
+                    write_lines(f, sorted(unique_usernames))
 
                 # 导出密码
-                password_file = output_path / "all_unique_passwords.txt"
-                with open(password_file, 'w', encoding='utf-8') as f:
-                    for password in sorted(unique_passwords):
-                        f.write(password + '\n')
+                password_file = compressed_path(
+                    output_path / "all_unique_passwords.txt", compression)
+                with open_writer(password_file) as f:
+                    write_lines(f, sorted(unique_passwords))
 
                 print(f"✅ 所有唯一条目已导出到 {output_dir}")
                 print(f"   📁 用户名: {len(unique_usernames)} 个")
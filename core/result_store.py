@@ -0,0 +1,222 @@
+import heapq
+from array import array
+from itertools import accumulate
+from collections.abc import Set as AbstractSet
+from typing import Iterable, Iterator, List, Union
+
+# from_iterable 每累计多少个条目排序压缩一次
+COMPACT_CHUNK_SIZE = 1 << 18
+
+# 迭代时每次解码 / 构建时每次编码的条目数
+DECODE_BATCH = 1 << 14
+
+ENCODING = 'utf-8'
+ERRORS = 'surrogatepass'
+
+
+class CompactResultStore(AbstractSet):
+    """紧凑的只读结果集合
+
+    条目按字典序排列、去重后以 UTF-8 编码拼接成一个字节块 (每个条目后接换行符),
+    另用 array 记录每个条目的起始偏移. 每个条目只占编码长度 + 1 + 4 (或 8) 字节,
+    而 set 中的 str 每个条目还要额外 80 字节左右.
+
+    UTF-8 字节序与码点序一致, 成员判断直接在字节块上二分查找.
+    支持 len / in / 迭代 / 下标和切片 / merge, 可以代替 set 传给保存和导出接口.
+    条目中不能包含换行符.
+    """
+
+    __slots__ = ('_blob', '_offsets')
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        store = self.from_iterable(words)
+        self._blob: bytes = store._blob
+        self._offsets: array = store._offsets
+
+    @classmethod
+    def _from_parts(cls, blob: bytes, offsets: array) -> 'CompactResultStore':
+        store = cls.__new__(cls)
+        store._blob = blob
+        store._offsets = offsets
+        return store
+
+    @classmethod
+    def from_sorted(cls, words: Iterable[str]) -> 'CompactResultStore':
+        """从已按字典序排列的条目创建, 相邻的重复条目只保留一个
+        Args:
+            words (Iterable[str]): 有序条目, 可以是迭代器
+        Returns:
+            CompactResultStore: 结果集合
+        """
+        blob = bytearray()
+        offsets = array('Q', [0])
+        batch: List[str] = []
+        previous = None
+        for word in words:
+            if word == previous:
+                continue
+            if previous is not None and word < previous:
+                raise ValueError("from_sorted 的输入必须按字典序排列")
+            batch.append(word)
+            previous = word
+            if len(batch) >= DECODE_BATCH:
+                cls._append_batch(blob, offsets, batch)
+                batch = []
+        cls._append_batch(blob, offsets, batch)
+
+        # 字节块小于 4GB 时偏移改用 4 字节存储
+        if len(blob) < 1 << 32:
+            offsets = array('I', offsets)
+        return cls._from_parts(bytes(blob), offsets)
+
+    @staticmethod
+    def _append_batch(blob: bytearray, offsets: array,
+                      batch: List[str]) -> None:
+        """把一批有序条目整体编码后追加到字节块"""
+        if not batch:
+            return
+        text = '\n'.join(batch) + '\n'
+        if text.count('\n') != len(batch):
+            word = next(word for word in batch if '\n' in word)
+            raise ValueError(f"条目不能包含换行符: {word!r}")
+
+        data = text.encode(ENCODING, ERRORS)
+        if len(data) == len(text):
+            # 纯 ASCII, 字节长度等于字符数
+            lengths = map(len, batch)
+        else:
+            lengths = (len(word.encode(ENCODING, ERRORS)) for word in batch)
+        base = len(blob)
+        offsets.extend(base + end
+                       for end in accumulate(length + 1 for length in lengths))
+        blob += data
+
+    @classmethod
+    def from_iterable(cls, words: Iterable[str],
+                      chunk_size: int = COMPACT_CHUNK_SIZE) -> 'CompactResultStore':  # noqa
+        """从任意 (可重复、无序) 条目创建
+
+        每累计 chunk_size 个不重复条目就压缩成一个有序块, 最后多路归并,
+        内存中不会同时存在全部条目的 str 对象.
+        """
+        if isinstance(words, CompactResultStore):
+            return words
+
+        runs: List[CompactResultStore] = []
+        buffer = set()
+        for word in words:
+            buffer.add(word)
+            if len(buffer) >= chunk_size:
+                runs.append(cls.from_sorted(sorted(buffer)))
+                buffer = set()
+
+        if not runs:
+            return cls.from_sorted(sorted(buffer))
+        if buffer:
+            runs.append(cls.from_sorted(sorted(buffer)))
+        return cls.from_sorted(heapq.merge(*runs))
+
+    @classmethod
+    def _from_iterable(cls, words: Iterable[str]) -> 'CompactResultStore':
+        # collections.abc.Set 的 & | - ^ 运算通过它构造结果
+        return cls.from_iterable(words)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        raw = word.encode(ENCODING, ERRORS)
+        index = self._bisect(raw)
+        return index < len(self) and self._raw(index) == raw
+
+    def __iter__(self) -> Iterator[str]:
+        offsets = self._offsets
+        count = len(self)
+        for start in range(0, count, DECODE_BATCH):
+            end = min(start + DECODE_BATCH, count)
+            chunk = self._blob[offsets[start]:offsets[end] - 1]
+            yield from chunk.decode(ENCODING, ERRORS).split('\n')
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, 'CompactResultStore']:  # noqa
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.from_sorted(self[i] for i in range(start, stop, step))  # noqa
+            if stop <= start:
+                return self.from_sorted(())
+            base = self._offsets[start]
+            offsets = array(self._offsets.typecode,
+                            (offset - base for offset in self._offsets[start:stop + 1]))  # noqa
+            return self._from_parts(self._blob[base:self._offsets[stop]],
+                                    offsets)
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CompactResultStore 下标越界")
+        return self._raw(index).decode(ENCODING, ERRORS)
+
+    def __reduce__(self):
+        return (self._from_parts, (self._blob, self._offsets))
+
+    def __repr__(self) -> str:
+        return f"CompactResultStore({len(self)} 个条目, {self.nbytes} 字节)"
+
+    @property
+    def nbytes(self) -> int:
+        """字节块和偏移数组占用的字节数"""
+        return len(self._blob) + self._offsets.itemsize * len(self._offsets)
+
+    def index(self, word: str) -> int:
+        """条目的下标 (按字典序), 不存在时抛出 ValueError"""
+        raw = word.encode(ENCODING, ERRORS)
+        index = self._bisect(raw)
+        if index < len(self) and self._raw(index) == raw:
+            return index
+        raise ValueError(f"{word!r} 不在结果中")
+
+    def merge(self, other: Iterable[str]) -> 'CompactResultStore':
+        """与另一组条目合并, 返回新的结果集合"""
+        if not isinstance(other, CompactResultStore):
+            other = self.from_iterable(other)
+        if not other:
+            return self
+        if not self:
+            return other
+        return self.from_sorted(heapq.merge(self, other))
+
+    union = merge
+
+    def __or__(self, other):
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        return self.merge(other)
+
+    def write_to(self, f) -> int:
+        """把全部条目按行写入二进制文件对象, 返回条目数"""
+        f.write(self._blob)
+        return len(self)
+
+    def _raw(self, index: int) -> bytes:
+        offsets = self._offsets
+        return self._blob[offsets[index]:offsets[index + 1] - 1]
+
+    def _bisect(self, raw: bytes) -> int:
+        """第一个不小于 raw 的条目下标"""
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if self._raw(mid) < raw:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+
+def sorted_words(words: Iterable[str]) -> Iterable[str]:
+    """按字典序产出条目; CompactResultStore 本身有序, 不再复制排序"""
+    if isinstance(words, CompactResultStore):
+        return words
+    return sorted(words)
@@ -0,0 +1,384 @@
+import zlib
+from itertools import product
+from string import Formatter
+from typing import (Collection, Dict, Iterator, List, Optional, Sequence,
+                    Tuple)
+from .password_policy import char_classes  # type: ignore
+
+# 规则表类型: [(规则族名称, 权重, [模板, ...]), ...]
+RuleTable = List[Tuple[str, float, List[str]]]
+
+# 编译后的单个步骤: (规则族名称, 槽位元组)
+PlanStep = Tuple[str, Tuple[str, ...]]
+
+# 模板中的字面量文本会被编译成只有一个取值的常量槽位, 以此前缀区分
+LITERAL_PREFIX = '='
+
+# 分区: (分区下标, 分区总数), 下标从 0 开始
+Partition = Tuple[int, int]
+
+
+def parse_template(template: str) -> Tuple[str, ...]:
+    """将 "{name}{sep}{year}" 形式的模板解析为槽位元组
+
+    Args:
+        template (str): 规则模板, 占位符为槽位名, 其余文本按字面量处理
+    Returns:
+        Tuple[str, ...]: 槽位序列, 如 ('name', 'sep', 'year')
+    """
+    slots: List[str] = []
+    for literal, field, _, _ in Formatter().parse(template):
+        if literal:
+            slots.append(LITERAL_PREFIX + literal)
+        if field:
+            slots.append(field)
+
+    if not slots:
+        raise ValueError(f"空的规则模板: {template!r}")
+    return tuple(slots)
+
+
+def parse_partition(text: str) -> Partition:
+    """解析 "i/n" 形式的分区参数 (i 从 1 开始)
+
+    Args:
+        text (str): 如 "2/8" 表示 8 个分区中的第 2 个
+    Returns:
+        Partition: (分区下标, 分区总数), 下标从 0 开始
+    """
+    try:
+        number, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise ValueError(f"无法解析分区: {text!r}, 格式应为 i/n (例: 2/8)")
+    if count <= 0 or not 1 <= number <= count:
+        raise ValueError(f"分区超出范围: {text!r}, 应满足 1 <= i <= n")
+    return number - 1, count
+
+
+def in_partition(value: str, partition: Partition) -> bool:
+    """取值是否属于该分区
+
+    按 CRC32 而不是取值下标划分: 槽位取值的顺序可能随进程的哈希种子变化,
+    CRC32 在不同机器和进程间保持一致.
+    """
+    index, count = partition
+    return zlib.crc32(value.encode('utf-8', 'surrogatepass')) % count == index
+
+
+def partition_slot(key: Tuple[str, ...]) -> Optional[str]:
+    """步骤的分区维度: 最外层的、在模板中只出现一次的非字面量槽位"""
+    for slot in key:
+        if not slot.startswith(LITERAL_PREFIX) and key.count(slot) == 1:
+            return slot
+    return None
+
+
+class RulePlan:
+    """将声明式规则表编译为执行计划
+
+    每个模板被编译为槽位元组, 多个模板共享的前缀 (如 name+sep 同时被
+    后缀、年份、生日、手机号规则使用) 在一次执行中只计算一次并复用.
+    """
+
+    def __init__(self, rules: RuleTable) -> None:
+        self.rules = rules
+        self.steps: List[PlanStep] = []
+        self.weights: Dict[str, float] = {}
+
+        seen_keys = set()
+        for family, weight, templates in rules:
+            self.weights[family] = weight
+            for template in templates:
+                key = parse_template(template)
+                # 同一模板出现多次只执行一次
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                self.steps.append((family, key))
+
+        # 被多个模板使用的中间结果 (模板自身也计入, 以便与更长的模板共享)
+        prefix_usage: Dict[Tuple[str, ...], int] = {}
+        for _, key in self.steps:
+            for i in range(2, len(key) + 1):
+                prefix_usage[key[:i]] = prefix_usage.get(key[:i], 0) + 1
+        self.shared_prefixes = {prefix
+                                for prefix, count in prefix_usage.items()
+                                if count > 1}
+
+    def slot_names(self) -> List[str]:
+        """获取计划中使用到的所有 (非字面量) 槽位名"""
+        names: List[str] = []
+        for _, key in self.steps:
+            for slot in key:
+                if not slot.startswith(LITERAL_PREFIX) and slot not in names:
+                    names.append(slot)
+        return names
+
+    def split_steps(self, slot_names: Collection[str]) -> Tuple[List[PlanStep], List[PlanStep]]:  # noqa
+        """按槽位把步骤分为两组
+
+        Args:
+            slot_names (Collection[str]): 槽位名集合
+        Returns:
+            Tuple[List[PlanStep], List[PlanStep]]: (只使用这些槽位的步骤, 其余步骤)
+        """
+        inside: List[PlanStep] = []
+        outside: List[PlanStep] = []
+        for step in self.steps:
+            if all(slot.startswith(LITERAL_PREFIX) or slot in slot_names
+                   for slot in step[1]):
+                inside.append(step)
+            else:
+                outside.append(step)
+        return inside, outside
+
+    def steps_by_weight(self, steps: Optional[Sequence[PlanStep]] = None) -> List[PlanStep]:  # noqa
+        """按规则族权重从高到低排列步骤"""
+        return sorted(self.steps if steps is None else steps,
+                      key=lambda step: -self.weights.get(step[0], 0.0))
+
+    def run(self, slots: Dict[str, Sequence[str]],
+            steps: Optional[Sequence[PlanStep]] = None,
+            min_length: int = 0, max_length: Optional[int] = None,
+            stats: Optional[Dict[str, int]] = None,
+            required_classes: int = 0,
+            partition: Optional[Partition] = None) -> Iterator[str]:
+        """执行计划, 逐个产出组合结果 (未去重)
+
+        Args:
+            slots (Dict[str, Sequence[str]]): 槽位名到取值列表的映射,
+                缺失的槽位视为空列表
+            steps (Optional[Sequence[PlanStep]]): 只执行其中的步骤, 默认全部
+            min_length (int): 结果最小长度, 按各部分长度提前跳过过短的组合
+            max_length (Optional[int]): 结果最大长度, 同上跳过过长的组合
+            stats (Optional[Dict[str, int]]): 累加统计, 记录 pruned_by_length
+                与 pruned_by_policy
+            required_classes (int): 结果必须包含的字符类别掩码, 各部分都无法
+                提供所需类别的组合会整体跳过
+            partition (Optional[Partition]): 只产出该分区的组合. 每个步骤的
+                组合按分区维度 (见 partition_slot) 上取值的 CRC32 划入唯一
+                的分区, 各分区的结果合起来就是完整结果
+        """
+        for _, items in self.run_by_family(slots, steps, min_length,
+                                           max_length, stats,
+                                           required_classes, partition):
+            yield from items
+
+    def run_by_family(self, slots: Dict[str, Sequence[str]],
+                      steps: Optional[Sequence[PlanStep]] = None,
+                      min_length: int = 0, max_length: Optional[int] = None,
+                      stats: Optional[Dict[str, int]] = None,
+                      required_classes: int = 0,
+                      partition: Optional[Partition] = None) -> Iterator[Tuple[str, Iterator[str]]]:  # noqa
+        """同 run, 但按步骤产出 (规则族名称, 结果迭代器)
+
+        调用方可以不消费某个步骤的迭代器, 该步骤的组合就不会被生成.
+        """
+        ctx = _RunContext(slots, min_length, max_length, required_classes)
+        # 分区时每个分区维度一个上下文, 共享前缀只在同一维度的步骤间复用
+        contexts = {None: ctx}
+        try:
+            for family, key in (self.steps if steps is None else steps):
+                step_ctx = ctx
+                if partition is not None:
+                    step_ctx = self._partition_context(key, contexts,
+                                                       partition)
+                if step_ctx is None:
+                    yield family, iter(())
+                else:
+                    yield family, self._expand(key, step_ctx)
+        finally:
+            if stats is not None:
+                for step_ctx in contexts.values():
+                    for name, value in step_ctx.stats.items():
+                        stats[name] = stats.get(name, 0) + value
+
+    def _partition_context(self, key: Tuple[str, ...],
+                           contexts: Dict[Optional[str], '_RunContext'],
+                           partition: Partition) -> Optional['_RunContext']:
+        """获取步骤在该分区下的执行上下文, 步骤不属于该分区时返回 None"""
+        base = contexts[None]
+        slot = partition_slot(key)
+        if slot is None:
+            # 没有可切分的槽位, 整个步骤按模板归属一个分区
+            return base if in_partition(''.join(key), partition) else None
+
+        if slot not in contexts:
+            values = [value for value in self._values(slot, base.slots)
+                      if in_partition(value, partition)]
+            contexts[slot] = _RunContext(
+                dict(base.slots, **{slot: values}), base.min_length,
+                base.max_length, base.required_classes)
+        return contexts[slot]
+
+    def _values(self, slot: str, slots: Dict[str, Sequence[str]]) -> Sequence[str]:  # noqa
+        """获取单个槽位的取值"""
+        if slot.startswith(LITERAL_PREFIX):
+            return (slot[len(LITERAL_PREFIX):],)
+        return slots.get(slot, ())
+
+    def _node(self, key: Tuple[str, ...], ctx: '_RunContext') -> Sequence[str]:
+        """获取槽位前缀的全部组合, 共享前缀在本次执行内缓存"""
+        if len(key) == 1:
+            return self._values(key[0], ctx.slots)
+
+        if key in ctx.nodes:
+            return ctx.nodes[key]
+
+        values = list(self._product(key, ctx, final=False))
+        if ctx.max_length is not None:
+            # 继续拼接只会变长, 已超长的中间结果可以直接丢弃
+            kept = [value for value in values if len(value) <= ctx.max_length]
+            ctx.stats['pruned_by_length'] += len(values) - len(kept)
+            values = kept
+
+        if key in self.shared_prefixes:
+            ctx.nodes[key] = values
+        return values
+
+    def _expand(self, key: Tuple[str, ...], ctx: '_RunContext') -> Iterator[str]:  # noqa
+        """展开一个模板, 共享的结果直接复用, 其余按需流式产出"""
+        if len(key) == 1:
+            return self._filter_length(self._values(key[0], ctx.slots), ctx)
+
+        if ctx.required_classes:
+            # 所有部分合起来都提供不了所需字符类别时, 整个模板直接跳过
+            available = 0
+            for slot in key:
+                available |= ctx.slot_classes(slot, self._values(slot, ctx.slots))  # noqa
+            if available & ctx.required_classes != ctx.required_classes:
+                ctx.stats['pruned_by_policy'] += self._size(key, ctx.slots)
+                return iter(())
+
+        if key in self.shared_prefixes:
+            return self._filter_length(self._node(key, ctx), ctx)
+        return self._product(key, ctx, final=True)
+
+    def _size(self, key: Tuple[str, ...], slots: Dict[str, Sequence[str]]) -> int:  # noqa
+        """模板的组合数"""
+        size = 1
+        for slot in key:
+            size *= len(self._values(slot, slots))
+        return size
+
+    def _filter_length(self, values: Sequence[str],
+                       ctx: '_RunContext') -> Iterator[str]:
+        """按长度限制和字符类别过滤已有的取值"""
+        if not ctx.limited:
+            return iter(values)
+
+        kept = [value for value in values if ctx.fits(len(value))]
+        ctx.stats['pruned_by_length'] += len(values) - len(kept)
+        if ctx.required_classes:
+            count = len(kept)
+            kept = [value for value in kept
+                    if ctx.covers(char_classes(value))]
+            ctx.stats['pruned_by_policy'] += count - len(kept)
+        return iter(kept)
+
+    def _product(self, key: Tuple[str, ...], ctx: '_RunContext',
+                 final: bool) -> Iterator[str]:
+        """左侧前缀与最后一个槽位做一次笛卡尔积"""
+        left = self._node(key[:-1], ctx)
+        right = self._values(key[-1], ctx.slots)
+        if not left or not right:
+            return iter(())
+
+        if not (final and ctx.limited):
+            return map(''.join, product(left, right))
+        return self._bucketed_product(key, left, right, ctx)
+
+    def _bucketed_product(self, key: Tuple[str, ...], left: Sequence[str],
+                          right: Sequence[str],
+                          ctx: '_RunContext') -> Iterator[str]:
+        """按 (长度, 字符类别) 分桶做笛卡尔积, 整桶跳过不可能满足限制的组合"""
+        left_buckets = ctx.buckets(key[:-1], left)
+        right_buckets = ctx.buckets(key[-1:], right)
+
+        for (left_length, left_mask), left_items in left_buckets.items():
+            for (right_length, right_mask), right_items in right_buckets.items():  # noqa
+                if not ctx.fits(left_length + right_length):
+                    ctx.stats['pruned_by_length'] += len(left_items) * len(right_items)  # noqa
+                    continue
+                if not ctx.covers(left_mask | right_mask):
+                    ctx.stats['pruned_by_policy'] += len(left_items) * len(right_items)  # noqa
+                    continue
+                yield from map(''.join, product(left_items, right_items))
+
+    def count(self, slots: Dict[str, Sequence[str]],
+              steps: Optional[Sequence[PlanStep]] = None) -> Dict[str, Tuple[int, int]]:  # noqa
+        """不生成任何结果, 仅按槽位大小计算各规则族的组合数上界
+
+        Args:
+            slots (Dict[str, Sequence[str]]): 槽位名到取值列表的映射
+            steps (Optional[Sequence[PlanStep]]): 只统计其中的步骤, 默认全部
+        Returns:
+            Dict[str, Tuple[int, int]]: 规则族 -> (组合数上界, 全部组合的字符总数)
+        """
+        result: Dict[str, Tuple[int, int]] = {}
+        for family, key in (self.steps if steps is None else steps):
+            values = [self._values(slot, slots) for slot in key]
+            size = 1
+            for slot_values in values:
+                size *= len(slot_values)
+
+            # 每个取值在全部组合中出现 size / len 次
+            chars = 0
+            if size:
+                for slot_values in values:
+                    chars += sum(map(len, slot_values)) * (size // len(slot_values))  # noqa
+
+            count, total = result.get(family, (0, 0))
+            result[family] = (count + size, total + chars)
+        return result
+
+
+class _RunContext:
+    """单次执行计划的上下文: 槽位、共享中间结果、长度与字符类别限制及统计"""
+
+    def __init__(self, slots: Dict[str, Sequence[str]], min_length: int,
+                 max_length: Optional[int], required_classes: int = 0) -> None:
+        self.slots = slots
+        self.min_length = min_length
+        self.max_length = max_length
+        self.required_classes = required_classes
+        self.limited = (min_length > 0 or max_length is not None or
+                        required_classes != 0)
+        self.nodes: Dict[Tuple[str, ...], List[str]] = {}
+        self.stats: Dict[str, int] = {'pruned_by_length': 0,
+                                      'pruned_by_policy': 0}
+        self._buckets: Dict[Tuple[str, ...], Dict[Tuple[int, int], List[str]]] = {}  # noqa
+        self._slot_classes: Dict[str, int] = {}
+
+    def fits(self, length: int) -> bool:
+        """长度是否满足限制"""
+        if length < self.min_length:
+            return False
+        return self.max_length is None or length <= self.max_length
+
+    def covers(self, classes: int) -> bool:
+        """字符类别是否满足要求"""
+        return classes & self.required_classes == self.required_classes
+
+    def slot_classes(self, slot: str, values: Sequence[str]) -> int:
+        """槽位所有取值可提供的字符类别并集"""
+        if slot not in self._slot_classes:
+            classes = 0
+            for value in values:
+                classes |= char_classes(value)
+            self._slot_classes[slot] = classes
+        return self._slot_classes[slot]
+
+    def buckets(self, key: Tuple[str, ...],
+                values: Sequence[str]) -> Dict[Tuple[int, int], List[str]]:
+        """按 (长度, 字符类别) 分组, 同一槽位前缀只分组一次
+
+        不要求字符类别时类别统一记为0, 只按长度分组.
+        """
+        if key not in self._buckets:
+            grouped: Dict[Tuple[int, int], List[str]] = {}
+            for value in values:
+                classes = char_classes(value) if self.required_classes else 0
+                grouped.setdefault((len(value), classes), []).append(value)
+            self._buckets[key] = grouped
+        return self._buckets[key]
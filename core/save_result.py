@@ -1,9 +1,38 @@
 import sqlite3
 import json
+import time
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Set, Dict
+from typing import (AbstractSet, Any, Callable, Dict, Iterable, Iterator,
+                    List, Optional)
 from .collect_input import CollectInput  # type: ignore
+from .compress_io import (compressed_path, open_writer,  # type: ignore
+                          write_lines)
+from .db_connection import get_manager  # type: ignore
+from .result_store import sorted_words  # type: ignore
+from .search_index import (build_search_index,  # type: ignore
+                           drop_search_index, index_words_after,
+                           unindex_words)
+
+# 数据库结构版本 (PRAGMA user_version)
+# 0: usernames / passwords 表逐行保存任务ID、完整字符串和时间戳
+# 1: 字符串只在 words 表中保存一次, 任务通过 (task_id, word_id) 关联表引用
+# 2: words 表记录被用户名/密码关联引用的次数, db_stats 表维护全局统计
+SCHEMA_VERSION = 2
+
+# (关联表, words 表中的引用计数列, 统计名)
+LINK_TABLES = (('username_links', 'username_refs', 'usernames'),
+               ('password_links', 'password_refs', 'passwords'))
+
+# 用户名和密码总数达到该值时改用批量导入
+BULK_SAVE_THRESHOLD = 200_000
+
+# 批量导入时每次写入暂存表的条目数
+BULK_CHUNK_SIZE = 50_000
+
+# 保存进度回调, 参数为进度信息字典, 见 SaveResult.bulk_save_generation_result()
+ProgressCallback = Callable[[Dict[str, Any]], None]
 
 
 class SaveResult:
@@ -11,12 +40,14 @@ class SaveResult:
 
     def __init__(self, db_path: str = "social_eng_results.db"):
         self.db_path = Path(db_path)
+        # 与同一数据库的 ReadResult 共享连接
+        self.db = get_manager(db_path)
         self.time_format = "%Y-%m-%d %H:%M:%S"
         self._init_database()
 
     def _init_database(self) -> None:
-        """初始化数据库表结构"""
-        with sqlite3.connect(self.db_path) as conn:
+        """初始化数据库表结构, 旧结构的数据库自动迁移"""
+        with self.db.writer() as conn:
             cursor = conn.cursor()
 
             # 创建生成任务表
@@ -33,53 +64,198 @@ class SaveResult:
                 )
             ''')
 
-            # 创建用户名结果表
+            # 字符串表: 每个不同的用户名/密码只保存一次
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS usernames (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task_id INTEGER NOT NULL,
-                    username TEXT NOT NULL,
-                    created_at DATETIME NOT NULL,
-                    FOREIGN KEY (task_id) REFERENCES generation_tasks (id),
-                    UNIQUE(task_id, username)
+                CREATE TABLE IF NOT EXISTS words (
+                    id INTEGER PRIMARY KEY,
+                    word TEXT NOT NULL UNIQUE,
+                    username_refs INTEGER NOT NULL DEFAULT 0,
+                    password_refs INTEGER NOT NULL DEFAULT 0
                 )
             ''')
 
-            # 创建密码结果表
+            # 任务与用户名/密码的关联表, 只保存两个整数
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS passwords (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                CREATE TABLE IF NOT EXISTS username_links (
                     task_id INTEGER NOT NULL,
-                    password TEXT NOT NULL,
-                    created_at DATETIME NOT NULL,
+                    word_id INTEGER NOT NULL,
+                    PRIMARY KEY (task_id, word_id),
                     FOREIGN KEY (task_id) REFERENCES generation_tasks (id),
-                    UNIQUE(task_id, password)
-                )
+                    FOREIGN KEY (word_id) REFERENCES words (id)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS password_links (
+                    task_id INTEGER NOT NULL,
+                    word_id INTEGER NOT NULL,
+                    PRIMARY KEY (task_id, word_id),
+                    FOREIGN KEY (task_id) REFERENCES generation_tasks (id),
+                    FOREIGN KEY (word_id) REFERENCES words (id)
+                ) WITHOUT ROWID
+            ''')
+
+            # 全局统计, 由保存和删除任务时增量维护
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS db_stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
             ''')
 
             # 创建索引
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_usernames_task_id ON usernames (task_id)')  # noqa
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_passwords_task_id ON passwords (task_id)')  # noqa
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON generation_tasks (created_at)')  # noqa
 
+            migrated = False
+            version = cursor.execute('PRAGMA user_version').fetchone()[0]
+            if version < 1:
+                migrated = self._migrate_v0(cursor)
+            if version < 2:
+                self._migrate_v1(cursor)
+            if version < SCHEMA_VERSION:
+                cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
             conn.commit()
 
+        if migrated:
+            # 回收旧表占用的空间 (VACUUM 不能在事务中执行)
+            with self.db.writer() as conn:
+                conn.execute('VACUUM')
+            print("✅ 数据库迁移完成")
+
+    def _migrate_v0(self, cursor: sqlite3.Cursor) -> bool:
+        """把旧结构 (usernames / passwords 表逐行保存完整字符串和时间戳)
+        的数据迁移到 words + 关联表, 返回是否有数据被迁移
+        """
+        tables = {row[0] for row in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if not {'usernames', 'passwords'} & tables:
+            return False
+
+        print(f"🔄 正在迁移数据库结构: {self.db_path}")
+        for table, column, links in (('usernames', 'username', 'username_links'),  # noqa
+                                     ('passwords', 'password', 'password_links')):  # noqa
+            if table not in tables:
+                continue
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO words (word)
+                SELECT DISTINCT {column} FROM {table} ORDER BY {column}
+            ''')
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO {links} (task_id, word_id)
+                SELECT t.task_id, w.id FROM {table} t
+                JOIN words w ON w.word = t.{column}
+            ''')
+            cursor.execute(f'DROP TABLE {table}')
+        return True
+
+    def _migrate_v1(self, cursor: sqlite3.Cursor) -> None:
+        """为 words 表加上引用计数列, 并统计已有数据"""
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(words)')}  # noqa
+        for _, column, _ in LINK_TABLES:
+            if column not in columns:
+                cursor.execute(f'ALTER TABLE words ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0')  # noqa
+        if cursor.execute('SELECT 1 FROM words LIMIT 1').fetchone():
+            print(f"🔄 正在统计已有数据: {self.db_path}")
+        self._recount_stats(cursor)
+
+    @staticmethod
+    def _recount_stats(cursor: sqlite3.Cursor) -> None:
+        """按关联表重新计算全部引用计数和全局统计"""
+        cursor.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS ref_counts (
+                word_id INTEGER PRIMARY KEY,
+                refs INTEGER NOT NULL
+            )
+        ''')
+        for links, column, _ in LINK_TABLES:
+            # 先按 word_id 分组计数, 避免对每个字符串扫描一遍关联表
+            cursor.execute('DELETE FROM temp.ref_counts')
+            cursor.execute(f'''
+                INSERT INTO temp.ref_counts (word_id, refs)
+                SELECT word_id, COUNT(*) FROM {links} GROUP BY word_id
+            ''')
+            cursor.execute(f'''
+                UPDATE words SET {column} = COALESCE(
+                    (SELECT refs FROM temp.ref_counts WHERE word_id = words.id), 0)
+            ''')  # noqa
+        cursor.execute('DROP TABLE temp.ref_counts')
+
+        cursor.execute('DELETE FROM db_stats')
+        cursor.execute('''
+            INSERT INTO db_stats (name, value) VALUES
+                ('tasks', (SELECT COUNT(*) FROM generation_tasks)),
+                ('usernames', (SELECT COUNT(*) FROM username_links)),
+                ('passwords', (SELECT COUNT(*) FROM password_links)),
+                ('unique_usernames',
+                 (SELECT COUNT(*) FROM words WHERE username_refs > 0)),
+                ('unique_passwords',
+                 (SELECT COUNT(*) FROM words WHERE password_refs > 0)),
+                ('words', (SELECT COUNT(*) FROM words))
+        ''')
+
+    @staticmethod
+    def _bump_stats(cursor: sqlite3.Cursor, deltas: Dict[str, int]) -> None:
+        """按增量更新全局统计"""
+        cursor.executemany('UPDATE db_stats SET value = value + ? WHERE name = ?',  # noqa
+                           [(delta, name) for name, delta in deltas.items()
+                            if delta])
+
+    def _add_task_refs(self, cursor: sqlite3.Cursor, task_id: int,
+                       last_word_id: int) -> None:
+        """任务的关联写入后, 增加其字符串的引用计数并更新全局统计
+        Args:
+            cursor (sqlite3.Cursor): 数据库游标
+            task_id (int): 任务ID
+            last_word_id (int): 保存前字符串表的最大 id, 之后的都是新字符串
+        """
+        deltas = {'tasks': 1}
+        for links, column, kind in LINK_TABLES:
+            # 引用计数从 0 变为 1 的字符串是新的唯一用户名/密码
+            cursor.execute(f'''
+                SELECT COUNT(*), COALESCE(SUM(w.{column} = 0), 0)
+                FROM {links} l JOIN words w ON w.id = l.word_id
+                WHERE l.task_id = ?
+            ''', (task_id,))
+            deltas[kind], deltas[f'unique_{kind}'] = cursor.fetchone()
+            cursor.execute(f'''
+                UPDATE words SET {column} = {column} + 1
+                WHERE id IN (SELECT word_id FROM {links} WHERE task_id = ?)
+            ''', (task_id,))
+        cursor.execute('SELECT COUNT(*) FROM words WHERE id > ?',
+                       (last_word_id,))
+        deltas['words'] = cursor.fetchone()[0]
+        self._bump_stats(cursor, deltas)
+
     def save_generation_result(self, name: str, description: str,
                                personal_info: CollectInput,
-                               usernames: Set[str],
-                               passwords: Set[str]) -> int:
+                               usernames: AbstractSet[str],
+                               passwords: AbstractSet[str],
+                               progress_callback: Optional[ProgressCallback] = None,  # noqa
+                               bulk: Optional[bool] = None) -> int:
         """保存一次生成的完整结果
         Args:
             name (str): 任务名称
             description (str): 任务描述
             personal_info (CollectInput): 个人信息对象
-            usernames (Set[str]): 生成的用户名集合
-            passwords (Set[str]): 生成的密码集合
+            usernames (AbstractSet[str]): 用户名 (可为 CompactResultStore)
+            passwords (AbstractSet[str]): 密码 (可为 CompactResultStore)
+            progress_callback (Optional[ProgressCallback]): 保存进度回调
+            bulk (Optional[bool]): 是否使用批量导入, 为 None 时条目总数达到
+                BULK_SAVE_THRESHOLD 才使用
         Returns:
             int: 任务ID, 如果保存失败则返回-1
         """
+        if bulk is None:
+            bulk = len(usernames) + len(passwords) >= BULK_SAVE_THRESHOLD
+        if bulk:
+            return self.bulk_save_generation_result(
+                name, description, personal_info, usernames, passwords,
+                progress_callback=progress_callback)
+
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            progress = _SaveProgress(progress_callback,
+                                     len(usernames) + len(passwords))
+            with self.db.writer() as conn:
                 cursor = conn.cursor()
 
                 # 保存任务信息
@@ -87,15 +263,23 @@ class SaveResult:
                                           personal_info,
                                           len(usernames), len(passwords))
 
+                last_word_id = self._max_word_id(cursor)
+
                 # 保存用户名
                 if usernames:
                     self._save_usernames(cursor, task_id, usernames)
+                    progress.advance('usernames', len(usernames))
 
                 # 保存密码
                 if passwords:
                     self._save_passwords(cursor, task_id, passwords)
+                    progress.advance('passwords', len(passwords))
 
+                # 新增的字符串加入搜索索引 (未建立索引时什么也不做)
+                index_words_after(cursor, last_word_id)
+                self._add_task_refs(cursor, task_id, last_word_id)
                 conn.commit()
+                progress.report('done')
                 print(f"✅ 生成结果已保存到数据库, 任务ID: {task_id}")
                 return task_id
 
@@ -103,6 +287,161 @@ class SaveResult:
             print(f"❌ 保存结果失败: {e}")
             return -1
 
+    def bulk_save_generation_result(self, name: str, description: str,
+                                    personal_info: CollectInput,
+                                    usernames: Iterable[str],
+                                    passwords: Iterable[str],
+                                    chunk_size: int = BULK_CHUNK_SIZE,
+                                    progress_callback: Optional[ProgressCallback] = None) -> int:  # noqa
+        """批量导入一次生成的结果, 适合千万级条目
+        条目按块流式写入没有索引的临时暂存表, 全部写完后才为暂存表建索引,
+        再按字典序一次性合并到字符串表和关联表. 整个导入仍是一个事务,
+        失败时不会留下只保存了一部分的任务; WAL 模式下读连接不受影响.
+        Args:
+            name (str): 任务名称
+            description (str): 任务描述
+            personal_info (CollectInput): 个人信息对象
+            usernames (Iterable[str]): 用户名, 可以是只能遍历一次的迭代器
+            passwords (Iterable[str]): 密码, 可以是只能遍历一次的迭代器
+            chunk_size (int): 每次写入暂存表的条目数
+            progress_callback (Optional[ProgressCallback]): 每写入一块和每个
+                阶段结束时调用, 参数字典包含 phase (stage / index / merge /
+                done)、kind、rows、total (输入无长度时为 None)、seconds、
+                rows_per_second
+        Returns:
+            int: 任务ID, 如果保存失败则返回-1
+        """
+        try:
+            total = None
+            if hasattr(usernames, '__len__') and hasattr(passwords, '__len__'):  # noqa
+                total = len(usernames) + len(passwords)  # type: ignore
+            progress = _SaveProgress(progress_callback, total)
+
+            with self.db.writer() as conn:
+                if conn.in_transaction or self.db.write_depth > 1:
+                    # 外层的保存或删除还未结束 (如界面处理进度事件时再次触发),
+                    # 批量导入修改连接设置并在结束时回滚, 会破坏外层的事务
+                    raise RuntimeError("已有未完成的数据库写入, 不能开始批量导入")
+                cursor = conn.cursor()
+                self._begin_bulk(cursor)
+                try:
+                    task_id = self._save_task(cursor, name, description,
+                                              personal_info, 0, 0)
+                    last_word_id = self._max_word_id(cursor)
+                    username_count = self._bulk_save_words(
+                        cursor, task_id, usernames, 'username_links',
+                        chunk_size, progress, 'usernames')
+                    password_count = self._bulk_save_words(
+                        cursor, task_id, passwords, 'password_links',
+                        chunk_size, progress, 'passwords')
+                    index_words_after(cursor, last_word_id)
+                    self._add_task_refs(cursor, task_id, last_word_id)
+
+                    # 输入可能是迭代器, 数量在导入后才知道
+                    cursor.execute('''
+                        UPDATE generation_tasks
+                        SET username_count = ?, password_count = ?,
+                            total_count = ?
+                        WHERE id = ?
+                    ''', (username_count, password_count,
+                          username_count + password_count, task_id))
+                    conn.commit()
+                finally:
+                    self._end_bulk(cursor)
+
+            progress.report('done')
+            print(f"✅ 生成结果已保存到数据库, 任务ID: {task_id} "
+                  f"({progress.rows} 个条目, {progress.rate:.0f} 条/秒)")
+            return task_id
+
+        except Exception as e:
+            print(f"❌ 保存结果失败: {e}")
+            return -1
+
+    @staticmethod
+    def _max_word_id(cursor: sqlite3.Cursor) -> int:
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM words')
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def _begin_bulk(cursor: sqlite3.Cursor) -> None:
+        """导入期间的连接设置 (须在事务开始前执行)"""
+        # synchronous 保持 NORMAL: 设为 OFF 时检查点写回过程中断电可能损坏
+        # 整个数据库, 而 WAL 模式下 NORMAL 只在检查点时刷盘, 导入已足够快
+
+        # 暂存表和排序的临时数据可能有数 GB, 放到临时文件而不是内存
+        cursor.execute('PRAGMA temp_store = FILE')
+        cursor.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS bulk_words (
+                word TEXT NOT NULL
+            )
+        ''')
+
+    def _end_bulk(self, cursor: sqlite3.Cursor) -> None:
+        """恢复连接设置, 并把导入写出的 WAL 检查点写回数据库文件
+        只在最外层的写连接上执行, 嵌套时事务由外层提交或回滚.
+        """
+        if self.db.write_depth > 1:
+            return
+        connection = cursor.connection
+        if connection.in_transaction:
+            connection.rollback()
+        cursor.execute('DROP TABLE IF EXISTS temp.bulk_words')
+        cursor.execute('PRAGMA temp_store = MEMORY')
+        # 截断 WAL 文件, 否则导入写出的数 GB 日志会一直留在磁盘上
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    @staticmethod
+    def _stage_chunk(cursor: sqlite3.Cursor, chunk: List[str]) -> None:
+        """把一块条目写入暂存表"""
+        try:
+            # 整块编码成一个 JSON 数组由 json_each 在 SQLite 内展开,
+            # 比 executemany 逐行绑定参数快 3 倍以上
+            cursor.execute('''
+                INSERT INTO temp.bulk_words (word)
+                SELECT value FROM json_each(?)
+            ''', (json.dumps(chunk, ensure_ascii=False),))
+        except sqlite3.OperationalError:
+            # SQLite 编译时未包含 JSON 函数
+            cursor.executemany('INSERT INTO temp.bulk_words (word) VALUES (?)',
+                               ((word,) for word in chunk))
+
+    def _bulk_save_words(self, cursor: sqlite3.Cursor, task_id: int,
+                         words: Iterable[str], links: str, chunk_size: int,
+                         progress: '_SaveProgress', kind: str) -> int:
+        """把一类条目分块写入暂存表, 再集合式合并, 返回该任务的条目数"""
+        cursor.execute('DELETE FROM temp.bulk_words')
+        staged = 0
+        for chunk in _iter_chunks(words, chunk_size):
+            self._stage_chunk(cursor, chunk)
+            staged += len(chunk)
+            progress.advance(kind, len(chunk))
+        if not staged:
+            return 0
+
+        # 数据全部写入后再建索引, 合并时按字典序顺序读取暂存表
+        cursor.execute('CREATE INDEX temp.bulk_words_word ON bulk_words (word)')  # noqa
+        progress.report('index', kind)
+
+        # 新字符串按字典序追加到字符串表, 已存在的跳过
+        cursor.execute('''
+            INSERT OR IGNORE INTO words (word)
+            SELECT word FROM temp.bulk_words ORDER BY word
+        ''')
+        # 按 word_id 顺序写入关联表, 主键 B 树只在末尾追加
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO {links} (task_id, word_id)
+            SELECT ?, w.id FROM temp.bulk_words b
+            JOIN words w ON w.word = b.word
+            ORDER BY w.id
+        ''', (task_id,))
+        progress.report('merge', kind)
+
+        cursor.execute('DROP INDEX temp.bulk_words_word')
+        cursor.execute(f'SELECT COUNT(*) FROM {links} WHERE task_id = ?',
+                       (task_id,))
+        return cursor.fetchone()[0]
+
     def _save_task(self, cursor: sqlite3.Cursor, name: str, description: str,
                    personal_info: CollectInput, username_count: int,
                    password_count: int) -> int:
@@ -143,44 +482,36 @@ class SaveResult:
         return cursor.lastrowid
 
     def _save_usernames(self, cursor: sqlite3.Cursor, task_id: int,
-                        usernames: Set[str]) -> None:
+                        usernames: AbstractSet[str]) -> None:
         """批量保存用户名
         Args:
             cursor (sqlite3.Cursor): 数据库游标
             task_id (int): 任务ID
-            usernames (Set[str]): 用户名集合
+            usernames (AbstractSet[str]): 用户名集合
         """
-        current_time = datetime.now().strftime(self.time_format)
-
-        username_data = [
-            (task_id, username, current_time)
-            for username in usernames
-        ]
-
-        cursor.executemany('''
-            INSERT OR IGNORE INTO usernames (task_id, username, created_at)
-            VALUES (?, ?, ?)
-        ''', username_data)
+        self._save_words(cursor, task_id, usernames, 'username_links')
 
     def _save_passwords(self, cursor: sqlite3.Cursor, task_id: int,
-                        passwords: Set[str]) -> None:
+                        passwords: AbstractSet[str]) -> None:
         """批量保存密码"""
-        current_time = datetime.now().strftime(self.time_format)
-
-        password_data = [
-            (task_id, password, current_time)
-            for password in passwords
-        ]
-
-        cursor.executemany('''
-            INSERT OR IGNORE INTO passwords (task_id, password, created_at)
-            VALUES (?, ?, ?)
-        ''', password_data)
+        self._save_words(cursor, task_id, passwords, 'password_links')
+
+    def _save_words(self, cursor: sqlite3.Cursor, task_id: int,
+                    words: AbstractSet[str], links: str) -> None:
+        """写入字符串表 (已存在的跳过), 再写入任务关联"""
+        # 按字典序插入, 字符串表的唯一索引只在末尾追加
+        ordered = sorted_words(words)
+        cursor.executemany('INSERT OR IGNORE INTO words (word) VALUES (?)',
+                           ((word,) for word in ordered))
+        cursor.executemany(f'''
+            INSERT OR IGNORE INTO {links} (task_id, word_id)
+            SELECT ?, id FROM words WHERE word = ?
+        ''', ((task_id, word) for word in ordered))
 
     def update_task_description(self, task_id: int, description: str) -> bool:
         """更新任务描述"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.writer() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     UPDATE generation_tasks
@@ -203,23 +534,69 @@ class SaveResult:
     def delete_task(self, task_id: int) -> bool:
         """删除任务及其所有相关数据"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.writer() as conn:
                 cursor = conn.cursor()
 
+                # 减少该任务引用的字符串的引用计数
+                deltas = {}
+                for links, column, kind in LINK_TABLES:
+                    # 引用计数从 1 变为 0 的字符串不再是唯一用户名/密码
+                    cursor.execute(f'''
+                        SELECT COUNT(*), COALESCE(SUM(w.{column} = 1), 0)
+                        FROM {links} l JOIN words w ON w.id = l.word_id
+                        WHERE l.task_id = ?
+                    ''', (task_id,))
+                    count, last_refs = cursor.fetchone()
+                    deltas[kind] = -count
+                    deltas[f'unique_{kind}'] = -last_refs
+                    cursor.execute(f'''
+                        UPDATE words SET {column} = {column} - 1
+                        WHERE id IN (SELECT word_id FROM {links} WHERE task_id = ?)
+                    ''', (task_id,))  # noqa
+
+                # 记录该任务引用的字符串, 删除关联后清理不再被引用的字符串
+                cursor.execute('''
+                    CREATE TEMP TABLE IF NOT EXISTS deleted_words (
+                        word_id INTEGER PRIMARY KEY
+                    )
+                ''')
+                cursor.execute('DELETE FROM temp.deleted_words')
+                cursor.execute('''
+                    INSERT OR IGNORE INTO temp.deleted_words
+                    SELECT word_id FROM username_links WHERE task_id = ?
+                    UNION ALL
+                    SELECT word_id FROM password_links WHERE task_id = ?
+                ''', (task_id, task_id))
+
                 # 删除用户名
-                cursor.execute('DELETE FROM usernames WHERE task_id = ?',
+                cursor.execute('DELETE FROM username_links WHERE task_id = ?',
                                (task_id,))
                 username_deleted = cursor.rowcount
 
                 # 删除密码
-                cursor.execute('DELETE FROM passwords WHERE task_id = ?',
+                cursor.execute('DELETE FROM password_links WHERE task_id = ?',
                                (task_id,))
                 password_deleted = cursor.rowcount
 
+                # 只保留引用计数已归零的字符串, 不必扫描其他任务的关联
+                cursor.execute('''
+                    DELETE FROM temp.deleted_words WHERE (
+                        SELECT username_refs + password_refs FROM words
+                        WHERE id = word_id) > 0
+                ''')
+                unindex_words(cursor, 'temp.deleted_words')
+                cursor.execute('''
+                    DELETE FROM words
+                    WHERE id IN (SELECT word_id FROM temp.deleted_words)
+                ''')
+                deltas['words'] = -cursor.rowcount
+
                 # 删除任务
                 cursor.execute('DELETE FROM generation_tasks WHERE id = ?',
                                (task_id,))
                 task_deleted = cursor.rowcount
+                deltas['tasks'] = -task_deleted
+                self._bump_stats(cursor, deltas)
 
                 if task_deleted > 0:
                     conn.commit()
@@ -233,39 +610,57 @@ class SaveResult:
             print(f"❌ 删除任务失败: {e}")
             return False
 
-    def get_database_stats(self) -> Dict[str, int]:
-        """获取数据库统计信息"""
+    def rebuild_search_index(self, backend: Optional[str] = None) -> bool:
+        """建立或重建用户名/密码的子串搜索索引
+        Args:
+            backend (Optional[str]): fts5 / ngram, 为 None 时优先使用 FTS5,
+                SQLite 不支持时改用三元组表
+        Returns:
+            bool: 是否建立成功
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            start = time.perf_counter()
+            with self.db.writer() as conn:
                 cursor = conn.cursor()
+                backend = build_search_index(cursor, backend)
+                conn.commit()
+            print(f"✅ 搜索索引已重建 ({backend}), "
+                  f"耗时 {time.perf_counter() - start:.2f} 秒")
+            return True
 
-                # 统计任务数量
-                cursor.execute('SELECT COUNT(*) FROM generation_tasks')
-                task_count = cursor.fetchone()[0]
-
-                # 统计用户名总数
-                cursor.execute('SELECT COUNT(*) FROM usernames')
-                username_count = cursor.fetchone()[0]
+        except Exception as e:
+            print(f"❌ 重建搜索索引失败: {e}")
+            return False
 
-                # 统计密码总数
-                cursor.execute('SELECT COUNT(*) FROM passwords')
-                password_count = cursor.fetchone()[0]
+    def drop_search_index(self) -> bool:
+        """删除子串搜索索引, 之后的搜索回退为全表扫描"""
+        try:
+            with self.db.writer() as conn:
+                drop_search_index(conn.cursor())
+                conn.commit()
+            print("✅ 搜索索引已删除")
+            return True
 
-                # 统计唯一用户名数量
-                cursor.execute('SELECT COUNT(DISTINCT username) FROM usernames')  # noqa
-                unique_username_count = cursor.fetchone()[0]
+        except Exception as e:
+            print(f"❌ 删除搜索索引失败: {e}")
+            return False
 
-                # 统计唯一密码数量
-                cursor.execute('SELECT COUNT(DISTINCT password) FROM passwords')  # noqa
-                unique_password_count = cursor.fetchone()[0]
+    def get_database_stats(self) -> Dict[str, int]:
+        """获取数据库统计信息 (读取保存和删除时维护的计数, 不扫描数据)"""
+        try:
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT name, value FROM db_stats')
+                stats = dict(cursor.fetchall())
 
                 return {
-                    'total_tasks': task_count,
-                    'total_usernames': username_count,
-                    'total_passwords': password_count,
-                    'unique_usernames': unique_username_count,
-                    'unique_passwords': unique_password_count,
-                    'total_entries': username_count + password_count
+                    'total_tasks': stats.get('tasks', 0),
+                    'total_usernames': stats.get('usernames', 0),
+                    'total_passwords': stats.get('passwords', 0),
+                    'unique_usernames': stats.get('unique_usernames', 0),
+                    'unique_passwords': stats.get('unique_passwords', 0),
+                    'unique_words': stats.get('words', 0),
+                    'total_entries': stats.get('usernames', 0) + stats.get('passwords', 0)  # noqa
                 }
 
         except Exception as e:
@@ -273,8 +668,16 @@ class SaveResult:
             return {}
 
     def export_to_files(self, task_id: int,
-                        output_dir: str = "export") -> bool:
-        """将指定任务的结果导出到文件"""
+                        output_dir: str = "export",
+                        compression: Optional[str] = None) -> bool:
+        """将指定任务的结果导出到文件
+        Args:
+            task_id (int): 任务ID
+            output_dir (str): 输出目录
+            compression (Optional[str]): gzip / bz2 / xz, 为 None 时不压缩
+        Returns:
+            bool: 是否导出成功
+        """
         try:
             from .read_result import ReadResult  # type: ignore
 
@@ -295,16 +698,16 @@ class SaveResult:
             passwords = reader.get_passwords_by_task(task_id)
 
             # 导出用户名
-            username_file = output_path / f"usernames_task_{task_id}.txt"
-            with open(username_file, 'w', encoding='utf-8') as f:
-                for username in sorted(usernames):
-                    f.write(username + '\n')
+            username_file = compressed_path(
+                output_path / f"usernames_task_{task_id}.txt", compression)
+            with open_writer(username_file) as f:
+                write_lines(f, sorted(usernames))
 
             # 导出密码
-            password_file = output_path / f"passwords_task_{task_id}.txt"
-            with open(password_file, 'w', encoding='utf-8') as f:
-                for password in sorted(passwords):
-                    f.write(password + '\n')
+            password_file = compressed_path(
+                output_path / f"passwords_task_{task_id}.txt", compression)
+            with open_writer(password_file) as f:
+                write_lines(f, sorted(passwords))
 
             # 导出任务信息
             info_file = output_path / f"task_{task_id}_info.json"
@@ -321,3 +724,48 @@ class SaveResult:
         except Exception as e:
             print(f"❌ 导出失败: {e}")
             return False
+
+
+def _iter_chunks(words: Iterable[str], size: int) -> Iterator[List[str]]:
+    """把条目按 size 个一组切块"""
+    iterator = iter(words)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _SaveProgress:
+    """统计已保存的条目数和速度, 并调用保存进度回调"""
+
+    def __init__(self, callback: Optional[ProgressCallback],
+                 total: Optional[int]) -> None:
+        self.callback = callback
+        self.total = total
+        self.rows = 0
+        self.kind = ''
+        self.start = time.perf_counter()
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.start
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def advance(self, kind: str, rows: int) -> None:
+        self.rows += rows
+        self.report('stage', kind)
+
+    def report(self, phase: str, kind: Optional[str] = None) -> None:
+        if kind is not None:
+            self.kind = kind
+        if self.callback is None:
+            return
+        self.callback({
+            'phase': phase,
+            'kind': self.kind,
+            'rows': self.rows,
+            'total': self.total,
+            'seconds': time.perf_counter() - self.start,
+            'rows_per_second': self.rate,
+        })
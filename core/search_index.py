@@ -0,0 +1,201 @@
+import sqlite3
+from typing import Any, List, Optional, Tuple
+
+# 搜索索引的两种实现: FTS5 trigram 虚拟表, 或 SQLite 未编译 FTS5 时的三元组表
+SEARCH_FTS5 = 'fts5'
+SEARCH_NGRAM = 'ngram'
+
+FTS_TABLE = 'words_fts'
+NGRAM_TABLE = 'word_grams'
+
+# 索引按三个字符切分, 模式中没有连续三个非通配字符时无法使用索引
+GRAM_SIZE = 3
+
+# 前缀中的 ASCII 字母不超过该数量时, 前缀搜索直接用字符串表的唯一索引
+PREFIX_CASE_LETTERS = 4
+
+# 三元组表的切分语句: 按 LIKE 的规则只对 ASCII 字母忽略大小写
+_NGRAM_SELECT = f'''
+    WITH RECURSIVE pos(id, word, n) AS (
+        SELECT id, lower(word), 1 FROM words
+        WHERE {{where}} AND length(word) >= {GRAM_SIZE}
+        UNION ALL
+        SELECT id, word, n + 1 FROM pos WHERE n + {GRAM_SIZE} <= length(word)
+    )
+    SELECT substr(word, n, {GRAM_SIZE}), id FROM pos
+'''
+
+
+def search_backend(cursor: sqlite3.Cursor) -> Optional[str]:
+    """数据库中已建立的搜索索引类型, 未建立时返回 None"""
+    tables = {row[0] for row in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE name IN (?, ?)",
+        (FTS_TABLE, NGRAM_TABLE))}
+    if FTS_TABLE in tables:
+        return SEARCH_FTS5
+    if NGRAM_TABLE in tables:
+        return SEARCH_NGRAM
+    return None
+
+
+def drop_search_index(cursor: sqlite3.Cursor) -> None:
+    """删除搜索索引 (不存在时什么也不做)"""
+    cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    cursor.execute(f'DROP TABLE IF EXISTS {NGRAM_TABLE}')
+
+
+def build_search_index(cursor: sqlite3.Cursor,
+                       backend: Optional[str] = None) -> str:
+    """删除旧的搜索索引并按字符串表重新建立
+    Args:
+        cursor (sqlite3.Cursor): 写连接的游标
+        backend (Optional[str]): fts5 / ngram, 为 None 时优先使用 FTS5
+    Returns:
+        str: 实际建立的索引类型
+    """
+    drop_search_index(cursor)
+    if backend in (None, SEARCH_FTS5):
+        try:
+            # 外部内容表: 只保存索引, 字符串本身仍在 words 表中
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                    word, content='words', content_rowid='id',
+                    tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError:
+            # SQLite 未编译 FTS5 或版本低于 3.34 (没有 trigram 分词器)
+            if backend == SEARCH_FTS5:
+                raise
+        else:
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")  # noqa
+            return SEARCH_FTS5
+
+    cursor.execute(f'''
+        CREATE TABLE {NGRAM_TABLE} (
+            gram TEXT NOT NULL,
+            word_id INTEGER NOT NULL,
+            PRIMARY KEY (gram, word_id)
+        ) WITHOUT ROWID
+    ''')
+    index_words_after(cursor, 0)
+    return SEARCH_NGRAM
+
+
+def index_words_after(cursor: sqlite3.Cursor, last_id: int) -> None:
+    """把 id 大于 last_id 的字符串加入搜索索引
+
+    words.id 是不带 AUTOINCREMENT 的整数主键, 新字符串的 id 总是大于插入前的
+    最大 id, 保存前记下最大 id 即可找出本次新增的字符串.
+    """
+    backend = search_backend(cursor)
+    if backend == SEARCH_FTS5:
+        cursor.execute(f'''
+            INSERT INTO {FTS_TABLE} (rowid, word)
+            SELECT id, word FROM words WHERE id > ?
+        ''', (last_id,))
+    elif backend == SEARCH_NGRAM:
+        # 按主键顺序写入, 三元组表的 B 树按顺序追加
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO {NGRAM_TABLE} (gram, word_id)
+            {_NGRAM_SELECT.format(where='id > ?')}
+            ORDER BY 1, 2
+        ''', (last_id,))
+
+
+def unindex_words(cursor: sqlite3.Cursor, ids_table: str) -> None:
+    """从搜索索引中移除即将删除的字符串 (须在删除 words 中的行之前调用)
+    Args:
+        cursor (sqlite3.Cursor): 写连接的游标
+        ids_table (str): 保存待删除字符串 id 的表, 列名为 word_id
+    """
+    backend = search_backend(cursor)
+    if backend == SEARCH_FTS5:
+        # 外部内容表删除时需要提供原来的内容
+        cursor.execute(f'''
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, word)
+            SELECT 'delete', id, word FROM words
+            WHERE id IN (SELECT word_id FROM {ids_table})
+        ''')
+    elif backend == SEARCH_NGRAM:
+        # 重新切分出这些字符串的三元组, 按主键删除而不是扫描整张表
+        cursor.execute(f'''
+            DELETE FROM {NGRAM_TABLE} WHERE (gram, word_id) IN (
+                {_NGRAM_SELECT.format(where=f'id IN (SELECT word_id FROM {ids_table})')}
+            )
+        ''')  # noqa
+
+
+def pattern_grams(pattern: str) -> List[str]:
+    """LIKE 模式中可用于查索引的三元组 (已按 ASCII 转小写并去重)"""
+    grams: List[str] = []
+    # % 和 _ 是 LIKE 通配符, 只在两者之间的连续字面字符中切分
+    for literal in pattern.replace('_', '%').split('%'):
+        literal = ''.join(char.lower() if char < '\x80' else char
+                          for char in literal)
+        for start in range(len(literal) - GRAM_SIZE + 1):
+            gram = literal[start:start + GRAM_SIZE]
+            if gram not in grams:
+                grams.append(gram)
+    return grams
+
+
+def prefix_ranges(prefix: str) -> Optional[Tuple[str, List[Any]]]:
+    """把前缀匹配拆成字符串表唯一索引上的区间查询
+    LIKE 对 ASCII 字母不区分大小写, 每种大小写组合对应一个区间, 因此只在
+    前缀中的 ASCII 字母不超过 PREFIX_CASE_LETTERS 个时使用.
+    Returns:
+        Optional[Tuple[str, List[Any]]]: FROM 子句 (别名 w) 和要绑定的参数,
+            不适用时返回 None
+    """
+    # 过短的前缀通常匹配大量字符串, 逐个按任务查关联不如直接扫描关联表
+    if len(prefix) < GRAM_SIZE or '%' in prefix or '_' in prefix:
+        return None
+    letters = [char for char in prefix if char < '\x80' and char.isalpha()]
+    if len(letters) > PREFIX_CASE_LETTERS or ord(prefix[-1]) >= 0x10FFFF:
+        return None
+
+    variants = ['']
+    for char in prefix:
+        cases = {char.lower(), char.upper()} if char in letters else {char}
+        variants = [variant + case for variant in variants
+                    for case in sorted(cases)]
+    # UTF-8 字节序与码位顺序一致, 末尾字符加一即为区间上界
+    params: List[Any] = []
+    for variant in variants:
+        params += [variant, variant[:-1] + chr(ord(variant[-1]) + 1)]
+    # 各区间互不重叠; 写成 OR 时查询计划会改为扫描整个索引
+    ranges = ' UNION ALL '.join(
+        ['SELECT * FROM words WHERE word >= ? AND word < ?'] * len(variants))
+    return f'({ranges}) w', params
+
+
+def word_source(backend: Optional[str], pattern: str,
+                prefix: bool) -> Optional[Tuple[str, List[Any]]]:
+    """用索引找出匹配搜索模式的候选字符串 (别名 w)
+    Args:
+        backend (Optional[str]): search_backend() 的结果
+        pattern (str): 搜索模式 (可含 LIKE 通配符)
+        prefix (bool): 是否为前缀搜索
+    Returns:
+        Optional[Tuple[str, List[Any]]]: FROM 子句和要绑定的参数, 候选仍需用
+            w.word LIKE 复核; 没有可用的索引时返回 None
+    """
+    if prefix:
+        ranges = prefix_ranges(pattern)
+        if ranges is not None:
+            return ranges
+
+    like = f'{pattern}%' if prefix else f'%{pattern}%'
+    grams = pattern_grams(like)
+    if not grams:
+        return None
+    if backend == SEARCH_FTS5:
+        return (f'(SELECT rowid AS id FROM {FTS_TABLE} WHERE word LIKE ?) m '
+                f'CROSS JOIN words w ON w.id = m.id', [like])
+    if backend == SEARCH_NGRAM:
+        matches = ' INTERSECT '.join(
+            f'SELECT word_id FROM {NGRAM_TABLE} WHERE gram = ?' for _ in grams)
+        return (f'({matches}) m CROSS JOIN words w ON w.id = m.word_id',
+                list(grams))
+    return None
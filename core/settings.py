@@ -1,4 +1,5 @@
 import os
+from typing import List, Optional
 
 # 常用前缀
 COMMON_PREFIX = [
@@ -108,13 +109,97 @@ REGULAR_KEYBOARD_PASSWD = [
 # 常见的连接符
 COMMON_SEPARATORS = ['', '.', '_', '-', '@', '#', '$']
 
+# 用户名生成规则: (规则族, 权重, [模板, ...])
+# 权重表示该规则族结果被实际使用的相对可能性, 用于 --top-k 排序输出
+# 可用槽位: name 基础名字, prefix 常见前缀, suffix 后缀, year 年份,
+#           birth 生日各部分, company 公司/部门, company_sep 非空连接符,
+#           email 邮箱用户名, phone 手机号片段
+USERNAME_RULES = [
+    # 1. 直接使用名字
+    ("name", 1.0, ["{name}"]),
+    # 2. 名字 + 后缀
+    ("name_suffix", 0.6, ["{name}{suffix}"]),
+    # 3. 名字 + 年份
+    ("name_year", 0.7, ["{name}{year}", "{year}{name}"]),
+    # 4. 前缀(常见用户名)
+    ("prefix", 0.8, ["{prefix}"]),
+    # 5. 前缀 + 名字 or 名字 + 前缀
+    ("prefix_name", 0.3, ["{prefix}{name}", "{name}{prefix}"]),
+    # 6. 前缀 + 后缀
+    ("prefix_suffix", 0.4, ["{prefix}{suffix}"]),
+    # 7. 前缀 + 年份
+    ("prefix_year", 0.4, ["{prefix}{year}"]),
+    # 8. 基于生日的组合
+    ("name_birth", 0.75, ["{name}{birth}", "{birth}{name}"]),
+    # 9. 基于公司的组合
+    ("name_company", 0.3, ["{name}{company_sep}{company}",
+                           "{company}{company_sep}{name}"]),
+    # 10. 基于邮箱的组合
+    ("email", 0.95, ["{email}", "{email}{suffix}"]),
+    # 11. 基于手机号的组合
+    ("name_phone", 0.5, ["{name}{phone}", "{phone}{name}"]),
+]
+
+# 密码生成规则, 额外槽位: sep 连接符(含空串与自定义特殊字符), common 常见密码
+PASSWORD_RULES = [
+    # 1. 基础名字 + 后缀
+    ("name_suffix", 0.8, ["{name}{suffix}"]),
+    # 2. 基础名字 + 特殊字符 + 后缀
+    ("name_sep_suffix", 0.45, ["{name}{sep}{suffix}"]),
+    # 3. 基础名字 + 年份
+    ("name_year", 0.85, ["{name}{year}", "{year}{name}"]),
+    # 4. 基础名字 + 特殊字符 + 年份
+    ("name_sep_year", 0.5, ["{name}{sep}{year}", "{year}{sep}{name}"]),
+    # 5. 前缀 + 后缀
+    ("prefix_suffix", 0.6, ["{prefix}{suffix}"]),
+    # 6. 前缀 + 特殊字符 + 后缀
+    ("prefix_sep_suffix", 0.3, ["{prefix}{sep}{suffix}"]),
+    # 7. 前缀 + 年份
+    ("prefix_year", 0.5, ["{prefix}{year}"]),
+    # 8. 前缀 + 特殊字符 + 年份
+    ("prefix_sep_year", 0.3, ["{prefix}{sep}{year}"]),
+    # 9. 基于生日的组合
+    ("name_birth", 0.9, ["{name}{birth}", "{name}{sep}{birth}"]),
+    # 10. 基于手机号的组合
+    ("name_phone", 0.7, ["{name}{phone}", "{name}{sep}{phone}"]),
+    # 11. 公司名相关组合
+    ("name_company", 0.4, ["{name}{company_sep}{company}",
+                           "{company}{company_sep}{name}"]),
+    # 12. 常见密码
+    ("common", 1.0, ["{common}"]),
+]
+
+# 候选打分时的长度惩罚: 得分 = 规则族权重 / (1 + 系数 * 长度)
+SCORE_LENGTH_PENALTY = 0.05
+
+# 合并外部字典时的默认内存预算 (字节), 超出时改用磁盘外部排序
+DEFAULT_MEMORY_BUDGET = 1 << 30
+
 # 有效的特殊字符范围（用于验证）
 VALID_SPECIAL_CHARS = "!@#$%^&*()_+-=[]{}|;':\",./<>?~`"
 
 # top100 common passwords from core/txt/top_100_pass.txt
-with open(os.path.join(os.path.dirname(__file__), 'txt/top_100_pass.txt'),
-          'r', encoding='utf-8') as f:
-    TOP_100_COMMON_PASSWORDS = [line.strip() for line in f if line.strip()]
+TOP_100_PASSWORDS_FILE = os.path.join(os.path.dirname(__file__),
+                                      'txt/top_100_pass.txt')
+_top_100_common_passwords: Optional[List[str]] = None
+
+
+def load_top_100_passwords() -> List[str]:
+    """读取常见密码列表, 首次使用时才读文件, 之后复用同一个列表"""
+    global _top_100_common_passwords
+    if _top_100_common_passwords is None:
+        with open(TOP_100_PASSWORDS_FILE, 'r', encoding='utf-8') as f:
+            _top_100_common_passwords = [line.strip() for line in f
+                                         if line.strip()]
+    return _top_100_common_passwords
+
+
+def __getattr__(name: str):
+    # 兼容 from .settings import TOP_100_COMMON_PASSWORDS, 访问时才加载
+    if name == 'TOP_100_COMMON_PASSWORDS':
+        return load_top_100_passwords()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # 使用示例
 USAGE_EXAMPLE = """
@@ -140,6 +225,55 @@ USAGE_EXAMPLE = """
     # 命令行直接指定信息
     python main.py --name-zh "张三" --birthday "1990-01-01" --company-zh "ABC公司"
 
+    # 流式生成 (边生成边写文件, 适合超大字典)
+    python main.py --info personal_info.json --stream --output ./output
+
+    # 管道模式 (候选写到标准输出, 提示信息写到标准错误)
+    python main.py --info personal_info.json --stdout passwords \\
+        | hashcat -m 0 hashes.txt
+    python main.py --info personal_info.json --stdout pairs > combos.txt
+
+    # 批量生成 (每行一个目标, 输出到 ./output/<序号_名字>/, 可同时保存到数据库)
+    python main.py --batch targets.jsonl --workers 8 --output ./output
+    python main.py --batch staff.csv --save-task-name staff2024
+    python main.py --batch targets.jsonl --pinyin-cache pinyin_cache.db
+
+    # 流式生成并用 64 位指纹去重 (千万级条目只需几百 MB 内存)
+    python main.py --info personal_info.json --stream --dedup fingerprint
+
+    # 分片输出 (供多节点分布式爆破, manifest.json 记录每个分片的条目数/大小/SHA-256)
+    python main.py --info personal_info.json --stream --shard-size 1000000
+    python main.py --info personal_info.json --shards 16
+
+    # 压缩输出 (合并外部字典时 .gz / .bz2 / .xz 文件自动解压读取)
+    python main.py --info personal_info.json --compress gzip --compress-thread
+    python main.py --info personal_info.json --merge-password rockyou.txt.gz \\
+        --compress xz
+
+    # 多机分工: 每台机器只生成 8 个分区中的一个, 无需协调和事后合并
+    python main.py --info personal_info.json --stream --partition 1/8
+    python main.py --info personal_info.json --stream --partition 2/8
+
+    # 多进程并行生成
+    python main.py --info personal_info.json --workers 8
+
+    # 按目标密码策略生成 (至少8位, 含数字和大写字母)
+    python main.py --info personal_info.json \\
+        --password-policy "min=8,digit,upper"
+
+    # 紧凑结果存储 (千万级条目时内存占用约为 set 的五分之一)
+    python main.py --info personal_info.json --compact
+
+    # 合并超大外部字典 (超出内存预算时自动使用磁盘外部排序)
+    python main.py --info personal_info.json --merge-password rockyou.txt \\
+        --memory-budget 512M
+
+    # 只输出最可能的前1000个候选 (按得分排序, 适合有锁定限制的在线爆破)
+    python main.py --info personal_info.json --top-k 1000
+
+    # 生成前估算规模 (不生成)
+    python main.py --info personal_info.json --custom-affix 666,888 --dry-run
+
     ⚠️  重要提醒:
     - 本工具仅用于授权的安全测试和研究
     - 使用前请确保获得适当的授权
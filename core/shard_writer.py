@@ -0,0 +1,159 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from .compress_io import (WRITE_BATCH, WRITE_BUFFER_SIZE,  # type: ignore
+                          HashingWriter, compressed_path, open_writer)
+
+# 分片编号位数, 文件名形如 passwords.00000.txt
+SHARD_NAME_DIGITS = 5
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ShardWriter:
+    """把条目按行写入编号分片文件
+
+    两种切分方式 (二选一):
+      - shard_size: 按顺序每 N 个条目一个分片, 分片数由条目总数决定
+      - shards: 固定 K 个分片, 条目轮流写入, 各分片条目数最多相差 1
+
+    条目按批拼接编码后以大块写出, 可选压缩. 写出的同时计算每个分片落盘的
+    字节数和 SHA-256 (压缩时为压缩后的文件), 供 write_manifest() 生成分片清单.
+    """
+
+    def __init__(self, output_dir: str, prefix: str,
+                 shard_size: Optional[int] = None,
+                 shards: Optional[int] = None,
+                 compression: Optional[str] = None,
+                 threaded: bool = False) -> None:
+        if (shard_size is None) == (shards is None):
+            raise ValueError("shard_size 和 shards 必须且只能指定一个")
+        if (shard_size or shards or 0) <= 0:
+            raise ValueError("分片大小和分片数必须为正整数")
+
+        self.output_dir = Path(output_dir)
+        self.prefix = prefix
+        self.shard_size = shard_size
+        self.compression = compression
+        self.threaded = threaded
+        self.count = 0
+        self.shards: List[Dict[str, Any]] = []
+        if shards is not None:
+            for _ in range(shards):
+                self._open_shard()
+
+    def __enter__(self) -> 'ShardWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, words: Iterable[str]) -> int:
+        """写入全部条目, 返回本次写入的条目数"""
+        before = self.count
+        batch: List[str] = []
+        for word in words:
+            batch.append(word)
+            if len(batch) >= WRITE_BATCH:
+                self._write_batch(batch)
+                batch = []
+        self._write_batch(batch)
+        return self.count - before
+
+    def close(self) -> None:
+        for shard in self.shards:
+            self._close_shard(shard)
+
+    def summary(self) -> Dict[str, Any]:
+        """分片清单中本类条目的部分"""
+        return {
+            'count': self.count,
+            'bytes': sum(shard['raw'].bytes for shard in self.shards),
+            'shards': [{'file': shard['path'].name,
+                        'count': shard['count'],
+                        'bytes': shard['raw'].bytes,
+                        'sha256': shard['raw'].sha256.hexdigest()}
+                       for shard in self.shards],
+        }
+
+    def _open_shard(self) -> Dict[str, Any]:
+        index = len(self.shards)
+        path = compressed_path(
+            self.output_dir / f"{self.prefix}.{index:0{SHARD_NAME_DIGITS}d}.txt",  # noqa
+            self.compression)
+        # 摘要在压缩之后计算, 与落盘的文件一致
+        raw = HashingWriter(open(path, 'wb', buffering=WRITE_BUFFER_SIZE))
+        shard = {'path': path, 'raw': raw,
+                 'file': open_writer(path, self.compression, self.threaded,
+                                     fileobj=raw),
+                 'count': 0, 'closed': False}
+        self.shards.append(shard)
+        return shard
+
+    @staticmethod
+    def _close_shard(shard: Dict[str, Any]) -> None:
+        if shard['closed']:
+            return
+        shard['closed'] = True
+        try:
+            if shard['file'] is not shard['raw']:
+                shard['file'].close()
+        finally:
+            shard['raw'].close()
+
+    def _write_batch(self, batch: List[str]) -> None:
+        if not batch:
+            return
+        if self.shard_size is None:
+            # 轮流写入: 全局第 i 个条目写入第 i % K 个分片
+            k = len(self.shards)
+            offset = self.count % k
+            for index, shard in enumerate(self.shards):
+                self._write_lines(shard, batch[(index - offset) % k::k])
+            self.count += len(batch)
+            return
+
+        start = 0
+        while start < len(batch):
+            if not self.shards or self.shards[-1]['count'] >= self.shard_size:
+                if self.shards:
+                    self._close_shard(self.shards[-1])
+                self._open_shard()
+            shard = self.shards[-1]
+            end = start + min(len(batch) - start,
+                              self.shard_size - shard['count'])
+            self._write_lines(shard, batch[start:end])
+            self.count += end - start
+            start = end
+
+    @staticmethod
+    def _write_lines(shard: Dict[str, Any], lines: List[str]) -> None:
+        if not lines:
+            return
+        data = ('\n'.join(lines) + '\n').encode('utf-8')
+        shard['file'].write(data)
+        shard['count'] += len(lines)
+
+
+def write_manifest(output_dir: str, writers: Dict[str, ShardWriter]) -> Path:
+    """写出分片清单 manifest.json
+    Args:
+        output_dir (str): 输出目录
+        writers (Dict[str, ShardWriter]): {'usernames': ..., 'passwords': ...}
+    Returns:
+        Path: 清单文件路径
+    """
+    first = next(iter(writers.values()))
+    manifest = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'mode': 'size' if first.shard_size is not None else 'round_robin',
+        'shard_size': first.shard_size,
+        'shards': None if first.shard_size is not None else len(first.shards),
+        'compression': first.compression,
+        'files': {kind: writer.summary() for kind, writer in writers.items()},
+    }
+    manifest_file = Path(output_dir) / MANIFEST_NAME
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest_file
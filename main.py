@@ -1,32 +1,103 @@
 import sys
 import os
+import time
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
 
 from core.collect_input import CollectInput
-from core.combo import Combo
-from core.save_result import SaveResult
+from core.password_policy import PasswordPolicy
+from core.pinyin_cache import pinyin_cache
+from core.save_result import ProgressCallback, SaveResult
 from core.read_result import ReadResult
+from core.db_connection import get_manager
+from core.dict_reader import DictionaryReader
+from core.compress_io import (WRITE_BUFFER_SIZE, compressed_path,
+                              open_writer, write_lines, write_pairs)
+from core.result_store import CompactResultStore, sorted_words
+from core.shard_writer import ShardWriter, write_manifest
+from core.external_sort import (ExternalSorter, estimate_file_bytes,
+                                estimate_words_bytes, parse_size)
+from core.settings import DEFAULT_MEMORY_BUDGET
 from core.get_args import get_parser
-from typing import Dict, Set, Optional, Any
+from typing import (Dict, List, Tuple, Optional, Any, Iterable, BinaryIO,
+                    Iterator, AbstractSet, TYPE_CHECKING)
+
+if TYPE_CHECKING:
+    from core.combo import Combo
+    from core.rule_engine import Partition
+
+# --stdout 模式下先写出并刷新的条目数, 让下游工具尽快开始消费
+STDOUT_FIRST_BATCH = 1024
+
+# 搜索用户名/密码时每类最多显示的结果数
+SEARCH_PREVIEW = 20
 
 
 class SocialEngDictionaryTool:
     """社会工程学字典生成工具"""
 
-    def __init__(self, db_path: str = "social_eng_results.db") -> None:
+    def __init__(self, db_path: str = "social_eng_results.db",
+                 workers: int = 1,
+                 policy: Optional[PasswordPolicy] = None,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 compact: bool = False, dedup: str = 'exact',
+                 shard_size: Optional[int] = None,
+                 shards: Optional[int] = None,
+                 partition: Optional['Partition'] = None,
+                 compression: Optional[str] = None,
+                 compress_threaded: bool = False) -> None:
         self.personal_info: Optional[CollectInput] = None
-        self.combo_generator = Combo()
-        self.results: Dict[str, Set[str]] = {'usernames': set(),
-                                             'passwords': set()}
-        self.usernames_count: int = len(self.results['usernames'])
-        self.passwords_count: int = len(self.results['passwords'])
+        # 生成器在第一次使用时创建, 数据库相关命令不加载生成模块
+        self.workers = workers
+        self.policy = policy
+        self.dedup = dedup
+        # 只生成 (分区下标, 分区总数) 指定的一部分组合, 供多机分工
+        self.partition = partition
+        self._combo_generator: Optional['Combo'] = None
+        # compact 为 True 时结果存为 CompactResultStore 而不是 set
+        self.compact = compact
+        self.results: Dict[str, AbstractSet[str]] = {'usernames': set(),
+                                                     'passwords': set()}
+        # --top-k 模式下按得分排列的 (得分, 候选)
+        self.ranked: Dict[str, List[Tuple[float, str]]] = {}
+
+        # 合并后超出内存预算的外部字典不读入内存, 保存时再外部排序归并
+        self.memory_budget = memory_budget
+        self.external_sources: Dict[str, List[str]] = {'usernames': [],
+                                                       'passwords': []}
+
+        # 指定其一时字典写成编号分片文件并附带 manifest.json
+        self.shard_size = shard_size
+        self.shards = shards
+
+        # 输出压缩格式 (gzip / bz2 / xz), 以及是否在后台线程中压缩
+        self.compression = compression
+        self.compress_threaded = compress_threaded
 
         # database
         self.db_path = db_path
         self.save_handler = SaveResult(db_path)
         self.read_handler = ReadResult(db_path)
 
+    @property
+    def combo_generator(self) -> 'Combo':
+        if self._combo_generator is None:
+            from core.combo import Combo
+            self._combo_generator = Combo(workers=self.workers,
+                                          policy=self.policy,
+                                          dedup=self.dedup,
+                                          partition=self.partition)
+        return self._combo_generator
+
+    @property
+    def usernames_count(self) -> int:
+        return len(self.results['usernames'])
+
+    @property
+    def passwords_count(self) -> int:
+        return len(self.results['passwords'])
+
     def load_personal_info_from_file(self, file_path: str) -> bool:
         """从文件加载个人信息"""
         try:
@@ -66,7 +137,11 @@ class SocialEngDictionaryTool:
             print("🚀 开始生成社会工程学字典...")
 
             # 生成组合
-            self.results = self.combo_generator.generate_all_combinations(self.personal_info)  # noqa
+            if self.compact:
+                self.results = self.combo_generator.generate_compact(self.personal_info)  # noqa
+            else:
+                self.results = self.combo_generator.generate_all_combinations(self.personal_info)  # noqa
+            self._clear_external_sources()
             all_count = self.usernames_count + self.passwords_count
 
             print("✅ 字典生成完成!")
@@ -74,57 +149,153 @@ class SocialEngDictionaryTool:
             print(f"   🔐 密码: {self.passwords_count} 个")
             print(f"   📊 总计: {all_count} 个条目")
 
+            stats = self.combo_generator.stats
+            print(f"   ⚡ 提前跳过: 长度不符 {stats.get('pruned_by_length', 0)} 个, "  # noqa
+                  f"不符合密码策略 {stats.get('pruned_by_policy', 0)} 个, "
+                  f"大小写重复 {stats.get('case_folded', 0)} 个")
+            self._print_pinyin_stats(pinyin_cache.info())
+            self._print_dedup_reports()
+
             return True
         except Exception as e:
             print(f"❌ 生成字典失败: {e}")
             return False
 
+    def _print_pinyin_stats(self, stats: Dict[str, int]) -> None:
+        print(f"   🈶 拼音缓存: 命中 {stats.get('hits', 0)} 次, "
+              f"持久缓存命中 {stats.get('disk_hits', 0)} 次, "
+              f"未命中 {stats.get('misses', 0)} 次")
+
+    def _print_dedup_reports(self) -> None:
+        """fingerprint 去重模式下显示指纹表大小和误判估算"""
+        reports = self.combo_generator.dedup_reports
+        for kind, label in (('usernames', '用户名'), ('passwords', '密码')):
+            report = reports.get(kind)
+            if not report:
+                continue
+            print(f"   🧮 指纹去重 ({label}): {report['entries']} 个条目, "
+                  f"跳过重复 {report['duplicates']} 个, "
+                  f"指纹表 {report['nbytes'] / 1024 / 1024:.1f} MB, "
+                  f"预计误判丢弃 {report['expected_collisions']:.2e} 个 "
+                  f"(至少一次的概率 {report['collision_probability']:.2e})")
+
     def merge_external_dictionary(self, file_path: str,
                                   dict_type: str) -> bool:
         """合并外部字典"""
+        kind = {'username': 'usernames', 'password': 'passwords'}.get(dict_type)  # noqa
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                external_dict = set(line.strip() for line in f if line.strip())
+            if kind and self._exceeds_memory_budget(kind, file_path):
+                self.external_sources[kind].append(file_path)
+                print(f"⏳ 外部字典超出内存预算 ({self.memory_budget / 1024 / 1024:.0f} MB), "  # noqa
+                      f"将在保存时通过外部排序合并: {file_path}")
+                return True
 
-            if dict_type == 'username':
-                before_count = self.usernames_count
-                self.results['usernames'].update(external_dict)
-                after_count = self.usernames_count
-                print(f"✅ 合并外部用户名字典: 新增 {after_count - before_count} 个条目")
-            elif dict_type == 'password':
-                before_count = self.passwords_count
-                self.results['passwords'].update(external_dict)
-                after_count = self.passwords_count
-                print(f"✅ 合并外部密码字典: 新增 {after_count - before_count} 个条目")
-            else:
+            if kind is None:
                 print(f"❌ 不支持的字典类型: {dict_type}")
                 return False
 
+            # 按块解码后直接并入结果集合, 重复行由结果集合本身去掉
+            reader = DictionaryReader(file_path)
+            before_count = len(self.results[kind])
+            results = self.results[kind]
+            if isinstance(results, CompactResultStore):
+                self.results[kind] = results.merge(reader.iter_words())
+            else:
+                reader.merge_into(results)
+            after_count = len(self.results[kind])
+
+            if kind == 'usernames':
+                print(f"✅ 合并外部用户名字典: 新增 {after_count - before_count} 个条目")
+            else:
+                print(f"✅ 合并外部密码字典: 新增 {after_count - before_count} 个条目")
+            self._print_reader_stats(reader)
+
             return True
         except Exception as e:
             print(f"❌ 合并外部字典失败: {e}")
             return False
 
-    def save_dictionaries(self, output_dir: str = "output") -> bool:
-        """保存字典文件"""
+    def _print_reader_stats(self, reader: DictionaryReader) -> None:
+        stats = reader.stats
+        if stats['fallback_decoded'] or stats['undecodable']:
+            print(f"   ⚠️ {stats['fallback_decoded']} 行按 GBK 解码, "
+                  f"{stats['undecodable']} 行无法解码已跳过")
+
+    def _exceeds_memory_budget(self, kind: str, file_path: str) -> bool:
+        """估算合并后占用的内存是否超出预算"""
+        total = estimate_file_bytes(file_path)
+        total += sum(estimate_file_bytes(path)
+                     for path in self.external_sources[kind])
+        if total <= self.memory_budget:
+            results = self.results[kind]
+            if isinstance(results, CompactResultStore):
+                # 合并时新旧两份紧凑结果同时存在
+                total += 2 * results.nbytes
+            else:
+                total += estimate_words_bytes(results)
+        return total > self.memory_budget
+
+    def _clear_external_sources(self) -> None:
+        for sources in self.external_sources.values():
+            sources.clear()
+
+    def _iter_sorted(self, kind: str) -> Iterable[str]:
+        """按字典序产出去重后的结果; 有待合并的大字典时走外部排序"""
+        sources = self.external_sources[kind]
+        if not sources:
+            return sorted_words(self.results[kind])
+        return self._iter_external_sorted(self.results[kind], sources)
+
+    def _iter_external_sorted(self, words: Iterable[str],
+                              sources: List[str]) -> Iterator[str]:
+        with ExternalSorter(self.memory_budget) as sorter:
+            sorter.add_many(words)
+            for file_path in sources:
+                reader = DictionaryReader(file_path)
+                sorter.add_many(reader.iter_words())
+                self._print_reader_stats(reader)
+            print(f"💽 外部排序: 写出 {sorter.run_count} 个临时顺串, 开始归并")
+            yield from sorter
+
+    def save_dictionaries(self, output_dir: str = "output",
+                          streams: Optional[Dict[str, Iterable[str]]] = None) -> bool:  # noqa
+        """保存字典文件
+        Args:
+            output_dir (str): 输出目录
+            streams (Optional[Dict[str, Iterable[str]]]): 可选的
+                {'usernames': ..., 'passwords': ...} 迭代器, 提供时按迭代顺序
+                直接写出, 不经过 self.results 也不排序
+        Returns:
+            bool: 是否保存成功
+        """
         try:
             # 创建输出目录
             output_path = Path(output_dir)
             output_path.mkdir(exist_ok=True)
 
-            # 保存用户名字典
-            username_file = output_path / "usernames.txt"
-            with open(username_file, 'w', encoding='utf-8') as f:
-                for username in sorted(self.results['usernames']):
-                    f.write(username + '\n')
-            print(f"✅ 用户名字典已保存: {username_file}")
+            if streams is None:
+                streams = {
+                    'usernames': self._iter_sorted('usernames'),
+                    'passwords': self._iter_sorted('passwords')
+                }
 
-            # 保存密码字典
-            password_file = output_path / "passwords.txt"
-            with open(password_file, 'w', encoding='utf-8') as f:
-                for password in sorted(self.results['passwords']):
-                    f.write(password + '\n')
-            print(f"✅ 密码字典已保存: {password_file}")
+            if self.shard_size or self.shards:
+                username_count, password_count = self._write_shards(
+                    output_path, streams)
+            else:
+                # 保存用户名字典
+                username_file = compressed_path(output_path / "usernames.txt",
+                                                self.compression)
+                username_count = self._write_wordlist(username_file,
+                                                      streams['usernames'])
+                print(f"✅ 用户名字典已保存: {username_file}")
+
+                # 保存密码字典
+                password_file = compressed_path(output_path / "passwords.txt",
+                                                self.compression)
+                password_count = self._write_wordlist(password_file,
+                                                      streams['passwords'])
+                print(f"✅ 密码字典已保存: {password_file}")
 
             # 保存个人信息备份
             if self.personal_info:
@@ -133,15 +304,176 @@ class SocialEngDictionaryTool:
                 print(f"📋 个人信息备份已保存: {info_file}")
 
             # 生成报告
-            self._generate_report(output_path)
+            self._generate_report(output_path, username_count, password_count)
 
             return True
         except Exception as e:
             print(f"❌ 保存字典失败: {e}")
             return False
 
-    def save_to_database(self, task_name: str, description: str = "") -> int:
-        """保存当前结果到数据库"""
+    def _write_wordlist(self, file_path: Path, words: Iterable[str]) -> int:
+        """逐行写出字典 (按扩展名压缩), 返回写入的条目数"""
+        f = open_writer(file_path, threaded=self.compress_threaded)
+        try:
+            if isinstance(words, CompactResultStore):
+                # 紧凑结果已是按行排列的 UTF-8 字节, 直接写出
+                return words.write_to(f)
+            return write_lines(f, words)
+        finally:
+            f.close()
+
+    def _write_shards(self, output_path: Path,
+                      streams: Dict[str, Iterable[str]]) -> Tuple[int, int]:
+        """把用户名和密码写成编号分片文件并生成分片清单, 返回两者的条目数"""
+        writers: Dict[str, ShardWriter] = {}
+        for kind, label in (('usernames', '用户名'), ('passwords', '密码')):
+            with ShardWriter(str(output_path), kind,
+                             shard_size=self.shard_size,
+                             shards=self.shards,
+                             compression=self.compression,
+                             threaded=self.compress_threaded) as writer:
+                writer.write(streams[kind])
+            writers[kind] = writer
+            print(f"✅ {label}字典已保存为 {len(writer.shards)} 个分片: "
+                  f"{output_path / kind}.*.txt")
+
+        manifest_file = write_manifest(str(output_path), writers)
+        print(f"📋 分片清单已保存: {manifest_file}")
+        return writers['usernames'].count, writers['passwords'].count
+
+    def generate_top_k(self, k: int) -> bool:
+        """只生成得分最高的 k 个用户名和密码"""
+        if not self.personal_info:
+            print("❌ 请先设置个人信息")
+            return False
+
+        try:
+            print(f"🚀 开始生成得分最高的 {k} 个用户名和密码...")
+
+            self.ranked = self.combo_generator.generate_top_k(self.personal_info, k)  # noqa
+            self.results = {kind: {candidate for _, candidate in ranked}
+                            for kind, ranked in self.ranked.items()}
+
+            print("✅ 字典生成完成!")
+            print(f"   📝 用户名: {self.usernames_count} 个")
+            print(f"   🔐 密码: {self.passwords_count} 个")
+            return True
+        except Exception as e:
+            print(f"❌ 生成字典失败: {e}")
+            return False
+
+    def save_ranked_dictionaries(self, output_dir: str = "output") -> bool:
+        """按得分从高到低保存 --top-k 的结果"""
+        streams = {kind: [candidate for _, candidate in ranked]
+                   for kind, ranked in self.ranked.items()}
+        return self.save_dictionaries(output_dir, streams=streams)
+
+    def stream_to_stdout(self, mode: str, out: BinaryIO) -> bool:
+        """边生成边把候选写到标准输出, 供 hashcat / hydra 等工具通过管道读取
+        Args:
+            mode (str): usernames / passwords / pairs ("用户名:密码" 的全部组合)
+            out (BinaryIO): 二进制输出, 通常是标准输出
+        Returns:
+            bool: 是否成功
+        """
+        if not self.personal_info:
+            print("❌ 请先设置个人信息")
+            return False
+
+        combo = self.combo_generator
+        features = combo.extract_features(self.personal_info)
+        try:
+            if mode == 'pairs':
+                usernames = list(combo.iter_usernames(self.personal_info, features))  # noqa
+                passwords = combo.iter_passwords(self.personal_info, features)
+                count = write_pairs(out, usernames, islice(passwords, 1))
+                out.flush()
+                count += write_pairs(out, usernames, passwords)
+            else:
+                words = (combo.iter_usernames if mode == 'usernames'
+                         else combo.iter_passwords)(self.personal_info, features)  # noqa
+                count = write_lines(out, islice(words, STDOUT_FIRST_BATCH))
+                out.flush()
+                count += write_lines(out, words)
+            out.flush()
+        except BrokenPipeError:
+            # 下游提前退出 (如 head), 把标准输出指向空设备, 避免退出时刷新缓冲区再次报错
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, out.fileno())
+            os.close(devnull)
+            print("ℹ️ 下游程序已关闭管道, 停止生成")
+            return True
+
+        print(f"✅ 已向标准输出写出 {count} 行")
+        self._print_dedup_reports()
+        return True
+
+    def stream_dictionaries(self, output_dir: str = "output") -> bool:
+        """边生成边写出字典, 不在内存中保留完整结果"""
+        if not self.personal_info:
+            print("❌ 请先设置个人信息")
+            return False
+
+        print("🚀 开始流式生成社会工程学字典...")
+        streams = self.combo_generator.iter_all_combinations(self.personal_info)  # noqa
+        success = self.save_dictionaries(output_dir, streams=streams)
+        self._print_dedup_reports()
+        return success
+
+    def run_batch(self, file_path: str, output_dir: Optional[str] = "output",
+                  workers: int = 1, task_prefix: Optional[str] = None) -> bool:
+        """批量为目标文件中的每条记录生成字典
+        Args:
+            file_path (str): JSONL 或 CSV 目标文件
+            output_dir (Optional[str]): 输出根目录, 每个目标一个子目录
+            workers (int): 进程数
+            task_prefix (Optional[str]): 提供时每个目标保存为一个数据库任务
+        Returns:
+            bool: 是否至少成功生成了一个目标
+        """
+        if not os.path.exists(file_path):
+            print(f"❌ 批量目标文件不存在: {file_path}")
+            return False
+
+        from core.batch import BatchGenerator
+        from core.combo import Combo
+
+        # 并行粒度为目标, 单个目标内部不再分片
+        combo = Combo(policy=self.policy, partition=self.partition)
+        batch = BatchGenerator(
+            combo, workers=workers, output_dir=output_dir,
+            save_handler=self.save_handler if task_prefix else None,
+            task_prefix=task_prefix or "batch",
+            compression=self.compression)
+
+        print(f"🚀 开始批量生成: {file_path} (进程数: {batch.workers})")
+        try:
+            summary = batch.run(file_path)
+        except Exception as e:
+            print(f"❌ 批量生成失败: {e}")
+            return False
+
+        print("\n📊 批量生成完成:")
+        print(f"   🎯 成功目标: {summary['targets']} 个, 跳过: {summary['failed']} 个")  # noqa
+        print(f"   📝 用户名: {summary['usernames']} 个, "
+              f"🔐 密码: {summary['passwords']} 个")
+        print(f"   ⏱️ 耗时 {summary['seconds']:.2f} 秒, "
+              f"{summary['targets_per_second']} 目标/秒, "
+              f"{summary['entries_per_second']} 条目/秒")
+        self._print_pinyin_stats(summary['pinyin_cache'])
+        return summary['targets'] > 0
+
+    def save_to_database(self, task_name: str, description: str = "",
+                         progress_callback: Optional[ProgressCallback] = None) -> int:  # noqa
+        """保存当前结果到数据库
+        Args:
+            task_name (str): 任务名称
+            description (str): 任务描述
+            progress_callback (Optional[ProgressCallback]): 保存进度回调,
+                为 None 时在终端显示进度
+        Returns:
+            int: 任务ID, 如果保存失败则返回-1
+        """
         if not self.personal_info:
             print("❌ 没有个人信息可保存")
             return -1
@@ -150,11 +482,38 @@ class SocialEngDictionaryTool:
             print("❌ 没有生成结果可保存")
             return -1
 
+        if progress_callback is None:
+            progress_callback = self._print_save_progress
+
+        if any(self.external_sources.values()):
+            # 超出内存预算的外部字典经外部排序流式导入
+            return self.save_handler.bulk_save_generation_result(
+                task_name, description, self.personal_info,
+                self._iter_sorted('usernames'), self._iter_sorted('passwords'),
+                progress_callback=progress_callback)
+
         return self.save_handler.save_generation_result(
             task_name, description, self.personal_info,
-            self.results['usernames'], self.results['passwords']
+            self.results['usernames'], self.results['passwords'],
+            progress_callback=progress_callback
         )
 
+    @staticmethod
+    def _print_save_progress(progress: Dict[str, Any]) -> None:
+        """在终端同一行刷新数据库保存进度"""
+        if not sys.stdout.isatty():
+            return
+        if progress['phase'] == 'done':
+            print('\r\033[K', end='', flush=True)
+            return
+        phase = {'stage': '写入', 'index': '建索引',
+                 'merge': '合并'}.get(progress['phase'], progress['phase'])
+        kind = '用户名' if progress['kind'] == 'usernames' else '密码'
+        total = f"/{progress['total']}" if progress['total'] else ''
+        print(f"\r   💾 {phase} {kind}: {progress['rows']}{total} 个条目, "
+              f"{progress['rows_per_second']:.0f} 条/秒\033[K",
+              end='', flush=True)
+
     def load_from_database(self, task_id: int) -> bool:
         """从数据库加载之前的结果"""
         try:
@@ -169,13 +528,16 @@ class SocialEngDictionaryTool:
             self.personal_info = CollectInput.from_dict(task['personal_info'])
 
             # 加载结果
-            usernames = self.read_handler.get_usernames_by_task(task_id)
-            passwords = self.read_handler.get_passwords_by_task(task_id)
+            usernames = self.read_handler.get_usernames_by_task(
+                task_id, compact=self.compact)
+            passwords = self.read_handler.get_passwords_by_task(
+                task_id, compact=self.compact)
 
             self.results = {
                 'usernames': usernames,
                 'passwords': passwords
             }
+            self._clear_external_sources()
 
             print(f"✅ 已加载任务 {task_id}: {task['name']}")
             print(f"   📝 用户名: {len(usernames)} 个")
@@ -188,6 +550,32 @@ class SocialEngDictionaryTool:
             print(f"❌ 从数据库加载失败: {e}")
             return False
 
+    def show_estimate(self, sample: bool = False) -> bool:
+        """显示生成规模估算, 不实际生成"""
+        if not self.personal_info:
+            print("❌ 请先设置个人信息")
+            return False
+
+        report = self.combo_generator.estimate(self.personal_info, sample=sample)  # noqa
+
+        print("\n📐 生成规模估算 (dry run):")
+        for kind, label in (('usernames', '用户名'), ('passwords', '密码')):
+            entry = report[kind]
+            print("-" * 40)
+            print(f"  {label}: 上界 {entry['upper_bound']} 个, "
+                  f"平均长度 {entry['avg_length']}")
+            if 'estimated_unique' in entry:
+                print(f"    抽样估计去重后: {entry['estimated_unique']} 个")
+            for family, count in entry['families'].items():
+                if count:
+                    print(f"    {family:<20} {count}")
+
+        print("-" * 40)
+        print(f"  组合总数上界: {report['upper_bound']}")
+        print(f"  预计耗时: {report['estimated_seconds']} 秒")
+        print(f"  预计内存: {report['estimated_memory_bytes'] / 1024 / 1024:.1f} MB")  # noqa
+        return True
+
     def list_saved_tasks(self, limit: int = 10) -> None:
         """列出保存的任务"""
         tasks = self.read_handler.get_all_tasks(limit=limit)
@@ -224,6 +612,29 @@ class SocialEngDictionaryTool:
             print(f"{task['id']:<5} {task['name'][:18]:<20} {task['username_count']:<8} "  # noqa
                   f"{task['password_count']:<8} {created_at:<20}")
 
+    def search_saved_words(self, pattern: str, prefix: bool = False) -> None:
+        """在所有任务保存的用户名和密码中搜索子串 (或前缀)"""
+        start = time.perf_counter()
+        # 只取要显示的条数, 多取一条用于判断是否还有更多结果
+        limit = SEARCH_PREVIEW + 1
+        matches = {'用户名': self.read_handler.search_usernames(pattern, prefix=prefix, limit=limit),  # noqa
+                   '密码': self.read_handler.search_passwords(pattern, prefix=prefix, limit=limit)}  # noqa
+        elapsed = (time.perf_counter() - start) * 1000
+
+        if not any(matches.values()):
+            print(f"🔍 未找到匹配 '{pattern}' 的用户名或密码 ({elapsed:.1f} ms)")
+            return
+
+        print(f"\n🔍 搜索结果 ('{pattern}', {elapsed:.1f} ms):")
+        for label, rows in matches.items():
+            if not rows:
+                continue
+            print(f"  {label}:")
+            for word, task_id in rows[:SEARCH_PREVIEW]:
+                print(f"    {word}  (任务 {task_id})")
+            if len(rows) > SEARCH_PREVIEW:
+                print(f"    ... 只显示前 {SEARCH_PREVIEW} 条, 还有更多结果")
+
     def show_database_stats(self) -> None:
         """显示数据库统计信息"""
         stats = self.save_handler.get_database_stats()
@@ -239,10 +650,18 @@ class SocialEngDictionaryTool:
         print(f"  总密码数: {stats.get('total_passwords', 0)}")
         print(f"  唯一用户名: {stats.get('unique_usernames', 0)}")
         print(f"  唯一密码: {stats.get('unique_passwords', 0)}")
+        print(f"  字符串表: {stats.get('unique_words', 0)}")
         print(f"  总条目数: {stats.get('total_entries', 0)}")
 
-    def _generate_report(self, output_path: Path) -> None:
+    def _generate_report(self, output_path: Path,
+                         usernames_count: Optional[int] = None,
+                         passwords_count: Optional[int] = None) -> None:
         """生成详细报告"""
+        if usernames_count is None:
+            usernames_count = self.usernames_count
+        if passwords_count is None:
+            passwords_count = self.passwords_count
+
         report_file = output_path / "generation_report.txt"
 
         try:
@@ -263,11 +682,11 @@ class SocialEngDictionaryTool:
                 f.write("\n")
 
                 # 字典统计
-                all_count = self.usernames_count + self.passwords_count
+                all_count = usernames_count + passwords_count
                 f.write("📊 字典统计:\n")
                 f.write("-" * 30 + "\n")
-                f.write(f"  用户名数量: {self.usernames_count}\n")
-                f.write(f"  密码数量: {self.passwords_count}\n")
+                f.write(f"  用户名数量: {usernames_count}\n")
+                f.write(f"  密码数量: {passwords_count}\n")
                 f.write(f"  总计条目: {all_count}\n\n")
 
                 # 示例展示
@@ -276,14 +695,14 @@ class SocialEngDictionaryTool:
 
                 # 用户名示例
                 f.write("用户名示例 (前10个):\n")
-                usernames_sample = list(sorted(self.results['usernames']))[:10]
+                usernames_sample = list(islice(sorted_words(self.results['usernames']), 10))  # noqa
                 for username in usernames_sample:
                     f.write(f"  {username}\n")
                 f.write("\n")
 
                 # 密码示例
                 f.write("密码示例 (前10个):\n")
-                passwords_sample = list(sorted(self.results['passwords']))[:10]
+                passwords_sample = list(islice(sorted_words(self.results['passwords']), 10))  # noqa
                 for password in passwords_sample:
                     f.write(f"  {password}\n")
                 f.write("\n")
@@ -344,7 +763,8 @@ class SocialEngDictionaryTool:
             if not output_dir:
                 output_dir = "export"
 
-            self.save_handler.export_to_files(task_id, output_dir)
+            self.save_handler.export_to_files(task_id, output_dir,
+                                              compression=self.compression)
         except ValueError:
             print("❌ 请输入有效的任务ID")
 
@@ -415,7 +835,7 @@ class SocialEngDictionaryTool:
         if custom_affix:
             affix_list = [item.strip() for item in custom_affix.split(',') if item.strip()]  # noqa
             if affix_list:
-                info_data['common_affix'] = affix_list
+                info_data['common_suffix'] = affix_list
                 print(f"  ✅ 已添加自定义后缀/前缀: {', '.join(affix_list)}")
 
         # 自定义年份
@@ -531,7 +951,7 @@ class SocialEngDictionaryTool:
         print("-" * 30)
 
         # 用户名预览
-        usernames_sample = list(sorted(self.results['usernames']))[:5]
+        usernames_sample = list(islice(sorted_words(self.results['usernames']), 5))  # noqa
         print("用户名示例:")
         for username in usernames_sample:
             print(f"  {username}")
@@ -542,7 +962,7 @@ class SocialEngDictionaryTool:
         print()
 
         # 密码预览
-        passwords_sample = list(sorted(self.results['passwords']))[:5]
+        passwords_sample = list(islice(sorted_words(self.results['passwords']), 5))  # noqa
         print("密码示例:")
         for password in passwords_sample:
             print(f"  {password}")
@@ -558,8 +978,72 @@ def main():
     # 解析参数
     args = parser.parse_args()
 
+    pipe = None
+    if args.stdout:
+        # 候选独占标准输出, 其余提示信息全部改写到标准错误
+        pipe = open(sys.stdout.fileno(), 'wb', buffering=WRITE_BUFFER_SIZE,
+                    closefd=False)
+        sys.stdout = sys.stderr
+
+    # 解析密码策略
+    policy = None
+    if args.password_policy:
+        try:
+            policy = PasswordPolicy.from_spec(args.password_policy)
+        except ValueError as e:
+            print(f"❌ 密码策略格式错误: {e}")
+            return
+        print(f"🔒 密码策略: {policy.to_spec()}")
+
     # 创建工具实例
-    tool = SocialEngDictionaryTool(args.db_path)
+    # 拼音持久缓存, 跨运行复用姓名和公司名的拼音转换结果
+    if args.pinyin_cache:
+        pinyin_cache.set_db_path(args.pinyin_cache)
+
+    memory_budget = DEFAULT_MEMORY_BUDGET
+    if args.memory_budget:
+        try:
+            memory_budget = parse_size(args.memory_budget)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+
+    partition = None
+    if args.partition:
+        from core.rule_engine import parse_partition
+        try:
+            partition = parse_partition(args.partition)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        print(f"🧩 分区: 只生成第 {partition[0] + 1}/{partition[1]} 部分")
+
+    # 数据库连接的页缓存和内存映射大小, SaveResult / ReadResult 共享同一组连接
+    if args.db_cache_size or args.db_mmap_size:
+        try:
+            get_manager(args.db_path,
+                        cache_size=parse_size(args.db_cache_size) if args.db_cache_size else None,  # noqa
+                        mmap_size=parse_size(args.db_mmap_size) if args.db_mmap_size else None)  # noqa
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+
+    if args.shard_size is not None and args.shards is not None:
+        print("❌ --shard-size 和 --shards 不能同时使用")
+        return
+    if (args.shard_size is not None and args.shard_size <= 0) or \
+            (args.shards is not None and args.shards <= 0):
+        print("❌ --shard-size 和 --shards 必须为正整数")
+        return
+
+    tool = SocialEngDictionaryTool(args.db_path, workers=args.workers,
+                                   policy=policy, memory_budget=memory_budget,
+                                   compact=args.compact, dedup=args.dedup,
+                                   shard_size=args.shard_size,
+                                   shards=args.shards,
+                                   partition=partition,
+                                   compression=args.compress,
+                                   compress_threaded=args.compress_thread)
 
     # 数据库操作
     if args.list_tasks:
@@ -574,6 +1058,18 @@ def main():
         tool.show_database_stats()
         return
 
+    if args.rebuild_search_index:
+        tool.save_handler.rebuild_search_index()
+        return
+
+    if args.drop_search_index:
+        tool.save_handler.drop_search_index()
+        return
+
+    if args.search_words:
+        tool.search_saved_words(args.search_words, prefix=args.search_prefix)
+        return
+
     if args.load_task:
         if tool.load_from_database(args.load_task):
             if tool.save_dictionaries(args.output):
@@ -582,7 +1078,8 @@ def main():
         return
 
     if args.export_task:
-        tool.save_handler.export_to_files(args.export_task, args.output)
+        tool.save_handler.export_to_files(args.export_task, args.output,
+                                          compression=args.compress)
         return
 
     if args.delete_task:
@@ -593,6 +1090,15 @@ def main():
             print("❌ 取消删除")
         return
 
+    # 批量模式
+    if args.batch:
+        if args.shard_size or args.shards:
+            print("⚠️ 批量模式下不支持分片输出, 已忽略 --shard-size / --shards")
+        if tool.run_batch(args.batch, args.output, workers=args.workers,
+                          task_prefix=args.save_task_name):
+            print(f"\n🎉 批量生成完成! 请查看 {args.output} 目录")
+        return
+
     # 交互式模式
     if args.interactive:
         tool.run_interactive_mode()
@@ -638,16 +1144,56 @@ def main():
         if not tool.set_personal_info(**info_dict):
             return
 
-    if args.special_chars:
-        info_dict['special_chars'] = args.special_chars
-    if args.custom_affix:
-        affix_list = [item.strip() for item in args.custom_affix.split(',') if item.strip()]  # noqa
-        if affix_list:
-            info_dict['common_affix'] = affix_list
-    if args.custom_years:
-        years_list = [item.strip() for item in args.custom_years.split(',') if item.strip()]  # noqa
-        if years_list:
-            info_dict['regular_years'] = years_list
+    # 命令行指定的自定义规则, 同时作用于 --info 加载的个人信息
+    if tool.personal_info:
+        if args.special_chars:
+            tool.personal_info.set_special_chars(args.special_chars)
+        if args.custom_affix:
+            for affix in args.custom_affix.split(','):
+                tool.personal_info.add_custom_affix(affix.strip())
+        if args.custom_years:
+            for year in args.custom_years.split(','):
+                tool.personal_info.add_custom_year(year.strip())
+
+    # 仅估算生成规模
+    if args.dry_run or args.dry_run_sample:
+        tool.show_estimate(sample=args.dry_run_sample)
+        return
+
+    # 管道模式: 候选直接写到标准输出
+    if pipe is not None:
+        if (args.merge_username or args.merge_password or args.save_task_name
+                or args.compress or args.shard_size or args.shards):
+            print("⚠️ --stdout 模式下不支持合并外部字典、保存到数据库、压缩和分片, 已忽略相关参数")  # noqa
+        tool.stream_to_stdout(args.stdout, pipe)
+        return
+
+    # 流式生成: 直接写出, 不保留结果
+    if args.stream:
+        if args.merge_username or args.merge_password or args.save_task_name:
+            print("⚠️ 流式模式下不支持合并外部字典和保存到数据库, 已忽略相关参数")
+        if tool.stream_dictionaries(args.output):
+            print(f"\n🎉 字典生成完成! 请查看 {args.output} 目录")
+        return
+
+    # 只保留得分最高的候选, 按得分顺序写出
+    if args.top_k is not None:
+        if args.top_k <= 0:
+            print("❌ --top-k 必须为正整数")
+            return
+        if args.merge_username or args.merge_password:
+            print("⚠️ --top-k 模式下不支持合并外部字典, 已忽略相关参数")
+        if not tool.generate_top_k(args.top_k):
+            return
+        if tool.save_ranked_dictionaries(args.output):
+            print(f"\n🎉 字典生成完成! 请查看 {args.output} 目录")
+            tool._show_preview()
+        if args.save_task_name:
+            task_id = tool.save_to_database(args.save_task_name,
+                                            args.save_task_desc or "")
+            if task_id > 0:
+                print(f"✅ 结果已保存到数据库, 任务ID: {task_id}")
+        return
 
     # 生成字典
     if not tool.generate_dictionaries():